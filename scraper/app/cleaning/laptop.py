@@ -0,0 +1,628 @@
+"""
+Normalizarea specifică laptopurilor pentru products_clean: brand / model / familie,
+specificații (CPU, RAM, stocare, GPU, diagonală) din specs_raw sau ghicite din titlu + descriere,
+condiție și filtrul is_laptop. Folosit de scripts/build_clean_table.py.
+"""
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import re
+from functools import lru_cache
+from typing import Any, Dict, Optional
+
+from app.cleaning.normalize import normalize_title, normalize_condition
+from app.cleaning.specs import SpecExtractor, SpecField
+from app.core.utils import ModelRule, ModelRuleTable
+
+BRAND_ALIASES = {
+    "hp": "HP",
+    "hewlett packard": "HP",
+    "lenovo": "Lenovo",
+    "asus": "ASUS",
+    "acer": "Acer",
+    "dell": "Dell",
+    "msi": "MSI",
+    "apple": "Apple",
+    "macbook": "Apple",
+    "sony": "Sony",
+    "vaio": "Sony",
+    "samsung": "Samsung",
+}
+
+# Specificațiile din titlu + descriere, într-o singură trecere (vezi app.cleaning.specs).
+# Diagonala: "(?:^|[^0-9])" devine lookbehind, ca potrivirea să înceapă la cifră.
+LAPTOP_SPECS = SpecExtractor({
+    "cpu": SpecField(
+        r"\b("
+        r"i[3579]-?\d{4,5}[a-z]{0,2}"
+        r"|[Ii][3579]-?\d{3,5}[a-z]{0,2}"
+        r"|intel\s+(?:core\s+)?i[3579](?:-\d{3,5}[a-z]{0,2})?"
+        r"|ryzen(?:™)?\s*[3579]\s*\d{4,5}[a-z]{0,2}"
+        r"|core(?:™)?\s*(?:i[3579]|[3579])\s*\d{3,4}[a-z]{0,2}"
+        r"|ultra(?:™)?\s*[579]\s*\d{3,4}[a-z]{0,2}"
+        r"|celeron(?:\s+[a-z0-9]+)?"
+        r")\b",
+        starts="ciru",
+    ),
+    "ram_gb": SpecField(r"\b(4|8|12|16|24|32|48|64)\s*gb\b(?:\s*(?:ram|ddr[345]|lpddr[45]))?", starts="123468"),
+    "storage": SpecField(
+        r"\b(128|256|512|1024|2048)\s*gb\s*(ssd|nvme)\b"
+        r"|\b(1|2)\s*tb\s*(ssd|nvme)\b",
+        starts="125",
+    ),
+    "gpu": SpecField(
+        r"\b("
+        r"rtx\s*\d{3,4}\s*(?:ti|super)?"
+        r"|gtx\s*\d{3,4}"
+        r"|radeon\s*(?:rx\s*)?\d{3,4}m?"
+        r"|p\d{3,4}"
+        r")\b",
+        starts="gpr",
+    ),
+    "screen_in": SpecField(
+        r"(?:^|(?<=[^0-9]))((?:1[0-9]|2[0-9])(?:[.,]\d)?)\s*(?:\"|''|inch|inci)",
+        starts="12",
+    ),
+})
+
+# Câmpurile structurate din specs_raw (tabelul de specificații PCGarage) pentru fiecare
+# specificație, în ordinea preferinței. Cheile se compară lowercase și fără diacritice;
+# o valoare care nu se potrivește cu pattern-ul câmpului trece la cheia următoare / regex.
+SPECS_RAW_KEYS = {
+    "cpu": ("model procesor", "procesor"),
+    "ram_gb": ("capacitate memorie", "memorie ram", "memorie"),
+    "gpu": ("model placa video", "placa video", "chipset video"),
+    "screen_in": ("diagonala display", "diagonala", "dimensiune ecran"),
+}
+
+_SPEC_KEY_FOLD = str.maketrans("ăâîșşțţ", "aaisstt")
+
+MODEL_STOP = {
+    "laptop", "notebook", "gaming", "business", "procesor", "processor",
+    "intel", "amd", "ryzen", "core", "geforce", "rtx", "gtx",
+    "ram", "ssd", "nvme", "hdd", "fhd", "wuxga", "ips", "oled",
+    "windows", "win", "no", "os",
+}
+
+NON_LAPTOP_KEYWORDS = [
+    "docking station", "statie laptop", "stație laptop",
+    "chromebox", "mini pc", "desktop", "tower", "unitate pc",
+    "unitate optica", "unitate optică",
+    "baterie laptop", "battery laptop",
+    "incarcator laptop", "încărcător laptop", "alimentator laptop",
+    "placa de baza", "placă de bază", "motherboard",
+    "trackpad", "touchpad",
+    "balama", "hinge",
+    "dezmembrez", "pentru piese", "pt piese",
+    "memorie laptop",
+    "memorie ram laptop",
+    "ventilator laptop",
+]
+
+# Titluri de piese de răcire ("radiator cooler laptop DELL"): un cuvânt din fiecare listă.
+COOLING_WORDS = ("radiator", "cooler", "culer", "ventilator")
+COOLING_LAPTOP_WORDS = ("laptop", "notebook")
+
+# Device-uri clar non-laptop (în titlu / în descriere).
+EXPLICIT_NON_LAPTOP = (
+    "iphone", "telefon", "smartphone",
+    "tablet", "tableta", "tabletă",
+    "mac studio", "surface pro",
+    "chromebox", "mini pc",
+    "cuptor microunde", "cuptoare microunde",
+)
+EXPLICIT_NON_LAPTOP_DESC = ("mac studio", "surface pro", "chromebox", "mini pc")
+
+MIN_PUBLI24_PRICE_RON = 300
+
+PCG_MODEL_RE = re.compile(r"/notebook-laptop/[^/]+/(?P<slug>[^/]+)/?$", re.I)
+
+# Coduri de model din slug-ul URL-ului PCGarage, în ordinea preferinței.
+PCG_SLUG_PATTERNS = (
+    r"\b(anv\d{2}-\d{2})\b",            # ANV15-52
+    r"\b(fx\d{3,4}[a-z]{1,3})\b",       # FX707VJ
+    r"\b([a-z]\d{4}[a-z]{2,4})\b",      # B1503CVA / P1503CVA / F1605ZA (fallback bun)
+    r"\b(\d{2}[a-z]{2,5}\d{1,3}[a-z]?)\b",  # 16iax10h / 15irx11 / 16imh9 (din slug)
+    r"\b(\d{2}-[a-z]{2}\d{4}[a-z]{2,3})\b",   # 17-cn3004nq
+)
+
+# model_guess-uri care sunt de fapt cuvinte de marketing
+PLAUSIBLE_MODEL_BANNED = frozenset({"perfect", "functional", "office", "business", "gaming"})
+
+# variante scrise despărțit, unite înainte de MODEL_NORM_RULES
+MODEL_TEXT_FIXES = {
+    "ellite book": "elitebook",
+    "elite book": "elitebook",
+    "pro book": "probook",
+    "think pad": "thinkpad",
+    "mac book": "macbook",
+    "fx 505": "fx505",
+    "fx 506": "fx506",
+    "fx 507": "fx507",
+    "fx 508": "fx508",
+}
+
+def plausible_model_guess(s: str | None) -> str | None:
+    if not s:
+        return None
+    x = s.strip()
+    low = x.lower()
+    if low in PLAUSIBLE_MODEL_BANNED:
+        return None
+    if len(x) < 4:
+        return None
+    if not re.search(r"[0-9]", x) and len(x.split()) == 1:
+        return None
+    return x
+
+def preprocess_model_text(s: str) -> str:
+    s = (s or "").strip().lower()
+    for bad, good in MODEL_TEXT_FIXES.items():
+        s = s.replace(bad, good)
+    s = re.sub(r"\s+", " ", s).strip()
+    return s
+
+def guess_model_from_pcgarage_url(url: str) -> str | None:
+    if not url:
+        return None
+    m = PCG_MODEL_RE.search(url)
+    if not m:
+        return None
+
+    slug = m.group("slug")
+
+    for pat in PCG_SLUG_PATTERNS:
+        mm = re.search(pat, slug, re.I)
+        if mm:
+            cand = mm.group(1).upper()
+            if cand.lower() not in MODEL_STOP and len(cand) >= 3:
+                return cand
+
+    return None
+
+
+def _upper(m: re.Match) -> str:
+    return m.group(1).upper()
+
+
+def _title(m: re.Match) -> str:
+    return re.sub(r"\s+", " ", m.group(1)).title()
+
+
+def _macbook(m: re.Match) -> str:
+    kind = m.group(1).title()
+    size = m.group(2)
+    return f"MacBook {kind} {size}" if size else f"MacBook {kind}"
+
+
+def _code_fallback(m: re.Match) -> str | None:
+    cand = m.group(1).upper()
+    if cand.lower() not in MODEL_STOP and len(cand) >= 3:
+        return cand
+    return None
+
+
+def _rule(pattern: str, fmt, keywords: tuple[str, ...] = (), exclude: tuple[str, ...] = ()) -> ModelRule:
+    return ModelRule(re.compile(pattern, re.I), fmt, keywords, exclude)
+
+
+# Tabelul ordonat pentru guess_model_norm (textul e deja lowercase, vezi preprocess_model_text).
+# keywords = literalul fără de care regex-ul nu are cum să se potrivească.
+MODEL_NORM_RULES = ModelRuleTable([
+    # ---------- Apple ----------
+    _rule(r"\bmacbook\s+retina\s+(1[0-6])\b", lambda m: f"MacBook {m.group(1)}", ("macbook",)),
+    _rule(r"\bmacbook\s+(air|pro)\b(?:.*?\b(1[3-6])\b)?", _macbook, ("macbook",)),
+
+    # ---------- Lenovo / coduri care încep cu cifre ----------
+    _rule(r"\b(\d{2}[a-z]{2,5}\d{1,3}[a-z]?)\b", _upper),                # 16imh9, 15irx11, 16iax10h
+    _rule(r"\b(thinkpad\s+[a-z]?\d{3,4})\b", _title, ("thinkpad",)),     # ThinkPad T550, X280
+    _rule(r"\b(thinkbook\s+\d{2}\s+g\d+\s+[a-z]{2,4})\b", _title, ("thinkbook",)),
+    _rule(r"\b(ideapad\s+\d{3,4}\s*[a-z0-9-]*)\b", _title, ("ideapad",)),  # Ideapad 700 15ISK / 100 15IBD
+    _rule(r"\b(110-17acl)\b", _upper, ("110-17acl",)),
+    _rule(r"\b(legion\s+pro\s+\d+)\b", _title, ("legion",)),
+    _rule(r"\b(yoga\s+pro\s+\d+)\b", _title, ("yoga",)),
+    _rule(r"\b([y]\d{3,4})\b", _upper),                                   # Y520, Y540
+    _rule(r"\b(legion\s+\d+(?:\s+[a-z0-9]{4,6})?)\b", _title, ("legion",)),
+
+    # ---------- HP ----------
+    _rule(r"\b(elitebook\s+\d{3}\s*g\d)\b", _title, ("elitebook",)),      # EliteBook 840 G5
+    _rule(r"\b(probook\s+x360\s+\d{3}\s*g\d)\b", _title, ("probook",)),  # ProBook x360 435 G8
+    _rule(r"\b(probook\s+\d{3}\s*g\d)\b", _title, ("probook",)),
+    _rule(r"\b(pavilion\s+dv\d)\b", _title, ("pavilion",)),                # Pavilion DV6
+    _rule(r"\b(hp\s+15s[a-z0-9-]*)\b", lambda m: m.group(1).upper().replace(" ", ""), ("hp",)),
+    _rule(r"\b(hp\s+(?:15|17|14|550|g7))\b", _upper, ("hp",)),
+    _rule(r"\b(elitebook\s+folio\s+\d{3}\s*g\d)\b", _title, ("elitebook",)),
+    _rule(r"\b(pavilion\s+\d{2}-[a-z0-9-]+)\b", _title, ("pavilion",)),
+    _rule(r"\b(14s-[a-z0-9-]+)\b", _upper, ("14s-",)),
+    _rule(
+        r"\b(elitebook\s+\d{3,4}[a-z]?[-\s]g\d)\b",
+        lambda m: re.sub(r"\s+", " ", m.group(1).replace("-", " ")).title(),
+        ("elitebook",),
+    ),
+
+    # ---------- Dell ----------
+    _rule(r"\b(xps\s+\d{1,2}\s+\d{4})\b", _title, ("xps",)),               # XPS 15 9560
+    _rule(r"\b(xps\s+\d{1,2})\b", _title, ("xps",)),                        # XPS 15 / XPS 17
+    _rule(r"\b(inspiron\s+\d{4})\b", _title, ("inspiron",)),
+    _rule(r"\b(latitude\s+\d{4})\b", _title, ("latitude",)),
+    _rule(r"\b(vostro\s+\d{4,6})\b", _title, ("vostro",)),                  # Vostro 153530
+    _rule(r"\bdell\s+(\d{4})\b", lambda m: m.group(1), ("dell",)),          # Dell 3558 / E5520 separat mai jos
+    _rule(r"\b(e\d{4})\b", _upper),                                        # E5520
+
+    # ---------- ASUS ----------
+    _rule(r"\b(x\d{3,4}[a-z]{0,3}(?:-[a-z0-9]+)?)\b", _upper),              # X540SA-XX004D / X552C
+    _rule(r"\b(fx\d{3,4}[a-z]{0,3})\b", _upper, ("fx",)),                    # FX505 / FX506 etc
+    _rule(r"\b(tuf\s+fx\d{3,4}[a-z]{0,3})\b", lambda m: re.sub(r"\s+", " ", m.group(1)).upper(), ("tuf",)),
+    _rule(r"\b(zenbook\s+\d{2})\b", _title, ("zenbook",)),
+    _rule(r"\b(zenbook)\b", lambda m: "Zenbook", ("zenbook",)),
+
+    # ---------- Acer ----------
+    _rule(r"\b(aspire\s+[a-z]?\d(?:-\d{3,4}[a-z]{0,3}|[a-z0-9]{3,6}))\b", _title, ("aspire",)),  # Aspire V / E1-522 / 5935G
+    _rule(r"\b(extensa\s+\d{1,2})\b", _title, ("extensa",)),
+    _rule(r"\b(e1-\d{3})\b", _upper, ("e1-",)),
+    _rule(r"\b(aspire\s+v)\b", lambda m: "Aspire V", ("aspire",)),
+
+    # ---------- Medion / altele ----------
+    _rule(r"\b(p\d{4})\b", _upper, exclude=("quadro", "nvidia")),          # P6620
+
+    # ---------- fallback cod alfanumeric ----------
+    _rule(r"\b([a-z]{1,4}\d{2,5}[a-z]{0,4}(?:-\d{2,6}[a-z0-9]{0,4})?)\b", _code_fallback),
+])
+
+
+@lru_cache(maxsize=32768)
+def _guess_model_norm(t: str) -> str | None:
+    return MODEL_NORM_RULES.first_match(t)
+
+
+def guess_model_norm(text: str) -> str | None:
+    """Prima regulă din MODEL_NORM_RULES care se potrivește; memoizat pe textul normalizat."""
+    t = preprocess_model_text(text).replace("™", " ").replace("®", " ")
+    return _guess_model_norm(t)
+
+def norm_brand(s: str | None) -> str | None:
+    if not s:
+        return None
+    x = s.strip().lower()
+    if x in BRAND_ALIASES:
+        return BRAND_ALIASES[x]
+    for k, v in BRAND_ALIASES.items():
+        if k in x:
+            return v
+    return s.strip()
+
+
+def _is_laptop(source: str, title: str, desc: str, price_ron: float | None = None) -> int:
+    src = (source or "").lower()
+    if src == "pcgarage":
+        return 1
+
+    t = (title or "").lower()
+    d = (desc or "").lower()
+
+    # Caz special: titluri de piese de răcire, de forma
+    # "radiator cooler laptop DELL", "radiator racire laptop HP" etc.
+    if any(w in t for w in COOLING_WORDS) and any(w in t for w in COOLING_LAPTOP_WORDS):
+        return 0
+
+    # 1) Prag minim doar pentru Publi24.
+    # Sub 300 RON apar frecvent piese, accesorii sau produse defecte.
+    if src == "publi24" and price_ron is not None:
+        try:
+            if float(price_ron) < MIN_PUBLI24_PRICE_RON:
+                return 0
+        except (TypeError, ValueError):
+            pass
+
+    # 2) Semnale clare de piesă/accesoriu în titlu.
+    if any(k in t for k in NON_LAPTOP_KEYWORDS):
+        return 0
+
+    # 3) Device-uri clar non-laptop.
+    if any(k in t for k in EXPLICIT_NON_LAPTOP):
+        return 0
+
+    if any(k in d for k in EXPLICIT_NON_LAPTOP_DESC):
+        return 0
+
+    return 1
+
+
+# (termen, familie, brand): primul rând al cărui termen apare în titlu câștigă; brand != None
+# -> rândul se aplică doar pentru brand_norm-ul respectiv. Doar termeni destul de stabili.
+MODEL_FAMILY_RULES: tuple[tuple[str, str, Optional[str]], ...] = (
+    # Lenovo
+    ("thinkpad", "ThinkPad", None),
+    ("thinkbook", "ThinkBook", None),
+    ("ideapad", "IdeaPad", None),
+    ("legion pro", "Legion Pro", None),
+    ("legion", "Legion", None),
+    ("yoga pro", "Yoga Pro", None),
+    ("yoga", "Yoga", None),
+    ("loq", "LOQ", None),
+
+    # ASUS
+    ("zenbook", "Zenbook", None),
+    ("vivobook", "Vivobook", None),
+    ("tuf", "TUF", None),
+    ("rog", "ROG", None),
+    ("republic of gamers", "ROG", None),
+
+    # Acer
+    ("aspire one", "Aspire One", None),
+    ("aspire", "Aspire", None),
+    ("nitro", "Nitro", None),
+    ("predator", "Predator", None),
+
+    # HP
+    ("elitebook", "EliteBook", None),
+    ("probook", "ProBook", None),
+    ("pavilion", "Pavilion", None),
+    ("spectre", "Spectre", None),
+    ("envy", "Envy", None),
+    ("chromebook", "Chromebook", None),
+    ("chrome", "Chromebook", None),
+    ("business", "Business", "hp"),
+
+    # Dell
+    ("latitude", "Latitude", None),
+    ("inspiron", "Inspiron", None),
+    ("xps", "XPS", None),
+    ("precision", "Precision", None),
+    ("vostro", "Vostro", None),
+
+    # Apple
+    ("macbook air", "MacBook Air", None),
+    ("macbook pro", "MacBook Pro", None),
+    ("macbook", "MacBook", None),
+
+    # MSI (de obicei au serii, dar păstrăm safe)
+    ("katana", "Katana", "msi"),
+    ("stealth", "Stealth", "msi"),
+    ("raider", "Raider", "msi"),
+    ("prestige", "Prestige", "msi"),
+
+    # Erazer (Medion)
+    ("erazer", "Erazer", None),
+)
+
+
+@lru_cache(maxsize=32768)
+def guess_model_family(brand_norm: str | None, title_norm: str) -> str | None:
+    """
+    Întoarce o familie 'safe' (nu inventează coduri), după MODEL_FAMILY_RULES.
+    Doar termeni destul de stabili: Aspire, Zenbook, ThinkPad, EliteBook etc.
+    """
+    t = (title_norm or "").lower()
+    b = (brand_norm or "").lower()
+
+    for term, family, brand in MODEL_FAMILY_RULES:
+        if term in t and (brand is None or b == brand):
+            return family
+    return None
+
+
+def build_title_std(
+    brand_norm: str | None,
+    model_family: str | None,
+    model_norm: str | None,
+    cpu: str | None,
+    ram_gb: int | None,
+    storage: str | None,
+    gpu: str | None,
+    screen_in: float | None,
+) -> str | None:
+    parts: list[str] = []
+
+    b = (brand_norm or "").strip()
+    fam = (model_family or "").strip()
+    mn = (model_norm or "").strip()
+
+    # dacă model_norm începe deja cu brand (ex: "HP 15S"), nu mai adăugăm brand separat
+    if b:
+        if not (mn.lower().startswith(b.lower() + " ") or fam.lower().startswith(b.lower() + " ")):
+            parts.append(b)
+
+    # dacă family este deja inclusă în model_norm (ex: model_norm="MacBook Air 13"), nu mai punem family
+    if fam:
+        if not (mn and fam.lower() in mn.lower()):
+            parts.append(fam)
+
+    if mn:
+        parts.append(mn)
+
+    # specs (scurte)
+    if cpu:
+        parts.append(cpu)
+    if ram_gb:
+        parts.append(f"{ram_gb}GB RAM")
+    if storage:
+        parts.append(storage.upper().replace("  ", " "))
+    if gpu:
+        parts.append(gpu.upper())
+    if screen_in:
+        # 15.6 -> "15.6"
+        parts.append(f'{screen_in:g}"')
+
+    if not parts:
+        return None
+
+    # dedup simplu (păstrează ordinea)
+    seen = set()
+    out = []
+    for p in parts:
+        key = p.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            out.append(p.strip())
+
+    return " ".join(out).strip() if out else None
+
+
+def specs_from_raw(specs: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Specificațiile citite din specs_raw prin SPECS_RAW_KEYS (doar câmpurile găsite)."""
+    if not specs:
+        return {}
+    by_key = {str(k).strip().lower().translate(_SPEC_KEY_FOLD): v for k, v in specs.items() if v}
+    out: Dict[str, Any] = {}
+    for field, keys in SPECS_RAW_KEYS.items():
+        for key in keys:
+            if key in by_key:
+                value = LAPTOP_SPECS.parse(field, str(by_key[key]))
+                if value is not None:
+                    out[field] = value
+                    break
+    return out
+
+
+# coloanele products_clean calculate de laptop_columns, în ordinea din tuplu
+LAPTOP_COLUMNS = (
+    "brand_norm", "condition_norm", "model_norm", "title_norm",
+    "model_family", "title_std",
+    "cpu_guess", "ram_gb", "storage_guess", "gpu_guess", "screen_in",
+    "is_laptop",
+)
+
+
+def laptop_columns(
+    source: Optional[str],
+    url: Optional[str],
+    title: Optional[str],
+    desc: Optional[str],
+    price_ron: Optional[float],
+    brand_guess: Optional[str],
+    model_guess: Optional[str],
+    specs: Optional[Dict[str, Any]],
+    base_condition: Optional[str] = None,
+) -> tuple:
+    """
+    Valorile pentru LAPTOP_COLUMNS ale unui anunț.
+    title = titlul deja curățat (title_clean); base_condition = condiția din câmpul structurat,
+    folosită doar dacă textul nu indică una.
+    """
+    source = source or ""
+    url = url or ""
+    title = title or ""
+    desc = desc or ""
+
+    t_norm = normalize_title(title)
+    is_laptop = _is_laptop(source, title, desc, price_ron)
+
+    b = norm_brand(brand_guess or "")
+    if not b:
+        low = f"{title} {desc}".lower()
+        for k, v in BRAND_ALIASES.items():
+            if k in low:
+                b = v
+                break
+
+    # model_norm (DOAR dacă e laptop)
+    m_norm = None
+    if is_laptop == 1:
+        if source.lower() == "pcgarage":
+            m_norm = (
+                guess_model_from_pcgarage_url(url)
+                or guess_model_norm(model_guess or "")
+                or guess_model_norm(t_norm)
+                or plausible_model_guess(model_guess)
+            )
+        else:
+            m_norm = (
+                guess_model_norm(model_guess or "")
+                or guess_model_norm(t_norm)
+                or plausible_model_guess(model_guess)
+            )
+
+    # condiție
+    cond = normalize_condition(
+        f"{title} {desc}",
+        source=source,
+        specs_raw=specs,
+    )
+
+    if source.lower() == "pcgarage":
+        cond = "new"
+
+    if not cond and base_condition:
+        cond = base_condition
+
+    if not cond and source.lower() == "publi24":
+        cond = "used"
+
+    # întâi câmpurile structurate (PCGarage), regex pe titlu + descriere doar pentru ce lipsește
+    spec = LAPTOP_SPECS.extract(f"{title} {desc}", known=specs_from_raw(specs))
+    cpu, ram, storage, gpu, scr = spec.cpu, spec.ram_gb, spec.storage, spec.gpu, spec.screen_in
+
+    # model_family + title_std (DOAR pt laptopuri)
+    fam = None
+    t_std = None
+    if is_laptop == 1:
+        fam = guess_model_family(b, t_norm)
+        t_std = build_title_std(b, fam, m_norm, cpu, ram, storage, gpu, scr)
+
+    return (
+        b, cond, m_norm, t_norm,
+        fam, t_std,
+        cpu, ram, storage, gpu, scr,
+        is_laptop,
+    )
+
+
+# Crește la schimbări de logică în laptop_columns / helperi care nu ating listele și tabelele
+# de mai sus (ex. ordinea pașilor din _is_laptop, build_title_std, normalize_condition).
+NORM_LOGIC_REV = 1
+
+
+def _fmt_source(fmt) -> str:
+    """Formatorul unei ModelRule ca text: sursa funcției (și lambda-urile diferă între ele)."""
+    if isinstance(fmt, str):
+        return fmt
+    try:
+        return inspect.getsource(fmt).strip()
+    except (OSError, TypeError):
+        return getattr(fmt, "__qualname__", repr(fmt))
+
+
+def _rules_hash(payload: dict) -> str:
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=sorted).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:12]
+
+
+def compute_norm_rules_versions() -> dict[int, str]:
+    """
+    Versiunea regulilor de normalizare, pe is_laptop: rândurile non-laptop depind doar de
+    regulile de bază (brand, is_laptop, specificații), laptopurile și de tabelele de model /
+    familie. O modificare în MODEL_NORM_RULES / MODEL_FAMILY_RULES invalidează doar laptopurile.
+    """
+    base = {
+        "logic_rev": NORM_LOGIC_REV,
+        "brand_aliases": BRAND_ALIASES,
+        "non_laptop": NON_LAPTOP_KEYWORDS,
+        "cooling": [COOLING_WORDS, COOLING_LAPTOP_WORDS],
+        "explicit_non_laptop": [EXPLICIT_NON_LAPTOP, EXPLICIT_NON_LAPTOP_DESC],
+        "min_publi24_price": MIN_PUBLI24_PRICE_RON,
+        "specs": {name: list(f) for name, f in LAPTOP_SPECS.fields.items()},
+        "specs_raw_keys": SPECS_RAW_KEYS,
+    }
+    model = {
+        "model_stop": MODEL_STOP,
+        "plausible_banned": PLAUSIBLE_MODEL_BANNED,
+        "text_fixes": MODEL_TEXT_FIXES,
+        "pcg_slug": [PCG_MODEL_RE.pattern, PCG_SLUG_PATTERNS],
+        "model_norm": [
+            (r.regex.pattern, _fmt_source(r.fmt), r.keywords, r.exclude)
+            for r in MODEL_NORM_RULES.rules
+        ],
+        "model_family": MODEL_FAMILY_RULES,
+    }
+    return {0: _rules_hash(base), 1: _rules_hash({**base, **model})}
+
+
+NORM_RULES_VERSIONS = compute_norm_rules_versions()
+
+
+def norm_input_hash(*inputs: Any) -> str:
+    """Hash scurt peste argumentele laptop_columns (specs ca JSON text, nedecodat)."""
+    return hashlib.blake2b(repr(inputs).encode("utf-8"), digest_size=8).hexdigest()
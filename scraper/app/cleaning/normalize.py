@@ -109,7 +109,12 @@ def effective_posted_at(p: Product) -> datetime:
     - dacă există posted_at -> folosim
     - altfel -> scraped_at (ex: PCGarage nu are posted_at în DB la tine)
     """
-    dt = p.posted_at or p.scraped_at
+    return effective_datetime(p.posted_at, p.scraped_at)
+
+
+def effective_datetime(posted_at: Optional[datetime], scraped_at: datetime) -> datetime:
+    """Varianta fără Product a lui effective_posted_at (posted_at, altfel scraped_at), în UTC."""
+    dt = posted_at or scraped_at
     if dt.tzinfo is None:
         dt = dt.replace(tzinfo=timezone.utc)
     return dt.astimezone(timezone.utc)
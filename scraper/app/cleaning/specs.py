@@ -0,0 +1,98 @@
+"""
+Extragerea specificațiilor (CPU, RAM, stocare, GPU, diagonală) dintr-un text, într-o singură
+trecere: un SpecExtractor combină regex-urile câmpurilor într-un pattern de lookahead-uri cu
+nume și parcurge textul o singură dată, în loc de câte un search complet pe câmp.
+
+Folosit de app.cleaning.laptop (coloanele products_clean) și de app.filters (semnalele tehnice
+ale filtrului Publi24), fiecare cu propriul set de pattern-uri.
+"""
+from __future__ import annotations
+
+import re
+from typing import Any, NamedTuple, Optional
+
+_NUMBER_RE = re.compile(r"\d+(?:[.,]\d)?")
+
+
+class SpecGuess(NamedTuple):
+    """Prima potrivire din text pentru fiecare câmp (None = negăsit)."""
+    cpu: Optional[str] = None
+    ram_gb: Optional[int] = None
+    storage: Optional[str] = None
+    gpu: Optional[str] = None
+    screen_in: Optional[float] = None
+
+
+class SpecField(NamedTuple):
+    """pattern = exact regex-ul care s-ar căuta separat; starts = caracterele cu care poate începe o potrivire."""
+    pattern: str
+    starts: str
+
+
+def _leading_number(s: str) -> str:
+    return _NUMBER_RE.match(s).group()
+
+
+# conversia textului potrivit în valoarea din SpecGuess
+_CONVERTERS = {
+    "cpu": str.strip,
+    "ram_gb": lambda s: int(_leading_number(s)),
+    "storage": str.strip,
+    "gpu": str.strip,
+    "screen_in": lambda s: float(_leading_number(s).replace(",", ".")),
+}
+
+
+class SpecExtractor:
+    """
+    fields = {câmp SpecGuess: SpecField}. Rezultatul e identic cu câte un re.search pe câmp:
+    pattern-ul combinat încearcă, în fiecare poziție, lookahead-urile câmpurilor încă negăsite;
+    după fiecare potrivire căutarea continuă de la poziția următoare doar cu câmpurile rămase
+    (pattern-urile pe subseturi se compilează o singură dată, la prima folosire).
+
+    Condiție: două câmpuri nu se pot potrivi din aceeași poziție (ex. RAM cere "gb" după
+    număr, diagonala cere '"' / "inch"). Valorile numerice (ram_gb, screen_in) sunt numărul
+    de la începutul potrivirii.
+    """
+
+    def __init__(self, fields: dict[str, SpecField], flags: int = re.I):
+        unknown = set(fields) - set(SpecGuess._fields)
+        if unknown:
+            raise ValueError(f"Câmpuri necunoscute în SpecExtractor: {sorted(unknown)}")
+        self.fields = fields
+        self.flags = flags
+        self._compiled: dict[tuple[str, ...], re.Pattern] = {}
+
+    def _pattern(self, names: tuple[str, ...]) -> re.Pattern:
+        rx = self._compiled.get(names)
+        if rx is None:
+            # prefiltru ieftin pe primul caracter, apoi lookahead-ul fiecărui câmp
+            starts = "".join(sorted({c for n in names for c in self.fields[n].starts}))
+            alts = "|".join(f"(?=(?P<{n}>{self.fields[n].pattern}))" for n in names)
+            rx = self._compiled[names] = re.compile(f"(?=[{re.escape(starts)}])(?:{alts})", self.flags)
+        return rx
+
+    def parse(self, name: str, value: str) -> Optional[Any]:
+        """Valoarea unui câmp dintr-un text scurt deja atribuit lui (ex. o celulă de specificații)."""
+        m = self._pattern((name,)).search(value or "")
+        return _CONVERTERS[name](m.group(name)) if m else None
+
+    def extract(self, text: str, known: Optional[dict[str, Any]] = None) -> SpecGuess:
+        """
+        known = valori deja stabilite (ex. din specificațiile structurate, prin parse);
+        regex-urile rulează pe text doar pentru câmpurile rămase.
+        """
+        text = text or ""
+        known = {n: v for n, v in (known or {}).items() if v is not None}
+        found: dict[str, str] = {}
+        names = tuple(n for n in self.fields if n not in known)
+        pos = 0
+        while names:
+            m = self._pattern(names).search(text, pos)
+            if m is None:
+                break
+            # un singur câmp se potrivește într-o poziție; grupul lui e ultimul închis
+            found[m.lastgroup] = m.group(m.lastgroup)
+            names = tuple(n for n in names if n != m.lastgroup)
+            pos = m.start() + 1
+        return SpecGuess(**known, **{name: _CONVERTERS[name](value) for name, value in found.items()})
@@ -20,6 +20,26 @@ class HttpConfig:
 # Instanțiem obiectul de configurare pentru a fi folosit în app
 HTTP = HttpConfig()
 
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None:
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off", "")
+
+
+@dataclass(frozen=True)
+class StorageConfig:
+    store_description_html: bool = True  # STORE_DESCRIPTION_HTML=0 -> nu mai salvăm HTML-ul deloc
+    html_compress_level: int = 6          # nivel zlib pentru product_blobs
+    clean_on_ingest: bool = False         # CLEAN_ON_INGEST=1 -> products_clean scris odată cu products
+
+
+STORAGE = StorageConfig(
+    store_description_html=_env_flag("STORE_DESCRIPTION_HTML", True),
+    clean_on_ingest=_env_flag("CLEAN_ON_INGEST", False),
+)
+
 BASE_DIR = Path(__file__).resolve().parents[2]
 DB_PATH = Path(os.getenv("DB_PATH", str(BASE_DIR / "data_out" / "products.db")))
 
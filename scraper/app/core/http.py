@@ -147,6 +147,7 @@ class HttpClient:
         domain0 = self._normalize_domain(parts0.netloc)
         policy0 = self._get_policy(domain0)
         max_retries = int(policy0.get("max_retries", HTTP.max_retries))
+        backoff_base = float(policy0.get("backoff_base_s", HTTP.backoff_base_s))
 
         for attempt in range(1, max_retries + 1):
             start = time.time()
@@ -172,7 +173,7 @@ class HttpClient:
                 # rate-limit handling (reintrodus)
                 if resp.status_code in (429, 503):
                     self.failure_counter[domain] += 1
-                    backoff = HTTP.backoff_base_s * (2 ** (attempt - 1))
+                    backoff = backoff_base * (2 ** (attempt - 1))
                     logger.warning("Rate limited (%s) la %s. Retry %s după %ss...", resp.status_code, url, attempt, backoff)
                     time.sleep(backoff)
                     continue
@@ -216,7 +217,7 @@ class HttpClient:
             
             except requests.RequestException as e:
                 last_exc = e
-                backoff = HTTP.backoff_base_s * (2 ** (attempt - 1))
+                backoff = backoff_base * (2 ** (attempt - 1))
                 logger.warning("Eroare rețea la %s: %s. Retry în %ss...", url, e, backoff)
                 time.sleep(backoff)
 
@@ -2,8 +2,11 @@ from __future__ import annotations
 
 import re
 import html
-from urllib.parse import urljoin
-from typing import Optional
+import hashlib
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from urllib.parse import urljoin, urlsplit
+from typing import Callable, NamedTuple, Optional
 
 SPACE_RE = re.compile(r"\s+")
 MPN_RE = re.compile(r"\b([A-Z0-9]{2,6}[-_][A-Z0-9]{2,10}(?:[-_][A-Z0-9]{1,10})?)\b")
@@ -18,20 +21,6 @@ MACBOOK_RE = re.compile(r"\bmacbook\b", re.IGNORECASE)
 BAD_PREFIXES = ("RTX", "GTX", "SSD", "RAM", "CORE", "RYZEN", "INTEL", "AMD", "GB", "HZ", "WUXGA", "FHD", "OLED")
 
 
-MODEL_PATTERNS = [
-    # ThinkPad T480, X1 Carbon, etc.
-    re.compile(r"\b(thinkpad)\s+([a-z]?\d{3,4}[a-z]?)\b", re.I),
-    # Dell Latitude 5420 / Precision 5560
-    re.compile(r"\b(latitude|precision|vostro|inspiron)\s+(\d{4})\b", re.I),
-    # HP ProBook 450 G8 / EliteBook 840 G7 / Victus 15
-    re.compile(r"\b(probook|elitebook)\s+(\d{3,4})\s*(g\d)\b", re.I),
-    re.compile(r"\b(victus)\s+(\d{2})\b", re.I),
-    # ASUS ROG Strix G16 / TUF F15 / Vivobook 15
-    re.compile(r"\b(rog|tuf|vivobook|zenbook)\s+([a-z]?\d{2,4}[a-z]?)\b", re.I),
-    # MacBook Pro 14 / Air 13
-    re.compile(r"\b(macbook)\s+(air|pro)\s+(\d{2})\b", re.I),
-]
-
 def clean_text(s: str | None) -> str | None:
     if s is None:
         return None
@@ -41,6 +30,54 @@ def clean_text(s: str | None) -> str | None:
     return s or None
 
 
+# Publi24: .../anunt/<slug>/<id>.html (slug-ul se schimbă cu titlul, id-ul rămâne)
+PUBLI24_AD_ID_RE = re.compile(r"/anunt/(?:[^/]+/)*(?P<id>[0-9a-z]+)\.html$", re.IGNORECASE)
+
+
+def listing_id(url: str) -> str:
+    """
+    Identificatorul canonic al anunțului, derivat din URL:
+      - Publi24: "publi24:<id>" (id-ul din /<id>.html, independent de slug / host / query);
+      - altfel (ex. PCGarage): host fără www + path fără query și fără "/" final.
+    """
+    parts = urlsplit(url.strip())
+    m = PUBLI24_AD_ID_RE.search(parts.path)
+    if m:
+        return f"publi24:{m.group('id').lower()}"
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    return f"{host}{parts.path.rstrip('/').lower()}"
+
+
+def listing_key(url: str) -> int:
+    """Cheie INTEGER (63 biți, pozitivă) pentru listing_id(url) - cheia de join în products.db."""
+    digest = hashlib.blake2b(listing_id(url).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") & 0x7FFF_FFFF_FFFF_FFFF
+
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def epoch_ms(dt: datetime | None) -> int | None:
+    """Milisecunde de la epoch (UTC) pentru coloanele *_ms; datetime fără tzinfo e considerat UTC."""
+    if dt is None:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return (dt - _EPOCH) // timedelta(milliseconds=1)
+
+
+def iso_to_epoch_ms(value: str | None) -> int | None:
+    """Ca epoch_ms, pentru textul ISO-8601 deja salvat în DB (None dacă lipsește / nu se parsează)."""
+    if not value:
+        return None
+    try:
+        return epoch_ms(datetime.fromisoformat(str(value).strip().replace("Z", "+00:00")))
+    except ValueError:
+        return None
+
+
 def to_absolute_url(base_url: str, href: str | None) -> str | None:
     if not href:
         return None
@@ -70,82 +107,157 @@ def guess_brand(title: str | None) -> str | None:
     return None
 
 
-def guess_model(title: str) -> Optional[str]:
-    t = (title or "").strip()
-    if not t:
+class ModelRule(NamedTuple):
+    """
+    O regulă dintr-un tabel ordonat de modele (prima regulă care întoarce ceva câștigă).
+    keywords = prefiltru: regex-ul se încearcă doar dacă textul conține măcar unul dintre ele
+    (() = mereu); exclude = regula se sare dacă textul conține unul dintre ele.
+    fmt primește match-ul; None -> se trece la regula următoare.
+    """
+    regex: re.Pattern
+    fmt: Callable[[re.Match], Optional[str]]
+    keywords: tuple[str, ...] = ()
+    exclude: tuple[str, ...] = ()
+
+
+# Singurele caractere pe care re.IGNORECASE le potrivește cu o literă ASCII, dar str.lower()
+# nu le transformă în ea. Le pliem înainte de prefiltru, ca acesta să nu sară o regulă
+# pe care regex-ul ar fi potrivit-o.
+_RULE_FOLD = str.maketrans({"İ": "i", "ı": "i", "ſ": "s"})
+
+
+class ModelRuleTable:
+    """
+    Tabel ordonat de ModelRule, compilat o singură dată. La fiecare apel se caută o dată
+    vocabularul de keywords al tabelului în text; regulile ale căror keywords lipsesc nu
+    ajung la regex.
+    """
+
+    def __init__(self, rules: list[ModelRule]):
+        self.rules = tuple(rules)
+        self.vocab = tuple(sorted({k for r in self.rules for k in (*r.keywords, *r.exclude)}))
+
+    def first_match(self, text: str) -> Optional[str]:
+        low = text.translate(_RULE_FOLD).lower()
+        present = {k for k in self.vocab if k in low}
+        for rule in self.rules:
+            if rule.keywords and present.isdisjoint(rule.keywords):
+                continue
+            if rule.exclude and not present.isdisjoint(rule.exclude):
+                continue
+            m = rule.regex.search(text)
+            if m:
+                out = rule.fmt(m)
+                if out:
+                    return out
         return None
 
+
+def _join_groups(m: re.Match) -> str:
+    return " ".join(p for p in m.groups() if p).strip()
+
+
+def _join_groups_collapsed(m: re.Match) -> str:
+    return SPACE_RE.sub(" ", _join_groups(m)).strip()
+
+
+def _loq(m: re.Match) -> str:
+    essential = (m.group(1) or "").strip()
+    code = m.group(2).upper()
+    return f"LOQ Essential {code}" if essential else f"LOQ {code}"
+
+
+# Ordinea contează: pattern-urile existente (prioritare), apoi seriile pe brand, apoi formatele speciale.
+GUESS_MODEL_RULES = ModelRuleTable([
     # 1) pattern-urile existente (prioritare)
-    for rx in MODEL_PATTERNS:
-        m = rx.search(t)
-        if m:
-            parts = [p for p in m.groups() if p]
-            out = " ".join(parts).strip()
-            return out or None
+    # ThinkPad T480, X1 Carbon, etc.
+    ModelRule(re.compile(r"\b(thinkpad)\s+([a-z]?\d{3,4}[a-z]?)\b", re.I), _join_groups, ("thinkpad",)),
+    # Dell Latitude 5420 / Precision 5560
+    ModelRule(
+        re.compile(r"\b(latitude|precision|vostro|inspiron)\s+(\d{4})\b", re.I),
+        _join_groups,
+        ("latitude", "precision", "vostro", "inspiron"),
+    ),
+    # HP ProBook 450 G8 / EliteBook 840 G7 / Victus 15
+    ModelRule(re.compile(r"\b(probook|elitebook)\s+(\d{3,4})\s*(g\d)\b", re.I), _join_groups, ("probook", "elitebook")),
+    ModelRule(re.compile(r"\b(victus)\s+(\d{2})\b", re.I), _join_groups, ("victus",)),
+    # ASUS ROG Strix G16 / TUF F15 / Vivobook 15
+    ModelRule(
+        re.compile(r"\b(rog|tuf|vivobook|zenbook)\s+([a-z]?\d{2,4}[a-z]?)\b", re.I),
+        _join_groups,
+        ("rog", "tuf", "vivobook", "zenbook"),
+    ),
+    # MacBook Pro 14 / Air 13
+    ModelRule(re.compile(r"\b(macbook)\s+(air|pro)\s+(\d{2})\b", re.I), _join_groups, ("macbook",)),
 
     # 2) Brand/series keywords (ex: ThinkPad P51, Legion 5, Nitro V 15)
-    SERIES_PATTERNS = [
-        re.compile(r"\b(thinkpad)\s+([a-z]?\d{2,4}[a-z]{0,3})\b", re.IGNORECASE),
-        re.compile(r"\b(legion)\s+(pro\s+\d+|slim\s+\d+|\d+)\b", re.IGNORECASE),
-        re.compile(r"\b(ideapad)\s+([a-z0-9 ]{1,20}?)\s+([a-z]{0,3}\d{2,4}[a-z0-9]{0,6})\b", re.IGNORECASE),
-        re.compile(r"\b(nitro)\s+([a-z]?\s*v\s*\d{1,2})\b", re.IGNORECASE),
-        re.compile(r"\b(vivobook)\s+([a-z0-9]{4,10})\b", re.IGNORECASE),
-        re.compile(r"\b(expertbook)\s+([a-z0-9]{3,12})\b", re.IGNORECASE),
-        re.compile(r"\b(zenbook)\s+([a-z0-9]{3,12})\b", re.IGNORECASE),
-        re.compile(r"\b(omen|pavilion|probook|elitebook)\s+([a-z0-9\-]{2,12})\b", re.IGNORECASE),
-        re.compile(r"\b(precision|latitude|inspiron|xps)\s+(\d{3,4})\b", re.IGNORECASE),
-        re.compile(r"\b(macbook)\s+(air|pro)\b", re.IGNORECASE),
-    ]
-    for rx in SERIES_PATTERNS:
-        m = rx.search(t)
-        if m:
-            parts = [p for p in m.groups() if p]
-            out = " ".join(parts)
-            out = re.sub(r"\s+", " ", out).strip()
-            return out or None
+    ModelRule(re.compile(r"\b(thinkpad)\s+([a-z]?\d{2,4}[a-z]{0,3})\b", re.I), _join_groups_collapsed, ("thinkpad",)),
+    ModelRule(re.compile(r"\b(legion)\s+(pro\s+\d+|slim\s+\d+|\d+)\b", re.I), _join_groups_collapsed, ("legion",)),
+    ModelRule(
+        re.compile(r"\b(ideapad)\s+([a-z0-9 ]{1,20}?)\s+([a-z]{0,3}\d{2,4}[a-z0-9]{0,6})\b", re.I),
+        _join_groups_collapsed,
+        ("ideapad",),
+    ),
+    ModelRule(re.compile(r"\b(nitro)\s+([a-z]?\s*v\s*\d{1,2})\b", re.I), _join_groups_collapsed, ("nitro",)),
+    ModelRule(re.compile(r"\b(vivobook)\s+([a-z0-9]{4,10})\b", re.I), _join_groups_collapsed, ("vivobook",)),
+    ModelRule(re.compile(r"\b(expertbook)\s+([a-z0-9]{3,12})\b", re.I), _join_groups_collapsed, ("expertbook",)),
+    ModelRule(re.compile(r"\b(zenbook)\s+([a-z0-9]{3,12})\b", re.I), _join_groups_collapsed, ("zenbook",)),
+    ModelRule(
+        re.compile(r"\b(omen|pavilion|probook|elitebook)\s+([a-z0-9\-]{2,12})\b", re.I),
+        _join_groups_collapsed,
+        ("omen", "pavilion", "probook", "elitebook"),
+    ),
+    ModelRule(
+        re.compile(r"\b(precision|latitude|inspiron|xps)\s+(\d{3,4})\b", re.I),
+        _join_groups_collapsed,
+        ("precision", "latitude", "inspiron", "xps"),
+    ),
+    ModelRule(re.compile(r"\b(macbook)\s+(air|pro)\b", re.I), _join_groups_collapsed, ("macbook",)),
 
     # 2.1) Lenovo ThinkBook: "ThinkBook 16 G8 IRL"
-    m = re.search(r"\bThinkBook\s+(\d{2})\s+G(\d)\s+([A-Z0-9]{2,6})\b", t, re.IGNORECASE)
-    if m:
-        return f"ThinkBook {m.group(1)} G{m.group(2)} {m.group(3).upper()}"
-
+    ModelRule(
+        re.compile(r"\bThinkBook\s+(\d{2})\s+G(\d)\s+([A-Z0-9]{2,6})\b", re.I),
+        lambda m: f"ThinkBook {m.group(1)} G{m.group(2)} {m.group(3).upper()}",
+        ("thinkbook",),
+    ),
     # 2.2) Lenovo LOQ: "LOQ 15IAX9" / "LOQ Essential 15IRX11"
-    m = re.search(r"\bLOQ\s+(Essential\s+)?(\d{2}[A-Z0-9]{3,6})\b", t, re.IGNORECASE)
-    if m:
-        essential = (m.group(1) or "").strip()
-        code = m.group(2).upper()
-        if essential:
-            return f"LOQ Essential {code}"
-        return f"LOQ {code}"
-
+    ModelRule(re.compile(r"\bLOQ\s+(Essential\s+)?(\d{2}[A-Z0-9]{3,6})\b", re.I), _loq, ("loq",)),
     # 2.3) Lenovo V15: "V15 G4 IRU" / "V15 G4 AMN" (acceptă și V15 lipit)
-    m = re.search(r"\bV\s?(\d{2})\s+G(\d)\s+([A-Z]{2,4})\b", t, re.IGNORECASE)
-    if m:
-        return f"V{m.group(1)} G{m.group(2)} {m.group(3).upper()}"
-
+    ModelRule(
+        re.compile(r"\bV\s?(\d{2})\s+G(\d)\s+([A-Z]{2,4})\b", re.I),
+        lambda m: f"V{m.group(1)} G{m.group(2)} {m.group(3).upper()}",
+    ),
     # 2.4) HP 17-cn3004nq (acceptă și forme cu spații / fără cratimă)
     # ex: "17-cn3004nq", "17 cn3004nq", "17cn3004nq" -> normalizează la "17-cn3004nq"
-    m = re.search(r"\b(\d{2})\s*[- ]?\s*([a-z]{2})\s*(\d{3,4})([a-z0-9]{0,3})\b", t, re.IGNORECASE)
-    if m:
-        return f"{m.group(1)}-{m.group(2).lower()}{m.group(3)}{(m.group(4) or '').lower()}"
-
+    ModelRule(
+        re.compile(r"\b(\d{2})\s*[- ]?\s*([a-z]{2})\s*(\d{3,4})([a-z0-9]{0,3})\b", re.I),
+        lambda m: f"{m.group(1)}-{m.group(2).lower()}{m.group(3)}{(m.group(4) or '').lower()}",
+    ),
     # 2.5) Gigabyte A16 3VH / A16 CTH
-    m = re.search(r"\bA(\d{2})\s+([A-Z0-9]{3})\b", t, re.IGNORECASE)
-    if m:
-        return f"A{m.group(1)} {m.group(2).upper()}"
-
-    # 3) Fallback: caută coduri alfanumerice “de model” (F1605ZA, ANV15-52, 3750ZG etc),
-    # dar evită CPU/GPU/RAM/SSD.
-    CODE_RX = re.compile(r"\b([A-Z]{1,5}\d{2,5}[A-Z]{0,4}(?:[-/][A-Z0-9]{2,6})?)\b")
-    BAD_CODE_RX = re.compile(
-        r"^(i[3579]-?\d{3,5}[a-z]{0,3}|"
-        r"rtx\d{3,5}(ti)?|gtx\d{3,5}(ti)?|mx\d{3,4}|"
-        r"ddr\d|"
-        r"\d{1,3}gb|\d{1,2}tb|"
-        r"\d{2}\.?(\d)?hz|"
-        r"fhd|wuxga|qhd|uhd|oled)$",
-        re.IGNORECASE,
-    )
+    ModelRule(re.compile(r"\bA(\d{2})\s+([A-Z0-9]{3})\b", re.I), lambda m: f"A{m.group(1)} {m.group(2).upper()}"),
+])
+
+# 3) Fallback: coduri alfanumerice "de model" (F1605ZA, ANV15-52, 3750ZG etc), dar fără CPU/GPU/RAM/SSD.
+CODE_RX = re.compile(r"\b([A-Z]{1,5}\d{2,5}[A-Z]{0,4}(?:[-/][A-Z0-9]{2,6})?)\b")
+BAD_CODE_RX = re.compile(
+    r"^(i[3579]-?\d{3,5}[a-z]{0,3}|"
+    r"rtx\d{3,5}(ti)?|gtx\d{3,5}(ti)?|mx\d{3,4}|"
+    r"ddr\d|"
+    r"\d{1,3}gb|\d{1,2}tb|"
+    r"\d{2}\.?(\d)?hz|"
+    r"fhd|wuxga|qhd|uhd|oled)$",
+    re.IGNORECASE,
+)
+
+# 4) Ultim fallback: modele simple gen "15s", "G7", "T400"
+SIMPLE_MODEL_RX = re.compile(r"\b([A-Z]\d{3,4}|15s|g7|t\d{3,4})\b", re.IGNORECASE)
+
+
+@lru_cache(maxsize=32768)
+def _guess_model(t: str) -> Optional[str]:
+    out = GUESS_MODEL_RULES.first_match(t)
+    if out:
+        return out
 
     candidates: list[str] = []
     for m in CODE_RX.finditer(t):
@@ -162,10 +274,16 @@ def guess_model(title: str) -> Optional[str]:
         candidates.sort(key=len, reverse=True)
         return candidates[0]
 
-    # 4) Ultim fallback: modele simple gen "15s", "G7", "T400"
-    SIMPLE_RX = re.compile(r"\b([A-Z]\d{3,4}|15s|g7|t\d{3,4})\b", re.IGNORECASE)
-    m = SIMPLE_RX.search(t)
+    m = SIMPLE_MODEL_RX.search(t)
     if m:
         return m.group(1)
 
-    return None
\ No newline at end of file
+    return None
+
+
+def guess_model(title: str) -> Optional[str]:
+    """Modelul ghicit din titlu; memoizat pe titlul curățat (re-scrape-urile repetă titlurile)."""
+    t = (title or "").strip()
+    if not t:
+        return None
+    return _guess_model(t)
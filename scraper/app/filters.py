@@ -1,5 +1,9 @@
+import hashlib
+import json
 import re
 
+from app.cleaning.specs import SpecExtractor, SpecField
+
 # 1) HARD BAN strict - termeni clar non-laptop sau clar accessory-only
 HARD_BAN_STRICT = [
     # audio / periferice / retea / electrocasnice IT non-laptop
@@ -137,15 +141,206 @@ RE_CPU = re.compile(r"\b(i[3579]-?\d{3,5}[a-z]{0,2}|ryzen\s*[3579]|r[3579]\s*\d{
 RE_RAM = re.compile(r"\b(4|8|12|16|24|32|64)\s*gb\b", re.IGNORECASE)
 RE_STORAGE = re.compile(r"\b(128|256|512|1024|2048)\s*gb\b|\b(1|2)\s*tb\b", re.IGNORECASE)
 
+# Semnalele tehnice într-un singur finditer (RAM și stocare sunt câmpuri separate).
+# RE_INCH nu e case-insensitive, deci păstrăm asta și în pattern-ul combinat.
+SPECS = SpecExtractor({
+    "screen_in": SpecField(f"(?-i:{RE_INCH.pattern})", starts="1"),
+    "cpu": SpecField(RE_CPU.pattern, starts="ir"),
+    "ram_gb": SpecField(RE_RAM.pattern, starts="123468"),
+    "storage": SpecField(RE_STORAGE.pattern, starts="125"),
+})
+
+WORD_CHAR_RE = re.compile(r"\w")
+
+LAPTOP_WORDS = ["laptop", "notebook", "macbook"]
+
+BUNDLE_SUSPICIOUS_EXTRA = [
+    "diagnoza", "diagnoză", "tester auto", "interfata", "interfață",
+    "imprimanta", "imprimantă", "monitor", "telefon", "tableta", "tabletă"
+]
+
+EXPLICIT_NON_LAPTOP = [
+    "surface pro", "mac studio", "chromebox", "mini pc"
+]
+
+
+def _trie_pattern(words) -> str:
+    """
+    Construiește un regex de tip trie din lista de cuvinte (prefixele comune sunt
+    factorizate), ca potrivirea să nu încerce fiecare cuvânt pe rând.
+    Ramurile sunt greedy, deci într-o poziție dată se obține cel mai lung cuvânt.
+    """
+    trie: dict = {}
+    for w in words:
+        node = trie
+        for ch in w:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        is_end = "" in node
+        if len(branches) == 1 and not is_end:
+            return branches[0]
+        alt = "(?:" + "|".join(branches) + ")"
+        return alt + "?" if is_end else alt
+
+    return build(trie)
+
+
+def _is_boundary(left: str, right: str) -> bool:
+    return bool(WORD_CHAR_RE.match(left)) != bool(WORD_CHAR_RE.match(right))
+
+
+class KeywordMatcher:
+    """
+    Matcher precompilat pentru mai multe liste de cuvinte-cheie.
+
+    O singură trecere `finditer` peste text găsește, în fiecare poziție, cel mai
+    lung cuvânt din liste; cuvintele mai scurte care încep în aceeași poziție
+    (ex: "stick" în "stick usb") se deduc din tabela de prefixe calculată la import.
+    Astfel rezultatul este identic cu câte un `re.search` pentru fiecare cuvânt.
+    """
+
+    def __init__(self, lists: dict[str, list[str]], word_boundary: bool = True):
+        self.lists = lists
+        self.word_boundary = word_boundary
+        self.index = {name: {w: i for i, w in reversed(list(enumerate(words)))} for name, words in lists.items()}
+
+        vocab: dict[str, None] = {}
+        for words in lists.values():
+            vocab.update(dict.fromkeys(words))
+
+        trie = _trie_pattern(vocab)
+        if word_boundary:
+            self._scan = re.compile(rf"\b(?=({trie})\b)")
+        else:
+            self._scan = re.compile(rf"(?=({trie}))")
+
+        # pentru fiecare cuvânt: cuvintele din vocabular care se potrivesc în aceeași poziție
+        self._same_start: dict[str, tuple[str, ...]] = {}
+        for w in vocab:
+            shorter = [
+                p for p in vocab
+                if len(p) < len(w) and w.startswith(p)
+                and (not word_boundary or _is_boundary(w[len(p) - 1], w[len(p)]))
+            ]
+            self._same_start[w] = (w, *shorter)
+
+    def scan(self, text: str) -> list[tuple[int, str]]:
+        """Toate potrivirile (poziție, cuvânt), inclusiv cele suprapuse."""
+        out: list[tuple[int, str]] = []
+        for m in self._scan.finditer(text):
+            start = m.start()
+            out.extend((start, w) for w in self._same_start[m.group(1)])
+        return out
+
+    def hits(self, text: str) -> set[str]:
+        return {w for _, w in self.scan(text)}
+
+    def first(self, hits: set[str], list_name: str) -> str | None:
+        """Primul cuvânt din lista `list_name` (în ordinea listei) găsit în `hits`."""
+        idx = self.index[list_name]
+        found = [w for w in hits if w in idx]
+        return min(found, key=idx.__getitem__) if found else None
+
+    def any(self, hits: set[str], list_name: str) -> bool:
+        idx = self.index[list_name]
+        return any(w in idx for w in hits)
+
+    def all_in_order(self, hits: set[str], list_name: str) -> list[str]:
+        """Toate cuvintele din listă găsite, în ordinea (și cu duplicatele) listei."""
+        if not self.any(hits, list_name):
+            return []
+        return [w for w in self.lists[list_name] if w in hits]
+
+
+# compilate o singură dată, la import
+WORD_MATCHER = KeywordMatcher({
+    "buy_wanted": BUY_WANTED_BAN,
+    "bundle": BUNDLE_WORDS,
+    "defect_words": DEFECT_WORDS,
+    "hard_ban": HARD_BAN_STRICT,
+    "laptop": LAPTOP_WORDS,
+    "allow": ALLOW_KEYWORDS,
+    "brand": BRANDS,
+    "soft_component": SOFT_COMPONENT_WORDS,
+})
+
+SUBSTRING_MATCHER = KeywordMatcher({
+    "defect_phrases": DEFECT_PHRASES,
+    "bundle_extra": BUNDLE_SUSPICIOUS_EXTRA,
+    "explicit_non_laptop": EXPLICIT_NON_LAPTOP,
+}, word_boundary=False)
+
+ACCESSORY_PREFIX_RE = re.compile(rf"\s*{_trie_pattern(ACCESSORY_PREFIXES)}\b")
+
+# Crește la schimbări de logică în explain_publi24_laptop_filter care nu ating listele.
+FILTER_LOGIC_REV = 1
+
+
+def compute_rules_version() -> str:
+    """
+    Hash scurt peste listele de cuvinte-cheie, regex-urile de specificații și
+    FILTER_LOGIC_REV. Orice modificare a regulilor produce o versiune nouă.
+    """
+    payload = {
+        "logic_rev": FILTER_LOGIC_REV,
+        "hard_ban": HARD_BAN_STRICT,
+        "soft_component": SOFT_COMPONENT_WORDS,
+        "accessory_prefixes": ACCESSORY_PREFIXES,
+        "bundle": BUNDLE_WORDS,
+        "bundle_extra": BUNDLE_SUSPICIOUS_EXTRA,
+        "buy_wanted": BUY_WANTED_BAN,
+        "defect_phrases": DEFECT_PHRASES,
+        "defect_words": DEFECT_WORDS,
+        "explicit_non_laptop": EXPLICIT_NON_LAPTOP,
+        "allow": ALLOW_KEYWORDS,
+        "laptop": LAPTOP_WORDS,
+        "brands": BRANDS,
+        "regex": [RE_INCH.pattern, RE_CPU.pattern, RE_RAM.pattern, RE_STORAGE.pattern],
+    }
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:12]
+
+
+RULES_VERSION = compute_rules_version()
+
+
+def reason_code(keep: bool, reason: str) -> str:
+    """Cod scurt, stabil, pentru un motiv: "ok", "low_score", "wanted_ban", "defect_ban" etc."""
+    if keep:
+        return "ok"
+    if reason.startswith("reject:"):
+        return "low_score"
+    return reason.split(":", 1)[0] or "filtered"
+
+
 def is_valid_publi24_laptop(title, desc, url):
     keep, _ = explain_publi24_laptop_filter(title, desc, url)
     return keep
 
-def _contains_any_word(text: str, words: list[str]) -> bool:
-    return any(re.search(rf"\b{re.escape(w)}\b", text) for w in words)
-
 def _title_starts_with_accessory(title: str) -> bool:
-    return any(re.match(rf"^\s*{re.escape(w)}\b", title) for w in ACCESSORY_PREFIXES)
+    return ACCESSORY_PREFIX_RE.match(title) is not None
+
+def _split_hits(matches: list[tuple[int, str]], title_len: int, desc_start: int | None) -> tuple[set[str], set[str], set[str]]:
+    """
+    Împarte potrivirile din `text = f"{t} {d}"` în (text, titlu, descriere).
+    Separatorul este un spațiu, deci granițele de cuvânt sunt aceleași ca la
+    căutarea separată în titlu / descriere.
+    """
+    text_hits: set[str] = set()
+    title_hits: set[str] = set()
+    desc_hits: set[str] = set()
+    for start, w in matches:
+        text_hits.add(w)
+        if start + len(w) <= title_len:
+            title_hits.add(w)
+        elif desc_start is not None and start >= desc_start:
+            desc_hits.add(w)
+    return text_hits, title_hits, desc_hits
 
 def explain_publi24_laptop_filter(title: str | None, desc: str | None, url: str | None = None) -> tuple[bool, str]:
     """
@@ -156,54 +351,64 @@ def explain_publi24_laptop_filter(title: str | None, desc: str | None, url: str
     d = (desc or "").lower().strip()
     text = f"{t} {d}".strip()
 
+    # o singură trecere peste text pentru toate listele de cuvinte
+    if t and d:
+        desc_start = len(t) + 1
+    elif d:
+        desc_start = 0
+    else:
+        desc_start = None
+    words, title_words, desc_words = _split_hits(WORD_MATCHER.scan(text), len(t), desc_start)
+    W = WORD_MATCHER
+
     # 0) cautare / cumpar / wanted
-    for b in BUY_WANTED_BAN:
-        if re.search(rf"\b{re.escape(b)}\b", text):
-            return False, f"wanted_ban:{b}"
-        
+    b = W.first(words, "buy_wanted")
+    if b:
+        return False, f"wanted_ban:{b}"
+
+    substrings = SUBSTRING_MATCHER.hits(text)
+    S = SUBSTRING_MATCHER
+
     # 0.5) bundle / mixed listing
-    if _contains_any_word(text, BUNDLE_WORDS):
-        suspicious_extra = [
-            "diagnoza", "diagnoză", "tester auto", "interfata", "interfață",
-            "imprimanta", "imprimantă", "monitor", "telefon", "tableta", "tabletă"
-        ]
-        if any(x in text for x in suspicious_extra):
+    if W.any(words, "bundle"):
+        if S.any(substrings, "bundle_extra"):
             return False, "bundle_mixed_listing"
 
     # 1) defect / piese
-    for b in DEFECT_PHRASES:
-        if b in text:
-            return False, f"defect_ban:{b}"
-
-    for w in DEFECT_WORDS:
-        if re.search(rf"\b{re.escape(w)}\b", text):
-            return False, f"defect_ban:{w}"
-        
+    b = S.first(substrings, "defect_phrases")
+    if b:
+        return False, f"defect_ban:{b}"
+
+    w = W.first(words, "defect_words")
+    if w:
+        return False, f"defect_ban:{w}"
+
     # 1.5) device-uri clar non-laptop
-    explicit_non_laptop = [
-        "surface pro", "mac studio", "chromebox", "mini pc"
-    ]
-    if any(x in text for x in explicit_non_laptop):
+    if S.any(substrings, "explicit_non_laptop"):
         return False, "explicit_non_laptop"
 
     # 2) hard ban clar non-laptop in TITLU
-    for b in HARD_BAN_STRICT:
-        if re.search(rf"\b{re.escape(b)}\b", t):
-            return False, f"title_hard_ban_strict:{b}"
+    b = W.first(title_words, "hard_ban")
+    if b:
+        return False, f"title_hard_ban_strict:{b}"
 
     # 3) reject direct pentru titluri de tip piesa/accesoriu
     # ex: "Baterie laptop Toshiba", "Modul wireless pentru laptop", "Incarcator Dell"
-    has_laptop_word = _contains_any_word(text, ["laptop", "notebook", "macbook"])
-    has_allow_kw = _contains_any_word(text, ALLOW_KEYWORDS)
-    has_brand = _contains_any_word(text, BRANDS)
-    has_tech_specs = bool(RE_INCH.search(text) or RE_CPU.search(text) or RE_RAM.search(text) or RE_STORAGE.search(text))
+    has_laptop_word = W.any(words, "laptop")
+    has_allow_kw = W.any(words, "allow")
+    has_brand = W.any(words, "brand")
+    spec = SPECS.extract(text)
+    has_inch = spec.screen_in is not None
+    has_cpu = spec.cpu is not None
+    has_ram_or_storage = spec.ram_gb is not None or spec.storage is not None
+    has_tech_specs = has_inch or has_cpu or has_ram_or_storage
 
     if _title_starts_with_accessory(t):
         if not (has_allow_kw and has_brand and has_tech_specs):
             return False, "reject_accessory_prefix"
 
     # 4) daca titlul contine doar componente si nu are semnal suficient de laptop, reject
-    has_soft_component_in_title = _contains_any_word(t, SOFT_COMPONENT_WORDS)
+    has_soft_component_in_title = W.any(title_words, "soft_component")
     strong_laptop_signal = (
         has_allow_kw
         or (has_brand and has_tech_specs)
@@ -228,21 +433,21 @@ def explain_publi24_laptop_filter(title: str | None, desc: str | None, url: str
         score += 2
         reasons.append("brand(+2)")
 
-    if RE_INCH.search(text):
+    if has_inch:
         score += 2
         reasons.append("inch(+2)")
 
-    if RE_CPU.search(text):
+    if has_cpu:
         score += 2
         reasons.append("cpu(+2)")
 
-    if RE_RAM.search(text) or RE_STORAGE.search(text):
+    if has_ram_or_storage:
         score += 1
         reasons.append("ram_or_storage(+1)")
 
     # 6) penalizare moderata daca descrierea contine termeni suspecti,
     # dar nu reject automat
-    desc_bans = [b for b in HARD_BAN_STRICT if re.search(rf"\b{re.escape(b)}\b", d)]
+    desc_bans = W.all_in_order(desc_words, "hard_ban")
     if desc_bans:
         score -= 1
         reasons.append(f"desc_hard_ban(-1):{','.join(desc_bans[:3])}")
@@ -254,4 +459,4 @@ def explain_publi24_laptop_filter(title: str | None, desc: str | None, url: str
         if reasons else
         f"{'ok' if keep else 'reject'}: score={score}"
     )
-    return keep, reason
\ No newline at end of file
+    return keep, reason
@@ -1,9 +1,10 @@
 from __future__ import annotations
 
 import re
+import json
 
 from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
-from typing import Optional, Literal, Dict, Any
+from typing import Optional, Literal, Dict, Any, NamedTuple
 from pydantic import BaseModel, Field, field_validator, ConfigDict
 from datetime import datetime, timezone
 
@@ -94,4 +95,42 @@ class Product(BaseModel):
             return None
         if fv < 0:
             return None
-        return fv
\ No newline at end of file
+        return fv
+
+
+class ProductRow(NamedTuple):
+    """
+    Rând compact din tabelul products, pentru căile bulk DB -> products_clean.
+
+    Datele au fost deja validate de Product la ingest, așa că aici nu mai rulăm
+    validatorii pydantic: titlul e deja curățat, prețul vine direct ca price_value,
+    datele rămân string ISO, iar specs_raw rămâne JSON text până e cerut.
+    """
+    url: str
+    source: str
+    category: str
+    title: str
+    price_value: Optional[float]
+    currency: Optional[str]
+    condition: Optional[str]
+    location: Optional[str]
+    posted_at: Optional[str]
+    scraped_at: str
+    scrape_run_id: Optional[str]
+    brand_guess: Optional[str]
+    model_guess: Optional[str]
+    mpn_guess: Optional[str]
+    specs_raw: Optional[str]
+    listing_key: Optional[int] = None
+    description_text: Optional[str] = None
+
+    def specs(self) -> Optional[Dict[str, Any]]:
+        """Decodează specs_raw doar la cerere (JSON invalid / gol -> None)."""
+        s = (self.specs_raw or "").strip()
+        if not s or s.lower() in ("null", "none"):
+            return None
+        try:
+            data = json.loads(s)
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
@@ -2,25 +2,27 @@ from __future__ import annotations
 
 import uuid
 import time
+import sqlite3
 import logging
 from pathlib import Path
 
 from app.config.base import BASE_DIR
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import Callable, List, Optional
 from app.models import Product
 from app.storage.sqlite import SqliteStore
 from app.sites.base import SiteScraper
 from datetime import datetime, timezone
 from app.storage.csv_writer import write_products_csv
 from app.filters import explain_publi24_laptop_filter
+from app.storage.filter_cache import FilterDecisionCache
+from app.storage.market_daily import day_of, refresh_market_daily
+from app.core.utils import iso_to_epoch_ms
 
 logger = logging.getLogger("scraper.pipeline")
 
-DEBUG_DIR = Path(BASE_DIR) / "data_out" / "debug"
-DEBUG_DIR.mkdir(parents=True, exist_ok=True)
-FILTERED_DIR = Path(BASE_DIR) / "data_out" / "filtered"
-FILTERED_DIR.mkdir(parents=True, exist_ok=True)
+# sub el: debug/ (listing-uri goale), filtered/ (respinse de filtru), exports/ (CSV per rulare)
+OUT_DIR = Path(BASE_DIR) / "data_out"
 
 @dataclass
 class RunStats:
@@ -38,8 +40,38 @@ class RunStats:
     products_upserted: int = 0
     products_inserted: int = 0
     products_updated: int = 0
+    products_changed: int = 0       # rânduri scrise complet (noi sau cu conținut schimbat)
+    products_touched: int = 0       # conținut identic -> doar scraped_at / scrape_run_id
     errors: int = 0
     products_filtered: int = 0
+    db_write_s: float = 0.0          # timp petrecut în upsert + scrape_runs (nu se salvează în DB)
+
+
+# Micro-batch-uri implicite pentru run_and_store: flush la N produse păstrate sau la T secunde
+FLUSH_EVERY = 50
+FLUSH_INTERVAL_S = 30.0
+
+BatchSink = Callable[[List[Product], RunStats], None]
+
+
+def _append_filtered_csv(path: Path, rows: list[tuple[str, str, str]]) -> None:
+    """Adaugă (reason, url, title) în CSV-ul cu produse filtrate; header-ul doar la creare."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    new = not path.exists()
+    with open(path, "a", encoding="utf-8") as f:
+        if new:
+            f.write("reason,url,title\n")
+        for reason, url, title in rows:
+            r = (reason or "").replace('"', '""')
+            u = (url or "").replace('"', '""')
+            t = (title or "").replace('"', '""')
+            f.write(f"\"{r}\",\"{u}\",\"{t}\"\n")
+
+
+def uses_publi24_filter(site_name: str, category: str) -> bool:
+    """Rulările filtrate cu explain_publi24_laptop_filter (singurele care folosesc FilterDecisionCache)."""
+    return site_name == "publi24" and category == "laptopuri"
+
 
 def run_scrape(
     site: SiteScraper,
@@ -47,7 +79,22 @@ def run_scrape(
     category: str,
     max_pages: int,
     max_products: Optional[int] = None,
+    filter_cache: Optional[FilterDecisionCache] = None,
+    on_batch: Optional[BatchSink] = None,
+    flush_every: int = FLUSH_EVERY,
+    flush_interval_s: float = FLUSH_INTERVAL_S,
+    out_dir: Path = OUT_DIR,
 ) -> tuple[List[Product], RunStats]:
+    """
+    Fără on_batch: întoarce toate produsele păstrate (comportamentul inițial).
+
+    Cu on_batch: produsele sunt predate în micro-batch-uri (la flush_every produse sau
+    la flush_interval_s secunde) și nu mai sunt ținute în memorie; lista întoarsă e goală.
+    on_batch([] , stats) e apelat o dată la început, ca rularea să poată fi înregistrată.
+    O excepție din on_batch oprește rularea (se propagă la apelant).
+    Fișierele de debug și CSV-ul cu produsele filtrate ajung sub out_dir; respinsele se
+    adaugă în CSV la fiecare flush (sau la flush_every respinse), nu la final.
+    """
     run_id = str(uuid.uuid4())
     start_time = time.time()
     
@@ -61,12 +108,34 @@ def run_scrape(
     stats.started_at = datetime.now(timezone.utc).isoformat()
 
     products: List[Product] = []
+    filtered_rows: list[tuple[str, str, str]] = []  # (reason, url, title)
+    filtered_path = out_dir / "filtered" / f"{site_name}_{run_id}_filtered.csv"
+    last_flush = time.monotonic()
+
+    def write_filtered() -> None:
+        if not filtered_rows:
+            return
+        _append_filtered_csv(filtered_path, filtered_rows)
+        filtered_rows.clear()
+
+    def flush() -> None:
+        nonlocal last_flush
+        last_flush = time.monotonic()
+        write_filtered()
+        if on_batch is None:
+            return
+        stats.duration_s = round(time.time() - start_time, 2)
+        # golit înainte de predare: un batch deja comis nu mai poate fi scris a doua oară
+        batch = list(products)
+        products.clear()
+        on_batch(batch, stats)
+
+    flush()
     listing_urls = list(site.iter_listing_urls(category=category, max_pages=max_pages))
 
     logger.info("--- Starting Scrape Run [%s] for %s ---", run_id, site_name)
 
     seen_detail: set[str] = set()
-    filtered_rows: list[tuple[str, str, str]] = []  # (reason, url, title)
     stop_early = False
 
     for li, listing_url in enumerate(listing_urls, start=1):
@@ -82,7 +151,8 @@ def run_scrape(
             detail_urls = site.parse_listing_page(listing_res.text)
 
             if not detail_urls:
-                debug_path = DEBUG_DIR / f"{site_name}_listing_empty_{run_id}_p{li}.html"
+                debug_path = out_dir / "debug" / f"{site_name}_listing_empty_{run_id}_p{li}.html"
+                debug_path.parent.mkdir(parents=True, exist_ok=True)
                 with open(debug_path, "w", encoding="utf-8") as f:
                     f.write(listing_res.text)
 
@@ -90,78 +160,88 @@ def run_scrape(
 
             logger.info("[%s] Page %s/%s: Found %s items", site_name, li, len(listing_urls), len(detail_urls))
 
-            for durl in detail_urls:
-                if durl in seen_detail:
+        except Exception as e:
+            stats.errors += 1
+            logger.exception("!!! Critical Listing Error: %s: %s", type(e).__name__, e)
+            continue
+
+        # în afara try-urilor: o eroare la scrierea unui batch ajunge la apelant (run_and_store
+        # marchează rularea 'failed'), nu e tratată ca o eroare de listare / parsare
+        for durl in detail_urls:
+            # verificat înaintea fiecărui detaliu, deci și după cele filtrate / eșuate: altfel un șir
+            # lung de respinse ține produsele păstrate necomise mult după scraped_at
+            # (watermark-ul din build_state se bazează pe flush_interval_s)
+            if on_batch is not None and products and (
+                len(products) >= flush_every or time.monotonic() - last_flush >= flush_interval_s
+            ):
+                flush()
+            elif len(filtered_rows) >= flush_every:
+                write_filtered()
+
+            if durl in seen_detail:
+                continue
+            seen_detail.add(durl)
+            if max_products is not None and stats.products_parsed >= max_products:
+                stop_early = True
+                break
+
+            try:
+                site.http.polite_sleep()
+                detail_res = site.http.get(durl)
+
+                if detail_res.status_code != 200:
+                    stats.errors += 1
                     continue
-                seen_detail.add(durl)
-                if max_products is not None and len(products) >= max_products:
-                    stop_early = True
-                    break
 
-                try:
-                    site.http.polite_sleep()
-                    detail_res = site.http.get(durl)
-
-                    if detail_res.status_code != 200:
-                        stats.errors += 1
-                        continue
-
-                    stats.detail_pages_ok += 1
-                    
-                    # Aici se produce magia: Parser + Pydantic Validation
-                    p = site.parse_detail_page(detail_res.text, url=durl, category=category)
-                    stats.products_parsed_total += 1
-
-                    # Filtrare + motiv (în special pentru Publi24)
-                    try:
-                        if site_name == "publi24" and category == "laptopuri":
-                            keep, reason = explain_publi24_laptop_filter(p.title or "", p.description_text or "", p.url)
-                        else:
-                            keep = site.filter_product(p)
-                            reason = ""
-                    except Exception as e:
-                        stats.errors += 1
-                        logger.warning("Filter error for %s: %s: %s", p.url, type(e).__name__, e)
-                        keep = False
-                        reason = f"filter_error:{type(e).__name__}"
-
-                    if not keep:
-                        stats.products_filtered += 1
-                        filtered_rows.append((reason or "filtered", p.url, (p.title or "")[:200]))
-                        continue
-
-                    p.http_status = detail_res.status_code
-                    p.response_time_ms = detail_res.elapsed_ms
-                    p.scrape_run_id = run_id
-
-                    products.append(p)
-                    stats.products_parsed += 1
-
-                    if stats.products_parsed % 5 == 0:
-                        logger.info("   > Kept %s products (parsed_total=%s, filtered=%s).",
-                        stats.products_parsed, stats.products_parsed_total, stats.products_filtered)
+                stats.detail_pages_ok += 1
+                
+                # Aici se produce magia: Parser + Pydantic Validation
+                p = site.parse_detail_page(detail_res.text, url=durl, category=category)
+                stats.products_parsed_total += 1
 
+                # Filtrare + motiv (în special pentru Publi24)
+                try:
+                    if uses_publi24_filter(site_name, category):
+                        # cache-ul sare peste evaluare pentru reposturi / anunțuri neschimbate
+                        explain = filter_cache.explain if filter_cache is not None else explain_publi24_laptop_filter
+                        keep, reason = explain(p.title or "", p.description_text or "", p.url)
+                    else:
+                        keep = site.filter_product(p)
+                        reason = ""
                 except Exception as e:
                     stats.errors += 1
-                    logger.warning("   ! Error parsing %s: %s: %s", durl, type(e).__name__, e)
+                    logger.warning("Filter error for %s: %s: %s", p.url, type(e).__name__, e)
+                    keep = False
+                    reason = f"filter_error:{type(e).__name__}"
+
+                if not keep:
+                    stats.products_filtered += 1
+                    filtered_rows.append((reason or "filtered", p.url, (p.title or "")[:200]))
+                    continue
+
+                p.http_status = detail_res.status_code
+                p.response_time_ms = detail_res.elapsed_ms
+                p.scrape_run_id = run_id
+
+                products.append(p)
+                stats.products_parsed += 1
+
+                if stats.products_parsed % 5 == 0:
+                    logger.info("   > Kept %s products (parsed_total=%s, filtered=%s).",
+                    stats.products_parsed, stats.products_parsed_total, stats.products_filtered)
+
+            except Exception as e:
+                stats.errors += 1
+                logger.warning("   ! Error parsing %s: %s: %s", durl, type(e).__name__, e)
 
-        except Exception as e:
-            stats.errors += 1
-            logger.exception("!!! Critical Listing Error: %s: %s", type(e).__name__, e)
-    
         if stop_early:
             break
 
-    if filtered_rows:
-        out = FILTERED_DIR / f"{site_name}_{run_id}_filtered.csv"
-        with open(out, "w", encoding="utf-8") as f:
-            f.write("reason,url,title\n")
-            for reason, url, title in filtered_rows:
-                r = (reason or "").replace('"', '""')
-                u = (url or "").replace('"', '""')
-                t = (title or "").replace('"', '""')
-                f.write(f"\"{r}\",\"{u}\",\"{t}\"\n")
-        logger.info("[export] Wrote filtered CSV: %s", out)
+    if on_batch is not None and products:
+        flush()
+    write_filtered()
+    if filtered_path.exists():
+        logger.info("[export] Wrote filtered CSV: %s", filtered_path)
 
     stats.duration_s = round(time.time() - start_time, 2)
     stats.finished_at = datetime.now(timezone.utc).isoformat()
@@ -174,36 +254,93 @@ def run_and_store(
     max_pages: int,
     max_products: Optional[int] = None,
     db_path: Optional[str] = None,
+    flush_every: int = FLUSH_EVERY,
+    flush_interval_s: float = FLUSH_INTERVAL_S,
+    out_dir: Optional[Path] = None,
 ) -> RunStats:
-    products, stats = run_scrape(
-        site=site_scraper,
-        site_name=site_name,
-        category=category,
-        max_pages=max_pages,
-        max_products=max_products,
-    )
-
-    if products:
-        store = SqliteStore(db_path=db_path) if db_path else SqliteStore()
-        upserted, inserted, updated = store.upsert_products(products)
-        stats.products_upserted = upserted
-        stats.products_inserted = inserted
-        stats.products_updated = updated
-
-        store.insert_scrape_run(stats)
-        logger.info("[db] Saved run summary to scrape_runs: %s", stats.scrape_run_id)
-
+    """
+    Rulează scrape-ul și scrie produsele în micro-batch-uri, fiecare în tranzacția lui.
+    Rândul din scrape_runs e creat la început cu status='running' și actualizat la fiecare
+    flush; la final devine 'finished' (sau 'failed', iar batch-urile deja scrise rămân).
+    CSV-urile (exports/, filtered/, debug/) se scriu sub out_dir (implicit data_out/).
+    """
+    out_dir = Path(out_dir) if out_dir is not None else OUT_DIR
+    store = SqliteStore(db_path=db_path) if db_path else SqliteStore()
+    # pe conexiunea store-ului: scrierile cache-ului se fac între batch-uri, în același fir
+    filter_cache = FilterDecisionCache(conn=store._connect()) if uses_publi24_filter(site_name, category) else None
+    current: dict[str, RunStats] = {}
+    kept_total = 0
+
+    def write_batch(batch: List[Product], stats: RunStats) -> None:
+        nonlocal kept_total
+        current["stats"] = stats
+        db_start = time.perf_counter()
+        if batch:
+            upserted, inserted, updated = store.upsert_products(batch)
+            stats.products_upserted += upserted
+            stats.products_inserted += inserted
+            stats.products_updated += updated
+            stats.products_changed += store.last_changed
+            stats.products_touched += store.last_touched
+        store.insert_scrape_run(stats, status="running")
+        stats.db_write_s = round(stats.db_write_s + time.perf_counter() - db_start, 4)
+
+        if batch:
+            kept_total += len(batch)
+            export_path = out_dir / "exports" / f"{site_name}_{stats.scrape_run_id}.csv"
+            write_products_csv(batch, export_path, append=True)
+            logger.info("[db] Flushed %s products (total=%s, upserted=%s)", len(batch), kept_total, stats.products_upserted)
+
+    try:
+        try:
+            _, stats = run_scrape(
+                site=site_scraper,
+                site_name=site_name,
+                category=category,
+                max_pages=max_pages,
+                max_products=max_products,
+                filter_cache=filter_cache,
+                on_batch=write_batch,
+                flush_every=max(1, flush_every),
+                flush_interval_s=flush_interval_s,
+                out_dir=out_dir,
+            )
+        finally:
+            if filter_cache is not None:
+                filter_cache.close()
+    except BaseException:
+        stats = current.get("stats")
+        if stats is not None:
+            stats.finished_at = datetime.now(timezone.utc).isoformat()
+            store.insert_scrape_run(stats, status="failed")
+            logger.warning("[db] Run %s marked as failed after %s saved products", stats.scrape_run_id, kept_total)
+        store.close()
+        raise
+
+    if filter_cache is not None and (filter_cache.hits or filter_cache.misses):
+        logger.info("[filter] cache hits=%s misses=%s (rules=%s)", filter_cache.hits, filter_cache.misses, filter_cache.rules_version)
+
+    db_start = time.perf_counter()
+    with store:
+        store.insert_scrape_run(stats, status="finished")
+        # rollup-ul zilnic pe segmente pentru ziua (zilele) rulării
+        run_days = {day_of(iso_to_epoch_ms(stats.started_at)), day_of(iso_to_epoch_ms(stats.finished_at))}
+        try:
+            segments = refresh_market_daily(store._connect(), run_days)
+            logger.info("[db] market_daily refreshed: %s segments", segments)
+        except sqlite3.Error as e:
+            logger.warning("[db] market_daily refresh failed: %s: %s", type(e).__name__, e)
+    stats.db_write_s = round(stats.db_write_s + time.perf_counter() - db_start, 4)
+    logger.info("[db] Saved run summary to scrape_runs: %s", stats.scrape_run_id)
+
+    if kept_total:
         logger.info(
-            "--- Finished: Upserted %s/%s (inserted=%s, updated=%s) in %ss ---",
-            upserted, len(products), inserted, updated, stats.duration_s
+            "--- Finished: Upserted %s/%s (inserted=%s, updated=%s, changed=%s, touched=%s) in %ss ---",
+            stats.products_upserted, kept_total, stats.products_inserted, stats.products_updated,
+            stats.products_changed, stats.products_touched, stats.duration_s
         )
-
-        export_path = Path(BASE_DIR) / "data_out" / "exports" / f"{site_name}_{stats.scrape_run_id}.csv"
-        write_products_csv(products, export_path)
+        export_path = out_dir / "exports" / f"{site_name}_{stats.scrape_run_id}.csv"
         logger.info("[export] Wrote CSV: %s", export_path)
     else:
         logger.warning("--- Finished: No products were found/parsed. ---")
-        store = SqliteStore(db_path=db_path) if db_path else SqliteStore()
-        store.insert_scrape_run(stats)
-        logger.info("[db] Saved run summary to scrape_runs: %s", stats.scrape_run_id)        
-    return stats
\ No newline at end of file
+    return stats
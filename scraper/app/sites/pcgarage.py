@@ -53,8 +53,8 @@ class PcGarageScraper(SiteScraper):
 
             p = urlparse(abs_url)
 
-            # acceptă strict doar domeniul pcgarage
-            if p.netloc and p.netloc != "www.pcgarage.ro":
+            # acceptă strict doar domeniul pcgarage (sau BASE_URL suprascris, ex. benchmark local)
+            if p.netloc and p.netloc != urlparse(self.BASE_URL).netloc:
                 continue
 
             # filtrează strict doar pagini de produs laptop
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Optional
+
+# Starea build-urilor incrementale din scripts/ (products -> products_clean):
+# watermark_ms = cel mai mare products.scraped_at_ms deja procesat de pasul respectiv.
+DDL_BUILD_STATE = """
+CREATE TABLE IF NOT EXISTS build_state (
+  name TEXT PRIMARY KEY,
+  watermark_ms INTEGER NOT NULL,
+  updated_at TEXT NOT NULL
+);
+"""
+
+# Rândurile sunt comise în micro-batch-uri la până la FLUSH_INTERVAL_S (+ durata unui request de
+# detaliu) după ce au fost scrapuite (scraped_at e setat la parsare): run_scrape verifică intervalul
+# după fiecare detaliu, inclusiv după cele filtrate. Două rulări pot scrie în paralel, deci reluăm
+# și ultimele minute de dinaintea watermark-ului; re-procesarea e idempotentă (upsert).
+WATERMARK_OVERLAP_MS = 15 * 60 * 1000
+
+
+def get_watermark(conn: sqlite3.Connection, name: str) -> Optional[int]:
+    conn.execute(DDL_BUILD_STATE)
+    row = conn.execute("SELECT watermark_ms FROM build_state WHERE name = ?", (name,)).fetchone()
+    return int(row[0]) if row else None
+
+
+def set_watermark(conn: sqlite3.Connection, name: str, watermark_ms: int) -> None:
+    """Scrie watermark-ul în tranzacția curentă (commit-ul îl face apelantul, odată cu datele)."""
+    conn.execute(DDL_BUILD_STATE)
+    conn.execute(
+        """
+        INSERT INTO build_state(name, watermark_ms, updated_at) VALUES (?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET watermark_ms = excluded.watermark_ms, updated_at = excluded.updated_at
+        """,
+        (name, int(watermark_ms), datetime.now(timezone.utc).isoformat()),
+    )
+
+
+def change_window(
+    conn: sqlite3.Connection, name: str, full: bool = False, table: str = "products"
+) -> tuple[Optional[int], Optional[int]]:
+    """
+    Fereastra de rânduri de procesat, ca (lo, hi) pe {table}.scraped_at_ms: lo exclusiv, hi inclusiv.
+    lo = None -> rebuild complet (--full sau prima rulare); hi = None -> tabelul e gol.
+    Un pas care citește din products_clean folosește table="products_clean", ca să nu treacă
+    de rânduri pe care build_clean_table nu le-a scris încă.
+    """
+    hi = conn.execute(f"SELECT MAX(scraped_at_ms) FROM {table}").fetchone()[0]
+    watermark = None if full else get_watermark(conn, name)
+    lo = None if watermark is None else watermark - WATERMARK_OVERLAP_MS
+    return lo, hi
+
+
+# Pașii orchestratorului scripts/build_analysis_dataset.py: amprenta intrărilor la ultima
+# rulare reușită. Un pas cu aceeași amprentă e la zi și nu mai rulează.
+DDL_BUILD_STEPS = """
+CREATE TABLE IF NOT EXISTS build_steps (
+  name TEXT PRIMARY KEY,
+  fingerprint TEXT NOT NULL,
+  duration_s REAL NOT NULL,
+  updated_at TEXT NOT NULL
+);
+"""
+
+
+def table_fingerprint(conn: sqlite3.Connection, table: str, changed_col: Optional[str] = None) -> Optional[tuple]:
+    """
+    (COUNT(*), MAX(rowid)[, MAX(changed_col)]) pentru un tabel; None dacă tabelul lipsește.
+    Un UPDATE pe loc nu schimbă numărul de rânduri / rowid-ul, deci pentru tabelele rescrise
+    (products, products_clean) changed_col = scraped_at_ms, mutat de orice scriere / touch.
+    """
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)).fetchone()
+    if not exists:
+        return None
+    cols = "COUNT(*), MAX(rowid)" + (f", MAX({changed_col})" if changed_col else "")
+    return tuple(conn.execute(f"SELECT {cols} FROM {table}").fetchone())
+
+
+def get_step(conn: sqlite3.Connection, name: str) -> Optional[tuple[str, str]]:
+    """(fingerprint, updated_at) la ultima rulare reușită a pasului, sau None."""
+    conn.execute(DDL_BUILD_STEPS)
+    return conn.execute("SELECT fingerprint, updated_at FROM build_steps WHERE name = ?", (name,)).fetchone()
+
+
+def set_step(conn: sqlite3.Connection, name: str, fingerprint: str, duration_s: float) -> None:
+    conn.execute(DDL_BUILD_STEPS)
+    with conn:
+        conn.execute(
+            """
+            INSERT INTO build_steps(name, fingerprint, duration_s, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(name) DO UPDATE SET
+                fingerprint = excluded.fingerprint,
+                duration_s = excluded.duration_s,
+                updated_at = excluded.updated_at
+            """,
+            (name, fingerprint, round(duration_s, 4), datetime.now(timezone.utc).isoformat()),
+        )
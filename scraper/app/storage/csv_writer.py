@@ -7,9 +7,11 @@ from typing import Iterable
 from app.models import Product
 
 
-def write_products_csv(products: Iterable[Product], path: str | Path) -> None:
+def write_products_csv(products: Iterable[Product], path: str | Path, append: bool = False) -> None:
+    """append=True adaugă la fișierul existent (header doar dacă fișierul e nou / gol)."""
     path = Path(path)
     path.parent.mkdir(parents=True, exist_ok=True)
+    write_header = not append or not path.exists() or path.stat().st_size == 0
 
     fieldnames = [
         "source", "category", "url", "scraped_at", "scrape_run_id",
@@ -19,9 +21,10 @@ def write_products_csv(products: Iterable[Product], path: str | Path) -> None:
         "http_status", "response_time_ms",
     ]
 
-    with path.open("w", newline="", encoding="utf-8") as f:
+    with path.open("a" if append else "w", newline="", encoding="utf-8") as f:
         w = csv.DictWriter(f, fieldnames=fieldnames)
-        w.writeheader()
+        if write_header:
+            w.writeheader()
         for p in products:
             w.writerow({
             "source": p.source,
@@ -0,0 +1,124 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+from typing import Optional
+
+from app.config.base import DB_PATH
+from app.filters import RULES_VERSION, explain_publi24_laptop_filter
+
+
+DDL_FILTER_CACHE = """
+CREATE TABLE IF NOT EXISTS filter_cache (
+  content_hash TEXT NOT NULL,
+  rules_version TEXT NOT NULL,
+  keep INTEGER NOT NULL,
+  reason TEXT NOT NULL,
+  PRIMARY KEY (content_hash, rules_version)
+) WITHOUT ROWID;
+"""
+
+
+def content_hash(title: Optional[str], desc: Optional[str]) -> str:
+    """
+    Hash peste titlu + descriere, normalizate la fel ca în filtru (lower + strip),
+    ca reposturile care diferă doar prin majuscule / spații la capete să aibă același hash.
+    """
+    t = (title or "").lower().strip()
+    d = (desc or "").lower().strip()
+    return hashlib.sha1(f"{t}\x00{d}".encode("utf-8")).hexdigest()
+
+
+class FilterDecisionCache:
+    """
+    Cache persistent pentru deciziile explain_publi24_laptop_filter.
+
+    Cheia este (content_hash, rules_version). RULES_VERSION se schimbă automat
+    când se modifică orice listă de cuvinte din app/filters.py, deci intrările
+    vechi nu mai sunt găsite; la deschidere le ștergem ca tabelul să rămână mic.
+
+    Cu conn (ex. conexiunea SqliteStore a rulării) cache-ul o folosește și nu o închide;
+    altfel deschide o conexiune proprie la db_path.
+    """
+
+    FLUSH_EVERY = 200
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        rules_version: str = RULES_VERSION,
+        conn: Optional[sqlite3.Connection] = None,
+    ):
+        self.db_path = str(db_path)
+        self.rules_version = rules_version
+        self.hits = 0
+        self.misses = 0
+        self._pending: list[tuple[str, str, int, str]] = []
+        self._memo: dict[str, tuple[bool, str]] = {}
+
+        self._owns_conn = conn is None
+        if conn is None:
+            parent = os.path.dirname(self.db_path)
+            if parent:
+                os.makedirs(parent, exist_ok=True)
+            conn = sqlite3.connect(self.db_path)
+            conn.execute("PRAGMA journal_mode=WAL;")
+        self._conn = conn
+        self._conn.execute(DDL_FILTER_CACHE)
+        self.purged = self._conn.execute(
+            "DELETE FROM filter_cache WHERE rules_version <> ?",
+            (self.rules_version,),
+        ).rowcount
+        self._conn.commit()
+
+    def get(self, title: Optional[str], desc: Optional[str]) -> Optional[tuple[bool, str]]:
+        key = content_hash(title, desc)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+        row = self._conn.execute(
+            "SELECT keep, reason FROM filter_cache WHERE content_hash = ? AND rules_version = ?",
+            (key, self.rules_version),
+        ).fetchone()
+        if row is None:
+            return None
+        decision = (bool(row[0]), row[1])
+        self._memo[key] = decision
+        return decision
+
+    def put(self, title: Optional[str], desc: Optional[str], keep: bool, reason: str) -> None:
+        key = content_hash(title, desc)
+        self._memo[key] = (bool(keep), reason)
+        self._pending.append((key, self.rules_version, int(keep), reason))
+        if len(self._pending) >= self.FLUSH_EVERY:
+            self.flush()
+
+    def explain(self, title: Optional[str], desc: Optional[str], url: Optional[str] = None) -> tuple[bool, str]:
+        """Ca explain_publi24_laptop_filter, dar sare peste evaluare pentru conținut deja văzut."""
+        cached = self.get(title, desc)
+        if cached is not None:
+            self.hits += 1
+            return cached
+        self.misses += 1
+        keep, reason = explain_publi24_laptop_filter(title, desc, url)
+        self.put(title, desc, keep, reason)
+        return keep, reason
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO filter_cache(content_hash, rules_version, keep, reason) VALUES (?, ?, ?, ?)",
+            self._pending,
+        )
+        self._conn.commit()
+        self._pending.clear()
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        self.flush()
+        if self._owns_conn:
+            self._conn.close()
+        self._conn = None
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import sqlite3
+from itertools import groupby
+from typing import Iterable, Optional
+
+from app.storage.sqlite import DAY_MS  # zi = zile de la epoch (UTC), ca în price_snapshots_daily
+
+# Un rând pe zi x segment. Dimensiunile necunoscute se scriu ca '' / 0 (nu NULL),
+# ca să poată face parte din cheia primară; web-ul le tratează ca "necunoscut".
+DDL_MARKET_DAILY = """
+CREATE TABLE IF NOT EXISTS market_daily (
+  day INTEGER NOT NULL,
+  source TEXT NOT NULL,
+  brand_norm TEXT NOT NULL,
+  model_family TEXT NOT NULL,
+  ram_gb INTEGER NOT NULL,
+  condition_norm TEXT NOT NULL,
+
+  n INTEGER NOT NULL,
+  price_min REAL NOT NULL,
+  price_p25 REAL NOT NULL,
+  price_median REAL NOT NULL,
+  price_p75 REAL NOT NULL,
+  price_max REAL NOT NULL,
+
+  PRIMARY KEY (day, source, brand_norm, model_family, ram_gb, condition_norm)
+) WITHOUT ROWID;
+"""
+
+# Piața unei zile D = anunțurile apărute până la sfârșitul lui D (primul snapshot < :hi) și încă
+# văzute în D sau după (products.scraped_at_ms >= :lo), cu prețul în vigoare la sfârșitul lui D:
+# ultimul snapshot dinainte de :hi, din price_snapshots sau din zilele compactate
+# (price_snapshots_daily). Snapshot-urile se scriu doar la schimbarea prețului, deci prețul
+# curent din products nu e corect pentru zilele trecute. products_clean dă doar segmentul.
+# Ordonat pe segment, apoi preț.
+SELECT_DAY_SQL = """
+WITH hist AS (
+    SELECT listing_key, price_value, scraped_at_ms
+    FROM price_snapshots
+    WHERE scraped_at_ms < :hi
+      AND listing_key IN (SELECT listing_key FROM products WHERE scraped_at_ms >= :lo)
+    UNION ALL
+    SELECT listing_key, price_value, scraped_at_ms
+    FROM price_snapshots_daily
+    WHERE scraped_at_ms < :hi
+      AND listing_key IN (SELECT listing_key FROM products WHERE scraped_at_ms >= :lo)
+),
+asof AS (
+    SELECT
+        listing_key,
+        price_value,
+        ROW_NUMBER() OVER (PARTITION BY listing_key ORDER BY scraped_at_ms DESC) AS rn
+    FROM hist
+)
+SELECT
+    p.source,
+    COALESCE(pc.brand_norm, ''),
+    COALESCE(pc.model_family, ''),
+    COALESCE(pc.ram_gb, 0),
+    COALESCE(pc.condition_norm, ''),
+    a.price_value
+FROM asof a
+JOIN products p ON p.listing_key = a.listing_key
+JOIN products_clean pc ON pc.listing_key = a.listing_key
+WHERE a.rn = 1
+  AND a.price_value IS NOT NULL
+  AND pc.is_laptop = 1
+ORDER BY 1, 2, 3, 4, 5, 6
+"""
+
+INSERT_SQL = """
+INSERT INTO market_daily (
+    day, source, brand_norm, model_family, ram_gb, condition_norm,
+    n, price_min, price_p25, price_median, price_p75, price_max
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def day_of(ms: Optional[int]) -> Optional[int]:
+    return None if ms is None else int(ms) // DAY_MS
+
+
+def _percentile(xs: list[float], p: float) -> float:
+    """Interpolare liniară pe o listă deja sortată (aceeași regulă ca _percentile din web/app/db_market.py)."""
+    k = (len(xs) - 1) * p
+    f = int(k)
+    c = min(f + 1, len(xs) - 1)
+    if f == c:
+        return round(xs[f], 2)
+    return round(xs[f] * (c - k) + xs[c] * (k - f), 2)
+
+
+def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def refresh_market_daily(conn: sqlite3.Connection, days: Iterable[int]) -> int:
+    """
+    Recalculează rândurile market_daily pentru zilele date (tipic: ziua rulării curente).
+    Prețurile vin din istoricul de snapshot-uri, deci și o zi trecută poate fi recalculată
+    (ex. după o schimbare de reguli în products_clean). Returnează numărul de rânduri (segmente) scrise.
+
+    Fără products_clean (build_clean_table n-a rulat încă) nu scrie nimic.
+    """
+    days = sorted({int(d) for d in days if d is not None})
+    if not days or not _has_table(conn, "products_clean"):
+        return 0
+
+    written = 0
+    with conn:
+        conn.execute(DDL_MARKET_DAILY)
+        for day in days:
+            rows = conn.execute(SELECT_DAY_SQL, {"lo": day * DAY_MS, "hi": (day + 1) * DAY_MS}).fetchall()
+            out = []
+            for segment, group in groupby(rows, key=lambda r: (r[0], r[1], r[2], r[3], r[4])):
+                prices = [float(r[5]) for r in group]
+                out.append((
+                    day, *segment, len(prices),
+                    round(prices[0], 2),
+                    _percentile(prices, 0.25),
+                    _percentile(prices, 0.50),
+                    _percentile(prices, 0.75),
+                    round(prices[-1], 2),
+                ))
+            conn.execute("DELETE FROM market_daily WHERE day = ?", (day,))
+            conn.executemany(INSERT_SQL, out)
+            written += len(out)
+    return written
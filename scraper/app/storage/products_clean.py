@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import sqlite3
+from datetime import datetime, timezone
+from typing import Optional
+
+from app.cleaning.laptop import LAPTOP_COLUMNS, NORM_RULES_VERSIONS, laptop_columns, norm_input_hash
+from app.cleaning.normalize import (
+    normalize_location,
+    normalize_condition,
+    effective_datetime,
+    normalize_title,
+)
+from app.core.utils import epoch_ms, listing_key
+from app.models import ProductRow
+
+# products_clean = products curățat + coloanele normalizate din app.cleaning.laptop, un rând
+# pe listing_key. Scris de scripts/build_clean_table.py (batch) și, opțional, de
+# SqliteStore.upsert_products la ingest (CLEAN_ON_INGEST=1).
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS products_clean (
+    listing_key INTEGER PRIMARY KEY,
+    url TEXT NOT NULL,
+    source TEXT,
+    category TEXT,
+
+    title_clean TEXT,
+    brand_guess TEXT,
+    model_guess TEXT,
+    mpn_guess TEXT,
+
+    price_ron REAL,
+    currency TEXT,
+
+    location_clean TEXT,
+    county TEXT,
+    city TEXT,
+
+    condition_norm TEXT,
+    posted_at_utc TEXT,
+    scraped_at_utc TEXT,
+    posted_at_ms INTEGER,
+    scraped_at_ms INTEGER,
+
+    scrape_run_id TEXT,
+
+    norm_input_hash TEXT,
+    norm_rules_version TEXT,
+
+    brand_norm TEXT,
+    model_norm TEXT,
+    title_norm TEXT,
+    model_family TEXT,
+    title_std TEXT,
+    cpu_guess TEXT,
+    ram_gb INTEGER,
+    storage_guess TEXT,
+    gpu_guess TEXT,
+    screen_in REAL,
+    is_laptop INTEGER
+);
+"""
+
+UPSERT_SQL = f"""
+INSERT INTO products_clean (
+    listing_key, url, source, category,
+    title_clean, brand_guess, model_guess, mpn_guess,
+    price_ron, currency,
+    location_clean, county, city,
+    posted_at_utc, scraped_at_utc, posted_at_ms, scraped_at_ms,
+    scrape_run_id,
+    norm_input_hash, norm_rules_version,
+    {", ".join(LAPTOP_COLUMNS)}
+) VALUES (
+    ?, ?, ?, ?,
+    ?, ?, ?, ?,
+    ?, ?,
+    ?, ?, ?,
+    ?, ?, ?, ?,
+    ?,
+    ?, ?,
+    {", ".join(["?"] * len(LAPTOP_COLUMNS))}
+)
+ON CONFLICT(listing_key) DO UPDATE SET
+    url=excluded.url,
+    source=excluded.source,
+    category=excluded.category,
+    title_clean=excluded.title_clean,
+    brand_guess=excluded.brand_guess,
+    model_guess=excluded.model_guess,
+    mpn_guess=excluded.mpn_guess,
+    price_ron=excluded.price_ron,
+    currency=excluded.currency,
+    location_clean=excluded.location_clean,
+    county=excluded.county,
+    city=excluded.city,
+    posted_at_utc=excluded.posted_at_utc,
+    scraped_at_utc=excluded.scraped_at_utc,
+    posted_at_ms=excluded.posted_at_ms,
+    scraped_at_ms=excluded.scraped_at_ms,
+    scrape_run_id=excluded.scrape_run_id,
+    norm_input_hash=excluded.norm_input_hash,
+    norm_rules_version=excluded.norm_rules_version,
+    {", ".join(f"{c}=excluded.{c}" for c in LAPTOP_COLUMNS)}
+"""
+
+# rând cu normalizarea refolosită: doar coloanele curățate (aceeași ordine ca în UPSERT_SQL)
+REUSE_SQL = """
+UPDATE products_clean SET
+    url=?, source=?, category=?,
+    title_clean=?, brand_guess=?, model_guess=?, mpn_guess=?,
+    price_ron=?, currency=?,
+    location_clean=?, county=?, city=?,
+    posted_at_utc=?, scraped_at_utc=?, posted_at_ms=?, scraped_at_ms=?,
+    scrape_run_id=?
+WHERE listing_key=?
+"""
+
+# rândurile din products + hash-ul / versiunea / is_laptop salvate în products_clean;
+# apelantul adaugă condiția (WHERE) pe products p
+SELECT_SQL = f"""
+SELECT {", ".join(f"p.{c}" for c in ProductRow._fields)},
+       pc.norm_input_hash, pc.norm_rules_version, pc.is_laptop
+FROM products p
+LEFT JOIN products_clean pc ON pc.listing_key = p.listing_key
+"""
+
+
+def _parse_dt(value: Optional[str]) -> Optional[datetime]:
+    """Textul fără offset e UTC, ca în epoch_ms: coloanele ISO și *_ms derivă din aceeași valoare."""
+    if not value:
+        return None
+    dt = datetime.fromisoformat(value)
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+
+def _clean_columns(r: ProductRow) -> tuple[tuple, tuple]:
+    """(coloanele curățate, argumentele pentru laptop_columns) ale unui rând."""
+    loc_clean, county, city = normalize_location(r.location)
+
+    specs = r.specs() if r.specs_raw and (r.source == "pcgarage" or "stare" in r.specs_raw) else None
+    cond = normalize_condition(r.condition, source=r.source, specs_raw=specs)
+
+    scraped_at = _parse_dt(r.scraped_at)
+    posted = effective_datetime(_parse_dt(r.posted_at), scraped_at)
+
+    title_clean = normalize_title(r.title)
+    base = (
+        r.listing_key if r.listing_key is not None else listing_key(r.url), r.url, r.source, r.category,
+        title_clean, r.brand_guess, r.model_guess, r.mpn_guess,
+        r.price_value, r.currency,
+        loc_clean, county, city,
+        posted.isoformat(),
+        scraped_at.astimezone(timezone.utc).isoformat(),
+        epoch_ms(posted),
+        epoch_ms(scraped_at),
+        r.scrape_run_id,
+    )
+    args = (
+        r.source, r.url, title_clean, r.description_text, r.price_value,
+        r.brand_guess, r.model_guess, specs, cond,
+    )
+    return base, args
+
+
+def _input_hash(r: ProductRow, args: tuple) -> str:
+    # specs_raw intră ca text JSON (nedecodat) și doar dacă laptop_columns îl primește
+    return norm_input_hash(*args[:7], r.specs_raw if args[7] is not None else None, args[8])
+
+
+def clean_row(r: ProductRow) -> tuple:
+    """
+    Calculează toate coloanele products_clean (curățate, hash / versiune, LAPTOP_COLUMNS) direct
+    din rândul SQLite, fără Product. specs_raw e decodat o singură dată, doar dacă poate conține
+    "stare" sau e tabelul de specificații PCGarage (citit de laptop_columns înaintea regex-urilor).
+    """
+    base, args = _clean_columns(r)
+    laptop = laptop_columns(*args[:8], base_condition=args[8])
+    return (*base, _input_hash(r, args), NORM_RULES_VERSIONS[laptop[-1]], *laptop)
+
+
+def ensure_listing_key(con: sqlite3.Connection) -> None:
+    """
+    products_clean creat înainte de listing_key (url PRIMARY KEY): adaugă coloana, o completează
+    din url și pune un index unic pe ea (ținta ON CONFLICT). Același anunț sub mai multe URL-uri
+    -> păstrăm rândul cu URL-ul curent din products.
+    """
+    cols = {r[1] for r in con.execute("PRAGMA table_info(products_clean)")}
+    if "listing_key" in cols:
+        return
+
+    con.execute("ALTER TABLE products_clean ADD COLUMN listing_key INTEGER")
+    urls = [r[0] for r in con.execute("SELECT url FROM products_clean")]
+    con.executemany(
+        "UPDATE products_clean SET listing_key = ? WHERE url = ?",
+        [(listing_key(u), u) for u in urls],
+    )
+    con.execute(
+        """
+        DELETE FROM products_clean WHERE rowid IN (
+            SELECT rid FROM (
+                SELECT
+                    pc.rowid AS rid,
+                    ROW_NUMBER() OVER (
+                        PARTITION BY pc.listing_key
+                        ORDER BY (p.url IS NOT NULL) DESC, pc.scraped_at_utc DESC
+                    ) AS rn
+                FROM products_clean pc
+                LEFT JOIN products p ON p.listing_key = pc.listing_key AND p.url = pc.url
+            )
+            WHERE rn > 1
+        )
+        """
+    )
+    con.execute("CREATE UNIQUE INDEX IF NOT EXISTS uq_products_clean_listing_key ON products_clean(listing_key)")
+
+
+def ensure_epoch_ms(con: sqlite3.Connection) -> None:
+    """products_clean creat înainte de coloanele *_ms: le adaugă (se completează la upsert-ul de mai jos)."""
+    cols = {r[1] for r in con.execute("PRAGMA table_info(products_clean)")}
+    for col in ("posted_at_ms", "scraped_at_ms"):
+        if col not in cols:
+            con.execute(f"ALTER TABLE products_clean ADD COLUMN {col} INTEGER")
+    # fereastra incrementală pe products_clean (ex. re-procesări ad-hoc)
+    con.execute("CREATE INDEX IF NOT EXISTS idx_products_clean_scraped_at_ms ON products_clean(scraped_at_ms)")
+
+
+def ensure_laptop_columns(con: sqlite3.Connection) -> None:
+    """
+    products_clean creat înainte de coloanele normalizate (fostul normalize_clean) sau de
+    hash-ul / versiunea lor: le adaugă (rândurile vechi, fără hash, se recalculează).
+    """
+    cols = {r[1] for r in con.execute("PRAGMA table_info(products_clean)")}
+    ddl = {"ram_gb": "INTEGER", "screen_in": "REAL", "is_laptop": "INTEGER"}
+    for col in ("norm_input_hash", "norm_rules_version", *LAPTOP_COLUMNS):
+        if col not in cols:
+            con.execute(f"ALTER TABLE products_clean ADD COLUMN {col} {ddl.get(col, 'TEXT')}")
+
+
+def ensure_products_clean(con: sqlite3.Connection) -> None:
+    """Creează products_clean și aduce la zi schemele create de versiuni mai vechi."""
+    con.execute(CREATE_SQL)
+    ensure_listing_key(con)
+    ensure_epoch_ms(con)
+    ensure_laptop_columns(con)
+
+
+def clean_rows(
+    con: sqlite3.Connection, where: str, params: tuple = (), force: bool = False
+) -> tuple[list[tuple], list[tuple]]:
+    """
+    Citește doar coloanele necesare (fără description_html) pentru rândurile products p care
+    îndeplinesc `where`. Returnează (rânduri pentru UPSERT_SQL, rânduri pentru REUSE_SQL): al
+    doilea grup are hash-ul intrărilor și versiunea regulilor neschimbate, deci nu mai trece
+    prin laptop_columns. force=True recalculează tot.
+    """
+    n = len(ProductRow._fields)
+    upserts: list[tuple] = []
+    reused: list[tuple] = []
+    for rec in con.execute(f"{SELECT_SQL} WHERE {where}", params):
+        r = ProductRow._make(tuple(rec[:n]))
+        old_hash, old_version, old_is_laptop = rec[n:]
+        base, args = _clean_columns(r)
+        h = _input_hash(r, args)
+        if not force and old_hash == h and old_version == NORM_RULES_VERSIONS.get(old_is_laptop):
+            reused.append((*base[1:], base[0]))
+            continue
+        laptop = laptop_columns(*args[:8], base_condition=args[8])
+        upserts.append((*base, h, NORM_RULES_VERSIONS[laptop[-1]], *laptop))
+    return upserts, reused
+
+
+def write_clean_rows(con: sqlite3.Connection, upserts: list[tuple], reused: list[tuple]) -> None:
+    """Scrie rezultatul clean_rows în tranzacția curentă (commit-ul îl face apelantul)."""
+    con.executemany(UPSERT_SQL, upserts)
+    con.executemany(REUSE_SQL, reused)
@@ -1,13 +1,18 @@
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import zlib
 import sqlite3
 import re
+from datetime import datetime, timezone
 from typing import Iterable, Optional, Tuple
 
-from app.config.base import DB_PATH
+from app.config.base import DB_PATH, STORAGE
+from app.core.utils import epoch_ms, iso_to_epoch_ms, listing_key
 from app.models import Product
+from app.storage.products_clean import clean_rows, ensure_products_clean, write_clean_rows
 
 
 DDL_PRODUCTS = """
@@ -16,8 +21,10 @@ CREATE TABLE IF NOT EXISTS products (
 
   source TEXT NOT NULL,
   category TEXT NOT NULL,
-  url TEXT NOT NULL UNIQUE,
+  listing_key INTEGER NOT NULL,     -- cheia de join (app.core.utils.listing_key), unică
+  url TEXT NOT NULL,                -- atribut: ultimul URL văzut pentru anunț
   scraped_at TEXT NOT NULL,
+  scraped_at_ms INTEGER,            -- scraped_at ca epoch ms (UTC), pentru filtre / sortări pe timp
   scrape_run_id TEXT,
 
   title TEXT NOT NULL,
@@ -28,17 +35,31 @@ CREATE TABLE IF NOT EXISTS products (
   availability TEXT,
   location TEXT,
   posted_at TEXT,
+  posted_at_ms INTEGER,
   description_text TEXT,
-  description_html TEXT,
+  -- description_html e în product_blobs (zlib), citit doar la cerere
 
   brand_guess TEXT,
   model_guess TEXT,
   mpn_guess TEXT,
 
   specs_raw TEXT,
+  content_hash TEXT,
 
   http_status INTEGER,
-  response_time_ms INTEGER
+  response_time_ms INTEGER,
+
+  -- ultimul snapshot scris pentru URL (denormalizat din price_snapshots)
+  last_snapshot_price_value REAL,
+  last_snapshot_at TEXT,
+  price_change_count INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+DDL_PRODUCT_BLOBS = """
+CREATE TABLE IF NOT EXISTS product_blobs (
+  product_id INTEGER PRIMARY KEY REFERENCES products(id) ON DELETE CASCADE,
+  description_html_z BLOB NOT NULL
 );
 """
 
@@ -49,6 +70,8 @@ CREATE TABLE IF NOT EXISTS scrape_runs (
   category TEXT NOT NULL,
   started_at TEXT NOT NULL,
   finished_at TEXT NOT NULL,
+  started_at_ms INTEGER,
+  finished_at_ms INTEGER,
   duration_s REAL NOT NULL,
   pages_requested INTEGER NOT NULL,
   listing_pages_ok INTEGER NOT NULL,
@@ -59,7 +82,10 @@ CREATE TABLE IF NOT EXISTS scrape_runs (
   products_upserted INTEGER NOT NULL,
   products_inserted INTEGER NOT NULL,
   products_updated INTEGER NOT NULL,
-  errors INTEGER NOT NULL
+  products_changed INTEGER NOT NULL DEFAULT 0,
+  products_touched INTEGER NOT NULL DEFAULT 0,
+  errors INTEGER NOT NULL,
+  status TEXT NOT NULL DEFAULT 'finished'   -- running / finished / failed
 );
 """
 
@@ -67,6 +93,7 @@ DDL_PRICE_SNAPSHOTS = """
 CREATE TABLE IF NOT EXISTS price_snapshots (
   id INTEGER PRIMARY KEY AUTOINCREMENT,
 
+  listing_key INTEGER NOT NULL,
   url TEXT NOT NULL,
   source TEXT NOT NULL,
   category TEXT NOT NULL,
@@ -76,28 +103,95 @@ CREATE TABLE IF NOT EXISTS price_snapshots (
   currency TEXT,
 
   scraped_at TEXT NOT NULL,
+  scraped_at_ms INTEGER,
   scrape_run_id TEXT NOT NULL
 );
+"""
 
-CREATE UNIQUE INDEX IF NOT EXISTS uq_snapshots_url_run ON price_snapshots(url, scrape_run_id);
+# Istoricul rece (mai vechi de N zile, vezi SqliteStore.compact_snapshots): un rând pe anunț și zi,
+# cu ultimul preț din zi + min / max; url / source / category se iau din products.
+DDL_PRICE_SNAPSHOTS_DAILY = """
+CREATE TABLE IF NOT EXISTS price_snapshots_daily (
+  listing_key INTEGER NOT NULL,
+  day INTEGER NOT NULL,             -- zile de la epoch (UTC) = scraped_at_ms / 86400000
+  price_value REAL,                 -- ultimul preț din zi
+  price_min REAL,
+  price_max REAL,
+  currency TEXT,
+  scraped_at_ms INTEGER NOT NULL,   -- momentul ultimului snapshot din zi
+  n_snapshots INTEGER NOT NULL,
+  PRIMARY KEY (listing_key, day)
+) WITHOUT ROWID;
+"""
+
+# Istoricul unificat: snapshot-urile recente (price_snapshots) + zilele compactate.
+DDL_PRICE_HISTORY_VIEW = """
+DROP VIEW IF EXISTS price_history;
+CREATE VIEW price_history AS
+SELECT
+  listing_key, url, source, category,
+  price_value, currency, scraped_at, scraped_at_ms, scrape_run_id,
+  1 AS n_snapshots
+FROM price_snapshots
+UNION ALL
+SELECT
+  d.listing_key, p.url, p.source, p.category,
+  d.price_value, d.currency,
+  strftime('%Y-%m-%dT%H:%M:%S+00:00', d.scraped_at_ms / 1000, 'unixepoch'), d.scraped_at_ms, NULL,
+  d.n_snapshots
+FROM price_snapshots_daily d
+LEFT JOIN products p ON p.listing_key = d.listing_key;
+"""
 
-CREATE INDEX IF NOT EXISTS idx_snapshots_url ON price_snapshots(url);
-CREATE INDEX IF NOT EXISTS idx_snapshots_scraped_at ON price_snapshots(scraped_at);
-CREATE INDEX IF NOT EXISTS idx_snapshots_source_category ON price_snapshots(source, category);
-CREATE INDEX IF NOT EXISTS idx_snapshots_url_scraped_at ON price_snapshots(url, scraped_at);
+# Cheile unice pe listing_key; create după backfill-ul listing_key la migrarea DB-urilor vechi.
+# (listing_key, scrape_run_id) acoperă și căutările doar după listing_key.
+DDL_KEY_INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS uq_products_listing_key ON products(listing_key);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_snapshots_key_run ON price_snapshots(listing_key, scrape_run_id);
 """
 
+# Indexuri secundare, alese după query-urile reale din scripts/ (web/ citește doar products_clean):
+# - source / source+category: filtre și GROUP BY source, paginarea pe id din refilter_products
+#   (rowid e implicit la finalul indexului);
+# - source+posted_at_ms: "cele mai noi anunțuri Publi24" din checks;
+# - scraped_at_ms: ferestre de timp pe rulări / snapshot-uri.
+# Timpul e indexat pe coloanele *_ms (INTEGER): chei mai mici decât textul ISO și ordine exactă
+# și când textul are offset-uri diferite (+00:00 / +02:00).
+# UNIQUE-urile (DDL_KEY_INDEXES) nu sunt aici: sunt necesare pentru ON CONFLICT / OR IGNORE.
 DDL_INDEXES = """
-CREATE INDEX IF NOT EXISTS idx_products_source ON products(source);
-CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
-CREATE INDEX IF NOT EXISTS idx_products_scraped_at ON products(scraped_at);
 CREATE INDEX IF NOT EXISTS idx_products_source_category ON products(source, category);
-CREATE INDEX IF NOT EXISTS idx_products_brand_model ON products(brand_guess, model_guess);
-CREATE INDEX IF NOT EXISTS idx_products_posted_at ON products(posted_at);
-CREATE INDEX IF NOT EXISTS idx_products_price_value ON products(price_value);
-CREATE INDEX IF NOT EXISTS idx_products_model_guess ON products(model_guess);
+CREATE INDEX IF NOT EXISTS idx_products_source_posted_at_ms ON products(source, posted_at_ms);
+CREATE INDEX IF NOT EXISTS idx_products_scraped_at_ms ON products(scraped_at_ms);
+CREATE INDEX IF NOT EXISTS idx_snapshots_scraped_at_ms ON price_snapshots(scraped_at_ms);
 """
 
+# Indexuri din versiunile anterioare ale schemei, redundante sau fără query care să le folosească.
+DROPPED_INDEXES = (
+    "idx_products_source",          # prefix al idx_products_source_category
+    "idx_products_category",
+    "idx_products_brand_model",     # brand/model se filtrează doar în products_clean
+    "idx_products_model_guess",
+    "idx_products_posted_at",       # înlocuit de idx_products_source_posted_at
+    "idx_products_price_value",
+    "idx_snapshots_url",
+    "idx_snapshots_url_scraped_at",
+    "idx_snapshots_source_category",
+    "uq_snapshots_url_run",         # înlocuit de uq_snapshots_key_run (INTEGER în loc de TEXT)
+    "idx_products_source_posted_at",  # indexurile pe timp sunt acum pe coloanele *_ms
+    "idx_products_scraped_at",
+    "idx_snapshots_scraped_at",
+)
+
+# coloanele epoch ms (INTEGER) și textul ISO din care se completează la migrare
+EPOCH_MS_COLUMNS = {
+    "products": {"scraped_at_ms": "scraped_at", "posted_at_ms": "posted_at"},
+    "price_snapshots": {"scraped_at_ms": "scraped_at"},
+    "scrape_runs": {"started_at_ms": "started_at", "finished_at_ms": "finished_at"},
+}
+
+# numele indexurilor din DDL_INDEXES (scripts/bench/bench_upsert.py le înlocuiește cu setul vechi)
+SECONDARY_INDEXES = tuple(re.findall(r"CREATE INDEX IF NOT EXISTS (\w+)", DDL_INDEXES))
+
 def _parse_price_value(price) -> float | None:
     """
     Acceptă:
@@ -150,279 +244,701 @@ def _parse_price_value(price) -> float | None:
     except ValueError:
         return None
 
+# valorile calculate din Product, în ordinea în care intră și în content_hash
+_VALUE_COLUMNS = (
+    "source", "category", "url", "scraped_at", "scrape_run_id",
+    "title", "price", "price_value", "currency", "condition", "availability",
+    "location", "posted_at", "description_text", "description_html",
+    "brand_guess", "model_guess", "mpn_guess", "specs_raw",
+    "http_status", "response_time_ms",
+)
+
+# coloanele scrise în products (description_html merge comprimat în product_blobs)
+PRODUCT_COLUMNS = tuple(c for c in _VALUE_COLUMNS if c != "description_html") + (
+    "listing_key", "content_hash", "scraped_at_ms", "posted_at_ms",
+)
+
+# coloanele care NU intră în content_hash (se schimbă la fiecare scrape fără ca anunțul să se schimbe)
+_VOLATILE_COLUMNS = {"scraped_at", "scrape_run_id", "http_status", "response_time_ms"}
+
+_PRODUCT_COLUMNS_SQL = ", ".join(PRODUCT_COLUMNS)
+
+DDL_STAGE_PRODUCTS = f"""
+CREATE TEMP TABLE IF NOT EXISTS stage_products (
+  seq INTEGER PRIMARY KEY,
+  {", ".join(PRODUCT_COLUMNS)},
+  description_html_z BLOB,
+  snap INTEGER NOT NULL DEFAULT 0,
+  price_changed INTEGER NOT NULL DEFAULT 0,
+  touch_only INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+INSERT_STAGE_SQL = f"""
+INSERT INTO temp.stage_products(seq, {_PRODUCT_COLUMNS_SQL}, description_html_z)
+VALUES ({", ".join(["?"] * (len(PRODUCT_COLUMNS) + 2))})
+"""
+
+# touch_only = conținutul e identic cu cel deja scris pentru URL (rândul anterior din lot
+# sau products.content_hash); pentru aceste rânduri actualizăm doar scraped_at / scrape_run_id.
+MARK_TOUCH_ONLY_SQL = """
+WITH batch AS (
+    SELECT
+        s.seq,
+        s.content_hash,
+        CASE
+            WHEN ROW_NUMBER() OVER w = 1 THEN p.content_hash
+            ELSE LAG(s.content_hash) OVER w
+        END AS prev_hash
+    FROM temp.stage_products s
+    LEFT JOIN products p ON p.listing_key = s.listing_key
+    WINDOW w AS (PARTITION BY s.listing_key ORDER BY s.seq)
+)
+UPDATE temp.stage_products
+SET touch_only = 1
+WHERE seq IN (SELECT seq FROM batch WHERE prev_hash = content_hash)
+"""
+
+# Marchează rândurile din lot care primesc snapshot: preț diferit de cel anterior pentru anunț.
+# Prețul anterior = LAG în lot (ordinea produselor) sau, la prima apariție a anunțului,
+# products.last_snapshot_price_value (rulat înainte de upsert, deci starea dinaintea lotului).
+MARK_SNAPSHOTS_SQL = """
+WITH batch AS (
+    SELECT
+        s.seq,
+        s.price_value,
+        CASE
+            WHEN ROW_NUMBER() OVER w = 1 THEN p.last_snapshot_price_value
+            ELSE LAG(s.price_value) OVER w
+        END AS prev_value
+    FROM temp.stage_products s
+    LEFT JOIN products p ON p.listing_key = s.listing_key
+    WHERE s.scrape_run_id IS NOT NULL AND s.price_value IS NOT NULL
+    WINDOW w AS (PARTITION BY s.listing_key ORDER BY s.seq)
+)
+UPDATE temp.stage_products
+SET snap = 1,
+    price_changed = (SELECT b.prev_value IS NOT NULL FROM batch b WHERE b.seq = stage_products.seq)
+WHERE seq IN (SELECT seq FROM batch WHERE prev_value IS NOT price_value)
+"""
+
+# (listing_key, scrape_run_id) e unic în price_snapshots: rândurile care ar fi ignorate la INSERT
+# nu trebuie să mute nici last_snapshot_* (coloanele reflectă doar snapshot-urile scrise).
+UNMARK_DUPLICATE_SNAPSHOTS_SQL = """
+UPDATE temp.stage_products
+SET snap = 0, price_changed = 0
+WHERE snap = 1
+  AND (
+    EXISTS (
+        SELECT 1 FROM price_snapshots ps
+        WHERE ps.listing_key = stage_products.listing_key AND ps.scrape_run_id = stage_products.scrape_run_id
+    )
+    OR EXISTS (
+        SELECT 1 FROM temp.stage_products e
+        WHERE e.listing_key = stage_products.listing_key AND e.scrape_run_id = stage_products.scrape_run_id
+          AND e.snap = 1 AND e.seq < stage_products.seq
+    )
+  )
+"""
+
+SNAPSHOTS_FROM_STAGE_SQL = """
+INSERT OR IGNORE INTO price_snapshots(
+    listing_key, url, source, category, price, price_value, currency, scraped_at, scraped_at_ms, scrape_run_id
+)
+SELECT listing_key, url, source, category, price, price_value, currency, scraped_at, scraped_at_ms, scrape_run_id
+FROM temp.stage_products
+WHERE snap = 1
+ORDER BY seq
+"""
+
+# Doar rândurile noi / cu conținut schimbat. (Clauza WHERE e necesară oricum, ca parserul
+# SQLite să nu confunde ON CONFLICT cu un JOIN ... ON.)
+UPSERT_FROM_STAGE_SQL = f"""
+INSERT INTO products(
+    {_PRODUCT_COLUMNS_SQL},
+    last_snapshot_price_value, last_snapshot_at, price_change_count
+)
+SELECT
+    {_PRODUCT_COLUMNS_SQL},
+    CASE WHEN snap = 1 THEN price_value END,
+    CASE WHEN snap = 1 THEN scraped_at END,
+    price_changed
+FROM temp.stage_products
+WHERE touch_only = 0
+ORDER BY seq
+ON CONFLICT(listing_key) DO UPDATE SET
+    url=excluded.url,
+    scraped_at=excluded.scraped_at,
+    scraped_at_ms=excluded.scraped_at_ms,
+    scrape_run_id=excluded.scrape_run_id,
+
+    -- mereu actualizabile (nu vrem să rămână titlu/price vechi)
+    title=excluded.title,
+    price=excluded.price,
+    price_value=excluded.price_value,
+    currency=excluded.currency,
+
+    -- nu suprascriem cu NULL (păstrăm ce aveam dacă noul e gol)
+    condition=COALESCE(excluded.condition, products.condition),
+    availability=COALESCE(excluded.availability, products.availability),
+    location=COALESCE(excluded.location, products.location),
+    posted_at=COALESCE(excluded.posted_at, products.posted_at),
+    posted_at_ms=COALESCE(excluded.posted_at_ms, products.posted_at_ms),
+    description_text=COALESCE(excluded.description_text, products.description_text),
+    brand_guess=COALESCE(excluded.brand_guess, products.brand_guess),
+    model_guess=COALESCE(excluded.model_guess, products.model_guess),
+    mpn_guess=COALESCE(excluded.mpn_guess, products.mpn_guess),
+    specs_raw=COALESCE(excluded.specs_raw, products.specs_raw),
+    content_hash=excluded.content_hash,
+
+    http_status=excluded.http_status,
+    response_time_ms=excluded.response_time_ms,
+
+    -- NULL în excluded = fără snapshot nou pentru rândul ăsta
+    last_snapshot_price_value=COALESCE(excluded.last_snapshot_price_value, products.last_snapshot_price_value),
+    last_snapshot_at=COALESCE(excluded.last_snapshot_at, products.last_snapshot_at),
+    price_change_count=COALESCE(products.price_change_count, 0) + excluded.price_change_count
+"""
+
+# HTML-ul comprimat, doar pentru rândurile scrise complet (la touch_only HTML-ul e identic);
+# ca la celelalte coloane, un HTML lipsă nu îl suprascrie pe cel existent.
+BLOBS_FROM_STAGE_SQL = """
+INSERT INTO product_blobs(product_id, description_html_z)
+SELECT p.id, s.description_html_z
+FROM temp.stage_products s
+JOIN products p ON p.listing_key = s.listing_key
+WHERE s.touch_only = 0 AND s.description_html_z IS NOT NULL
+ORDER BY s.seq
+ON CONFLICT(product_id) DO UPDATE SET description_html_z = excluded.description_html_z
+"""
+
+# Rândurile touch_only: nu rescriem conținutul (description_html etc.) și nu atingem coloanele
+# indexate în afară de scraped_at. Per URL se aplică doar dacă touch-ul e după ultima scriere
+# completă din lot; snapshot-urile (rare aici) se cumulează la fel ca în upsert.
+TOUCH_FROM_STAGE_SQL = """
+WITH agg AS (
+    SELECT
+        listing_key,
+        MAX(CASE WHEN touch_only = 1 THEN seq END) AS last_touch,
+        COALESCE(MAX(CASE WHEN touch_only = 0 THEN seq END), -1) AS last_write,
+        MAX(CASE WHEN touch_only = 1 AND snap = 1 THEN seq END) AS last_touch_snap,
+        COALESCE(MAX(CASE WHEN touch_only = 0 AND snap = 1 THEN seq END), -1) AS last_write_snap,
+        SUM(CASE WHEN touch_only = 1 THEN price_changed ELSE 0 END) AS touch_changes
+    FROM temp.stage_products
+    GROUP BY listing_key
+    HAVING last_touch IS NOT NULL
+)
+UPDATE products
+SET
+    scraped_at = CASE WHEN agg.last_touch > agg.last_write THEN t.scraped_at ELSE products.scraped_at END,
+    scraped_at_ms = CASE WHEN agg.last_touch > agg.last_write THEN t.scraped_at_ms ELSE products.scraped_at_ms END,
+    scrape_run_id = CASE WHEN agg.last_touch > agg.last_write THEN t.scrape_run_id ELSE products.scrape_run_id END,
+    last_snapshot_price_value = CASE
+        WHEN agg.last_touch_snap > agg.last_write_snap THEN sn.price_value ELSE products.last_snapshot_price_value
+    END,
+    last_snapshot_at = CASE
+        WHEN agg.last_touch_snap > agg.last_write_snap THEN sn.scraped_at ELSE products.last_snapshot_at
+    END,
+    price_change_count = COALESCE(products.price_change_count, 0) + agg.touch_changes
+FROM agg
+JOIN temp.stage_products t ON t.seq = agg.last_touch
+LEFT JOIN temp.stage_products sn ON sn.seq = agg.last_touch_snap
+WHERE products.listing_key = agg.listing_key
+"""
+
+DAY_MS = 86_400_000
+
+# Mută snapshot-urile dinainte de :cutoff_ms în price_snapshots_daily (o zi deja compactată
+# primește doar completări: n / min / max se cumulează, prețul zilei rămâne cel mai recent).
+COMPACT_SNAPSHOTS_SQL = """
+INSERT INTO price_snapshots_daily(
+    listing_key, day, price_value, price_min, price_max, currency, scraped_at_ms, n_snapshots
+)
+SELECT listing_key, day, price_value, price_min, price_max, currency, scraped_at_ms, n_snapshots
+FROM (
+    SELECT
+        listing_key,
+        scraped_at_ms / 86400000 AS day,
+        price_value,
+        currency,
+        scraped_at_ms,
+        MIN(price_value) OVER g AS price_min,
+        MAX(price_value) OVER g AS price_max,
+        COUNT(*) OVER g AS n_snapshots,
+        ROW_NUMBER() OVER (
+            PARTITION BY listing_key, scraped_at_ms / 86400000 ORDER BY scraped_at_ms DESC, id DESC
+        ) AS rn
+    FROM price_snapshots
+    WHERE scraped_at_ms < :cutoff_ms
+    WINDOW g AS (PARTITION BY listing_key, scraped_at_ms / 86400000)
+)
+WHERE rn = 1
+ORDER BY listing_key, day
+ON CONFLICT(listing_key, day) DO UPDATE SET
+    price_value = CASE WHEN excluded.scraped_at_ms >= price_snapshots_daily.scraped_at_ms
+                       THEN excluded.price_value ELSE price_snapshots_daily.price_value END,
+    currency = CASE WHEN excluded.scraped_at_ms >= price_snapshots_daily.scraped_at_ms
+                    THEN excluded.currency ELSE price_snapshots_daily.currency END,
+    price_min = MIN(excluded.price_min, price_snapshots_daily.price_min),
+    price_max = MAX(excluded.price_max, price_snapshots_daily.price_max),
+    scraped_at_ms = MAX(excluded.scraped_at_ms, price_snapshots_daily.scraped_at_ms),
+    n_snapshots = price_snapshots_daily.n_snapshots + excluded.n_snapshots
+"""
+
+# Pentru DB-uri vechi: completează coloanele last_snapshot_* din istoricul price_snapshots.
+BACKFILL_LAST_SNAPSHOT_SQL = """
+WITH ranked AS (
+    SELECT
+        listing_key, price_value, scraped_at,
+        ROW_NUMBER() OVER (PARTITION BY listing_key ORDER BY scraped_at_ms DESC, id DESC) AS rn,
+        COUNT(*) OVER (PARTITION BY listing_key) AS n
+    FROM price_snapshots
+)
+UPDATE products
+SET last_snapshot_price_value = r.price_value,
+    last_snapshot_at = r.scraped_at,
+    price_change_count = r.n - 1
+FROM ranked r
+WHERE r.listing_key = products.listing_key AND r.rn = 1
+"""
+
+
+def compress_html(html: Optional[str]) -> Optional[bytes]:
+    if not html:
+        return None
+    return zlib.compress(html.encode("utf-8"), STORAGE.html_compress_level)
+
+
+def decompress_html(blob: Optional[bytes]) -> Optional[str]:
+    if blob is None:
+        return None
+    return zlib.decompress(blob).decode("utf-8")
+
+
+def _content_hash(values: tuple) -> str:
+    """sha1 peste coloanele de conținut (fără _VOLATILE_COLUMNS), în ordinea _VALUE_COLUMNS."""
+    content = [v for col, v in zip(_VALUE_COLUMNS, values) if col not in _VOLATILE_COLUMNS]
+    payload = json.dumps(content, ensure_ascii=False, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def _product_params(p: Product, store_html: bool = True) -> tuple:
+    """
+    Valorile pentru PRODUCT_COLUMNS (aceeași ordine) + description_html comprimat (sau None),
+    calculate din Product. Hash-ul include HTML-ul brut chiar dacă nu e stocat.
+    Coloanele *_ms se calculează din același text ISO scris în scraped_at / posted_at.
+    """
+    price_str = str(p.price).strip() if p.price is not None else None
+
+    condition = getattr(p, "condition", None)
+    if not condition and p.specs_raw and isinstance(p.specs_raw, dict):
+        condition = p.specs_raw.get("stare")
+
+    values = (
+        p.source,
+        p.category,
+        str(p.url),
+        p.scraped_at.isoformat() if hasattr(p.scraped_at, "isoformat") else str(p.scraped_at),
+        p.scrape_run_id,
+        p.title,
+        price_str,
+        _parse_price_value(p.price),
+        p.currency,
+        condition,
+        p.availability,
+        p.location,
+        (p.posted_at.isoformat() if hasattr(p.posted_at, "isoformat") else str(p.posted_at)) if p.posted_at else None,
+        p.description_text,
+        p.description_html,
+        p.brand_guess,
+        p.model_guess,
+        p.mpn_guess,
+        json.dumps(p.specs_raw, ensure_ascii=False) if p.specs_raw else None,
+        p.http_status,
+        p.response_time_ms,
+    )
+    row = dict(zip(_VALUE_COLUMNS, values))
+    html = row.pop("description_html")
+    return (
+        *row.values(),
+        listing_key(row["url"]),
+        _content_hash(values),
+        iso_to_epoch_ms(row["scraped_at"]),
+        iso_to_epoch_ms(row["posted_at"]),
+        compress_html(html) if store_html else None,
+    )
+
+
+def _execute_statements(conn: sqlite3.Connection, sql: str) -> None:
+    """Ca executescript, dar fără COMMIT implicit (rămânem în tranzacția curentă)."""
+    for stmt in [s.strip() for s in sql.split(";") if s.strip()]:
+        conn.execute(stmt)
+
+
 class SqliteStore:
-    def __init__(self, db_path: str = DB_PATH):
-        self.db_path = db_path
+    """
+    Acces la products.db pentru scraper.
+
+    Store-ul ține o singură conexiune pe toată durata lui (close() / context manager).
+    Schema e versionată prin PRAGMA user_version: DDL-ul și migrațiile rulează doar
+    când versiunea din fișier e mai mică decât SCHEMA_VERSION.
+    """
+
+    # crește la fiecare modificare de schemă (tabele / coloane / indexuri)
+    SCHEMA_VERSION = 7
+
+    PRAGMAS = (
+        "PRAGMA journal_mode=WAL;",
+        "PRAGMA synchronous=NORMAL;",
+        "PRAGMA foreign_keys=ON;",
+        "PRAGMA busy_timeout=5000;",
+        "PRAGMA temp_store=MEMORY;",
+        "PRAGMA cache_size=-65536;",      # ~64 MB
+        "PRAGMA mmap_size=268435456;",    # 256 MB
+    )
+
+    def __init__(
+        self,
+        db_path: str = DB_PATH,
+        store_html: Optional[bool] = None,
+        clean_on_ingest: Optional[bool] = None,
+    ):
+        self.db_path = str(db_path)
+        # STORE_DESCRIPTION_HTML=0 -> description_html nu se mai salvează deloc
+        self.store_html = STORAGE.store_description_html if store_html is None else store_html
+        # CLEAN_ON_INGEST=1 -> upsert_products scrie și rândurile products_clean ale lotului
+        self.clean_on_ingest = STORAGE.clean_on_ingest if clean_on_ingest is None else clean_on_ingest
+        self._clean_ready = False
+        # defalcarea ultimului upsert_products: scrieri complete vs. doar scraped_at/scrape_run_id
+        self.last_changed = 0
+        self.last_touched = 0
+        self._conn: Optional[sqlite3.Connection] = None
         self._ensure_parent_dir()
         self._init_db()
 
+    def __enter__(self) -> "SqliteStore":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        self._conn.close()
+        self._conn = None
+
     def _ensure_parent_dir(self) -> None:
         parent = os.path.dirname(self.db_path)
         if parent:
             os.makedirs(parent, exist_ok=True)
 
     def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        conn.execute("PRAGMA journal_mode=WAL;")
-        conn.execute("PRAGMA foreign_keys=ON;")
-        return conn
+        """Conexiunea persistentă (deschisă la prima folosire, cu pragma-urile din PRAGMAS)."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path)
+            conn.row_factory = sqlite3.Row
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            self._conn = conn
+        return self._conn
+
+    def schema_version(self) -> int:
+        return int(self._connect().execute("PRAGMA user_version;").fetchone()[0])
 
     def _init_db(self) -> None:
-        with self._connect() as conn:
-            # 1) Create tables (safe)
-            conn.execute(DDL_PRODUCTS)
-            conn.execute(DDL_SCRAPE_RUNS)
-            conn.executescript(DDL_PRICE_SNAPSHOTS)
-            conn.execute("PRAGMA journal_mode=WAL;")
-            conn.execute("PRAGMA synchronous=NORMAL;")
-            conn.execute("PRAGMA foreign_keys=ON;")
-
-            # 2) Migrations for older DBs (ADD COLUMN where missing)
-            # NOTE: SQLite can't easily add NOT NULL constraints on existing tables,
-            # so we keep these columns nullable in migrations.
-            products_required = {
-                "source": "TEXT",
-                "category": "TEXT",
-                "url": "TEXT",
-                "scraped_at": "TEXT",
-                "scrape_run_id": "TEXT",
-                "title": "TEXT",
-                "price": "TEXT",
-                "price_value": "REAL",
-                "currency": "TEXT",
-                "availability": "TEXT",
-                "location": "TEXT",
-                "posted_at": "TEXT",
-                "condition": "TEXT",
-                "description_text": "TEXT",
-                "description_html": "TEXT",
-                "brand_guess": "TEXT",
-                "model_guess": "TEXT",
-                "mpn_guess": "TEXT",
-                "specs_raw": "TEXT",
-                "http_status": "INTEGER",
-                "response_time_ms": "INTEGER",
-            }
-
-            scrape_runs_required = {
-                "run_id": "TEXT",
-                "site_name": "TEXT",
-                "category": "TEXT",
-                "started_at": "TEXT",
-                "finished_at": "TEXT",
-                "duration_s": "REAL",
-                "pages_requested": "INTEGER",
-                "listing_pages_ok": "INTEGER",
-                "detail_pages_ok": "INTEGER",
-                "products_parsed_total": "INTEGER",
-                "products_parsed": "INTEGER",
-                "products_filtered": "INTEGER",
-                "products_upserted": "INTEGER",
-                "products_inserted": "INTEGER",
-                "products_updated": "INTEGER",
-                "errors": "INTEGER",
-            }
-
-            self._ensure_columns(conn, "products", products_required)
-            self._ensure_columns(conn, "scrape_runs", scrape_runs_required)
-
-            # 3) Indexes (safe)
-            for stmt in [s.strip() for s in DDL_INDEXES.split(";") if s.strip()]:
-                conn.execute(stmt)
+        conn = self._connect()
+        if self.schema_version() >= self.SCHEMA_VERSION:
+            return
 
+        # BEGIN IMMEDIATE: două procese care pornesc simultan nu migrează de două ori
+        conn.execute("BEGIN IMMEDIATE;")
+        try:
+            if self.schema_version() < self.SCHEMA_VERSION:
+                self._migrate(conn)
+                conn.execute(f"PRAGMA user_version={int(self.SCHEMA_VERSION)};")
             conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Aduce schema la SCHEMA_VERSION. Toți pașii sunt idempotenți (IF NOT EXISTS / ADD COLUMN lipsă)."""
+        # 1) Create tables (safe)
+        conn.execute(DDL_PRODUCTS)
+        conn.execute(DDL_SCRAPE_RUNS)
+        conn.execute(DDL_PRODUCT_BLOBS)
+        _execute_statements(conn, DDL_PRICE_SNAPSHOTS)
+        conn.execute(DDL_PRICE_SNAPSHOTS_DAILY)
+
+        # 2) Migrations for older DBs (ADD COLUMN where missing)
+        # NOTE: SQLite can't easily add NOT NULL constraints on existing tables,
+        # so we keep these columns nullable in migrations.
+        products_required = {
+            "source": "TEXT",
+            "category": "TEXT",
+            "url": "TEXT",
+            "listing_key": "INTEGER",
+            "scraped_at": "TEXT",
+            "scraped_at_ms": "INTEGER",
+            "scrape_run_id": "TEXT",
+            "title": "TEXT",
+            "price": "TEXT",
+            "price_value": "REAL",
+            "currency": "TEXT",
+            "availability": "TEXT",
+            "location": "TEXT",
+            "posted_at": "TEXT",
+            "posted_at_ms": "INTEGER",
+            "condition": "TEXT",
+            "description_text": "TEXT",
+            "brand_guess": "TEXT",
+            "model_guess": "TEXT",
+            "mpn_guess": "TEXT",
+            "specs_raw": "TEXT",
+            "content_hash": "TEXT",
+            "http_status": "INTEGER",
+            "response_time_ms": "INTEGER",
+            "last_snapshot_price_value": "REAL",
+            "last_snapshot_at": "TEXT",
+            "price_change_count": "INTEGER NOT NULL DEFAULT 0",
+        }
+
+        scrape_runs_required = {
+            "run_id": "TEXT",
+            "site_name": "TEXT",
+            "category": "TEXT",
+            "started_at": "TEXT",
+            "finished_at": "TEXT",
+            "started_at_ms": "INTEGER",
+            "finished_at_ms": "INTEGER",
+            "duration_s": "REAL",
+            "pages_requested": "INTEGER",
+            "listing_pages_ok": "INTEGER",
+            "detail_pages_ok": "INTEGER",
+            "products_parsed_total": "INTEGER",
+            "products_parsed": "INTEGER",
+            "products_filtered": "INTEGER",
+            "products_upserted": "INTEGER",
+            "products_inserted": "INTEGER",
+            "products_updated": "INTEGER",
+            "products_changed": "INTEGER NOT NULL DEFAULT 0",
+            "products_touched": "INTEGER NOT NULL DEFAULT 0",
+            "errors": "INTEGER",
+            "status": "TEXT NOT NULL DEFAULT 'finished'",
+        }
+
+        needs_snapshot_backfill = "last_snapshot_at" not in self._table_columns(conn, "products")
+        self._ensure_columns(conn, "products", products_required)
+        self._ensure_columns(conn, "price_snapshots", {"listing_key": "INTEGER", "scraped_at_ms": "INTEGER"})
+        self._ensure_columns(conn, "scrape_runs", scrape_runs_required)
+        self._backfill_epoch_ms(conn)
+        if self._backfill_listing_keys(conn):
+            # anunțurile cu mai multe URL-uri au fost unite -> recalculăm și last_snapshot_*
+            needs_snapshot_backfill = True
+        if needs_snapshot_backfill:
+            conn.execute(BACKFILL_LAST_SNAPSHOT_SQL)
+
+        # DB-uri vechi: products.description_html -> product_blobs (coloana rămâne, dar goală;
+        # spațiul se recuperează cu scripts/vacuum_db.py)
+        if "description_html" in self._table_columns(conn, "products"):
+            self._move_html_to_blobs(conn)
+
+        # 3) Indexes (safe)
+        for name in DROPPED_INDEXES:
+            conn.execute(f"DROP INDEX IF EXISTS {name};")
+        _execute_statements(conn, DDL_KEY_INDEXES)
+        _execute_statements(conn, DDL_INDEXES)
+
+        # 4) Views (recreate, ca să urmeze coloanele curente)
+        _execute_statements(conn, DDL_PRICE_HISTORY_VIEW)
+
+    def _backfill_epoch_ms(self, conn: sqlite3.Connection) -> None:
+        """DB-uri vechi: completează coloanele *_ms din textul ISO (parsat în Python, cu offset-ul lui)."""
+        conn.create_function("iso_to_epoch_ms", 1, iso_to_epoch_ms, deterministic=True)
+        for table, columns in EPOCH_MS_COLUMNS.items():
+            for ms_col, iso_col in columns.items():
+                conn.execute(
+                    f"""
+                    UPDATE {table} SET {ms_col} = iso_to_epoch_ms({iso_col})
+                    WHERE {ms_col} IS NULL AND {iso_col} IS NOT NULL AND {iso_col} <> ''
+                    """
+                )
+
+    def _backfill_listing_keys(self, conn: sqlite3.Connection) -> bool:
+        """
+        DB-uri vechi: calculează listing_key din url pentru products / price_snapshots.
+        Dacă mai multe URL-uri sunt același anunț (ex. slug Publi24 schimbat), păstrăm în products
+        rândul scrapuit cel mai recent; istoricul de prețuri rămâne, sub aceeași cheie.
+        """
+        touched = False
+        for table in ("products", "price_snapshots"):
+            urls = [r[0] for r in conn.execute(f"SELECT DISTINCT url FROM {table} WHERE listing_key IS NULL")]
+            if not urls:
+                continue
+            touched = True
+            conn.executemany(
+                f"UPDATE {table} SET listing_key = ? WHERE url = ? AND listing_key IS NULL",
+                [(listing_key(u), u) for u in urls],
+            )
+        if not touched:
+            return False
+
+        conn.execute(
+            """
+            DELETE FROM products WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY listing_key ORDER BY scraped_at_ms DESC, id DESC
+                    ) AS rn
+                    FROM products
+                ) WHERE rn > 1
+            )
+            """
+        )
+        conn.execute(
+            """
+            DELETE FROM price_snapshots WHERE id IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (PARTITION BY listing_key, scrape_run_id ORDER BY id) AS rn
+                    FROM price_snapshots
+                ) WHERE rn > 1
+            )
+            """
+        )
+        return True
+
+    def _move_html_to_blobs(self, conn: sqlite3.Connection, chunk_size: int = 500) -> None:
+        last_id = 0
+        while True:
+            rows = conn.execute(
+                """
+                SELECT id, description_html FROM products
+                WHERE id > ? AND description_html IS NOT NULL
+                ORDER BY id LIMIT ?
+                """,
+                (last_id, chunk_size),
+            ).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            if self.store_html:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO product_blobs(product_id, description_html_z) VALUES (?, ?)",
+                    [(r[0], compress_html(r[1])) for r in rows if r[1]],
+                )
+            conn.executemany("UPDATE products SET description_html = NULL WHERE id = ?", [(r[0],) for r in rows])
+
+    def get_description_html(self, url: str) -> Optional[str]:
+        """Încarcă (și decomprimă) description_html doar pentru cine are nevoie de el."""
+        row = self._connect().execute(
+            """
+            SELECT b.description_html_z
+            FROM products p
+            JOIN product_blobs b ON b.product_id = p.id
+            WHERE p.listing_key = ?
+            """,
+            (listing_key(url),),
+        ).fetchone()
+        return decompress_html(row[0]) if row else None
 
     def upsert_products(self, products: Iterable[Product]) -> tuple[int, int, int]:
         """
         Returnează: (upserted_total, inserted, updated)
 
-        Optimizare:
-        - preluăm toate URL-urile existente din DB într-un singur SELECT (chunked),
-        ca să evităm SELECT per produs.
+        Set-based:
+        - lotul e încărcat cu executemany într-un tabel TEMP de staging;
+        - inserted/updated se numără cu un singur JOIN față de products (înainte de upsert);
+        - snapshot-urile se decid comparând prețul cu products.last_snapshot_price_value
+          (sau cu rândul anterior din lot), fără lookup în price_snapshots;
+        - products primește un singur INSERT ... SELECT ... ON CONFLICT(listing_key), care actualizează
+          și last_snapshot_price_value / last_snapshot_at / price_change_count;
+        - rândurile cu content_hash neschimbat primesc doar scraped_at / scrape_run_id
+          (defalcarea e în self.last_changed / self.last_touched);
+        - cu clean_on_ingest, rândurile products_clean ale lotului se scriu în aceeași tranzacție.
         """
-        products_list = list(products)
-        if not products_list:
+        rows = [(seq, *_product_params(p, self.store_html)) for seq, p in enumerate(products)]
+        if not rows:
             return 0, 0, 0
 
-        upserted = 0
-        inserted = 0
-        updated = 0
+        with self._connect() as conn:
+            conn.execute(DDL_STAGE_PRODUCTS)
+            conn.execute("DELETE FROM temp.stage_products;")
+            conn.executemany(INSERT_STAGE_SQL, rows)
 
-        urls = [str(p.url) for p in products_list]
+            # 1) câte URL-uri existau deja înainte de lot (duplicatele din lot se numără fiecare)
+            updated = conn.execute(
+                """
+                SELECT COUNT(*)
+                FROM temp.stage_products s
+                WHERE EXISTS (SELECT 1 FROM products p WHERE p.listing_key = s.listing_key)
+                """
+            ).fetchone()[0]
 
-        # SQLite are limită de variabile în query (de obicei 999).
-        # Lăsăm o marjă de siguranță.
-        CHUNK_SIZE = 800
+            # 2) snapshot doar dacă prețul diferă de ultimul cunoscut (înainte de upsert!)
+            conn.execute(MARK_SNAPSHOTS_SQL)
+            conn.execute(UNMARK_DUPLICATE_SNAPSHOTS_SQL)
+            conn.execute(SNAPSHOTS_FROM_STAGE_SQL)
 
-        def chunks(lst: list[str], size: int):
-            for i in range(0, len(lst), size):
-                yield lst[i : i + size]
+            # 3) UPSERT pentru rândurile noi / schimbate (+ coloanele last_snapshot_*)
+            conn.execute(MARK_TOUCH_ONLY_SQL)
+            conn.execute(UPSERT_FROM_STAGE_SQL)
+            conn.execute(BLOBS_FROM_STAGE_SQL)
 
-        with self._connect() as conn:
-            cur = conn.cursor()
-
-            # 1) Preluăm setul de URL-uri deja existente
-            existing_urls: set[str] = set()
-            for chunk in chunks(urls, CHUNK_SIZE):
-                placeholders = ",".join(["?"] * len(chunk))
-                cur.execute(
-                    f"SELECT url FROM products WHERE url IN ({placeholders});",
-                    chunk,
-                )
-                existing_urls.update(row[0] for row in cur.fetchall())
-
-            last_snapshot_cache: dict[str, tuple[Optional[float], Optional[str]]] = {}
-
-            # 2) UPSERT pentru fiecare produs + numărătoare insert/update
-            for p in products_list:
-                specs_raw_str = json.dumps(p.specs_raw, ensure_ascii=False) if p.specs_raw else None
-                url_str = str(p.url)
-
-                price_str = str(p.price).strip() if p.price is not None else None
-                price_val = _parse_price_value(p.price)
-
-                condition = getattr(p, "condition", None)
-                if not condition and p.specs_raw and isinstance(p.specs_raw, dict):
-                    condition = p.specs_raw.get("stare")
-
-                params = (
-                    p.source,
-                    p.category,
-                    url_str,
-                    p.scraped_at.isoformat() if hasattr(p.scraped_at, "isoformat") else str(p.scraped_at),
-                    p.scrape_run_id,
-                    p.title,
-                    price_str,
-                    price_val,
-                    p.currency,
-                    condition,
-                    p.availability,
-                    p.location,
-                    (p.posted_at.isoformat() if hasattr(p.posted_at, "isoformat") else str(p.posted_at)) if p.posted_at else None,
-                    p.description_text,
-                    p.description_html,
-                    p.brand_guess,
-                    p.model_guess,
-                    p.mpn_guess,
-                    specs_raw_str,
-                    p.http_status,
-                    p.response_time_ms,
-                )
-
-                cur.execute(
-                    """
-                    INSERT INTO products(
-                        source, category, url, scraped_at, scrape_run_id,
-                        title, price, price_value, currency, condition, availability, 
-                        location, posted_at, description_text, description_html,
-                        brand_guess, model_guess, mpn_guess, specs_raw,
-                        http_status, response_time_ms
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    ON CONFLICT(url) DO UPDATE SET
-                        scraped_at=excluded.scraped_at,
-                        scrape_run_id=excluded.scrape_run_id,
-
-                        -- mereu actualizabile (nu vrem să rămână titlu/price vechi)
-                        title=excluded.title,
-                        price=excluded.price,
-                        price_value=excluded.price_value,
-                        currency=excluded.currency,
-
-                        -- nu suprascriem cu NULL (păstrăm ce aveam dacă noul e gol)
-                        condition=COALESCE(excluded.condition, products.condition),
-                        availability=COALESCE(excluded.availability, products.availability),
-                        location=COALESCE(excluded.location, products.location),
-                        posted_at=COALESCE(excluded.posted_at, products.posted_at),
-                        description_text=COALESCE(excluded.description_text, products.description_text),
-                        description_html=COALESCE(excluded.description_html, products.description_html),
-                        brand_guess=COALESCE(excluded.brand_guess, products.brand_guess),
-                        model_guess=COALESCE(excluded.model_guess, products.model_guess),
-                        mpn_guess=COALESCE(excluded.mpn_guess, products.mpn_guess),
-                        specs_raw=COALESCE(excluded.specs_raw, products.specs_raw),
-
-                        http_status=excluded.http_status,
-                        response_time_ms=excluded.response_time_ms
-                    """,
-                    params,
-                )
+            # 4) conținut identic -> doar scraped_at / scrape_run_id
+            conn.execute(TOUCH_FROM_STAGE_SQL)
+            touched = conn.execute(
+                "SELECT COUNT(*) FROM temp.stage_products WHERE touch_only = 1"
+            ).fetchone()[0]
 
-                # snapshot only if we have a price (optional: store even null prices)
-                if p.scrape_run_id and price_val is not None:
-                    # 1) luăm ultimul snapshot pentru URL (din cache sau DB)
-                    if url_str in last_snapshot_cache:
-                        last_price_value, last_price_str = last_snapshot_cache[url_str]
-                    else:
-                        row = cur.execute(
-                            """
-                            SELECT price_value, price
-                            FROM price_snapshots
-                            WHERE url = ?
-                            ORDER BY scraped_at DESC
-                            LIMIT 1
-                            """,
-                            (url_str,),
-                        ).fetchone()
-                        if row:
-                            last_price_value, last_price_str = row[0], row[1]
-                        else:
-                            last_price_value, last_price_str = None, None
-                        last_snapshot_cache[url_str] = (last_price_value, last_price_str)
-
-                    # 2) comparăm: dacă e identic, nu inserăm
-                    same_value = (last_price_value is not None and float(last_price_value) == float(price_val))
-                    if not same_value:
-                        cur.execute(
-                            """
-                            INSERT OR IGNORE INTO price_snapshots(
-                                url, source, category, price, price_value, currency, scraped_at, scrape_run_id
-                            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                            """,
-                            (
-                                url_str,
-                                p.source,
-                                p.category,
-                                price_str,
-                                price_val,
-                                p.currency,
-                                p.scraped_at.isoformat(),
-                                p.scrape_run_id,
-                            ),
-                        )
-                        if cur.rowcount == 1:
-                            last_snapshot_cache[url_str] = (price_val, price_str)
-                        # actualizăm cache-ul cu noul snapshot inserat
-                        last_snapshot_cache[url_str] = (price_val, price_str)
-
-                upserted += 1
-                if url_str in existing_urls:
-                    updated += 1
-                else:
-                    inserted += 1
+            # 5) write-through: products_clean la zi pentru URL-urile din lot
+            if self.clean_on_ingest:
+                self._clean_staged(conn)
 
+            conn.execute("DELETE FROM temp.stage_products;")
             conn.commit()
 
-        return upserted, inserted, updated
-    
-    def insert_scrape_run(self, stats) -> None:
+        upserted = len(rows)
+        self.last_changed = upserted - touched
+        self.last_touched = touched
+        return upserted, upserted - updated, updated
+
+    def _clean_staged(self, conn: sqlite3.Connection) -> None:
+        """
+        Normalizează rândurile products ale lotului din stage_products, cu aceeași logică ca
+        scripts/build_clean_table (inclusiv refolosirea normalizării după hash + versiune).
+        """
+        if not self._clean_ready:
+            ensure_products_clean(conn)
+            self._clean_ready = True
+        upserts, reused = clean_rows(conn, "p.listing_key IN (SELECT listing_key FROM temp.stage_products)")
+        write_clean_rows(conn, upserts, reused)
+
+    def insert_scrape_run(self, stats, status: str = "finished") -> None:
+        """Inserează / actualizează rândul rulării (apelat repetat cu status='running' în timpul scrape-ului)."""
+        started_at = getattr(stats, "started_at", None) or ""
+        finished_at = getattr(stats, "finished_at", None) or ""
         with self._connect() as conn:
             conn.execute(
                 """
                 INSERT OR REPLACE INTO scrape_runs (
                 run_id, site_name, category,
-                started_at, finished_at, duration_s,
+                started_at, finished_at, started_at_ms, finished_at_ms, duration_s,
                 pages_requested, listing_pages_ok, detail_pages_ok,
                 products_parsed_total, products_parsed, products_filtered,
                 products_upserted, products_inserted, products_updated,
-                errors
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                products_changed, products_touched,
+                errors, status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """,
                 (
                     stats.scrape_run_id,
                     stats.site_name,
                     stats.category,
-                    getattr(stats, "started_at", None) or "",
-                    getattr(stats, "finished_at", None) or "",
+                    started_at,
+                    finished_at,
+                    iso_to_epoch_ms(started_at),
+                    iso_to_epoch_ms(finished_at),
                     float(stats.duration_s),
                     int(stats.pages_requested),
                     int(stats.listing_pages_ok),
@@ -433,11 +949,34 @@ class SqliteStore:
                     int(stats.products_upserted),
                     int(stats.products_inserted),
                     int(stats.products_updated),
+                    int(getattr(stats, "products_changed", 0)),
+                    int(getattr(stats, "products_touched", 0)),
                     int(stats.errors),
+                    status,
                 ),
             )
             conn.commit()
 
+    def compact_snapshots(self, older_than_days: int, now_ms: Optional[int] = None) -> tuple[int, int]:
+        """
+        Retenție pentru price_snapshots: snapshot-urile mai vechi de older_than_days (tăiat la
+        începutul zilei UTC) se comasează în price_snapshots_daily și se șterg din tabelul "cald".
+        Istoricul complet rămâne vizibil în view-ul price_history.
+
+        Returnează: (snapshot-uri mutate, rânduri zilnice scrise)
+        """
+        if now_ms is None:
+            now_ms = epoch_ms(datetime.now(timezone.utc))
+        cutoff_ms = (now_ms - int(older_than_days) * DAY_MS) // DAY_MS * DAY_MS
+
+        with self._connect() as conn:
+            days = conn.execute(COMPACT_SNAPSHOTS_SQL, {"cutoff_ms": cutoff_ms}).rowcount
+            moved = conn.execute(
+                "DELETE FROM price_snapshots WHERE scraped_at_ms < ?", (cutoff_ms,)
+            ).rowcount
+            conn.commit()
+        return moved, days
+
     def count_products(self) -> int:
         with self._connect() as conn:
             cur = conn.cursor()
@@ -447,7 +986,7 @@ class SqliteStore:
     def get_runs(self, limit: int = 50):
         with self._connect() as conn:
             cur = conn.execute(
-                "SELECT * FROM scrape_runs ORDER BY finished_at DESC LIMIT ?",
+                "SELECT * FROM scrape_runs ORDER BY finished_at_ms DESC LIMIT ?",
                 (limit,),
             )
             return [dict(row) for row in cur.fetchall()]
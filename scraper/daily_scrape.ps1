@@ -15,7 +15,10 @@ Write-Host "2. PCGarage..."
 Write-Host "3. Reconstruire dataset analiza..."
 & $Python -m scripts.build_analysis_dataset
 
-Write-Host "4. Compactare baza de date..."
+Write-Host "4. Compactare istoric preturi (snapshot-uri mai vechi de 90 de zile)..."
+& $Python -m scripts.compact_snapshots --days 90
+
+Write-Host "5. Compactare baza de date..."
 & $Python -m scripts.vacuum_db
 
 Write-Host "=== Scraping zilnic finalizat ==="
\ No newline at end of file
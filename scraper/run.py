@@ -9,7 +9,7 @@ import logging
 from app.core.logging import setup_logging
 from app.config.base import BASE_DIR
 from app.core.http import HttpClient
-from app.pipeline import run_and_store
+from app.pipeline import FLUSH_EVERY, FLUSH_INTERVAL_S, run_and_store
 from app.storage.sqlite import SqliteStore
 from app.sites.publi24 import Publi24Scraper
 from app.sites.pcgarage import PcGarageScraper
@@ -22,6 +22,8 @@ def build_parser() -> argparse.ArgumentParser:
     parser.add_argument("--max-products", type=int, default=None, help="Safety limit")
     parser.add_argument("--db", default=str(os.path.join(BASE_DIR, "data_out", "products.db")), help="SQLite path")
     parser.add_argument("--log-level", default="INFO", choices=["DEBUG","INFO","WARNING","ERROR"])
+    parser.add_argument("--flush-every", type=int, default=FLUSH_EVERY, help="Scrie în DB la fiecare N produse păstrate")
+    parser.add_argument("--flush-interval", type=float, default=FLUSH_INTERVAL_S, help="...sau la fiecare T secunde")
     return parser
 
 def main():
@@ -48,6 +50,8 @@ def main():
                 max_pages=args.pages,
                 max_products=args.max_products,
                 db_path=args.db,
+                flush_every=args.flush_every,
+                flush_interval_s=args.flush_interval,
             )
         elif args.site == "pcgarage":
             # Warm-up request pentru a inițializa sesiunea înainte de scraping pe PCGarage.
@@ -65,13 +69,15 @@ def main():
                 max_pages=args.pages,
                 max_products=args.max_products,
                 db_path=args.db,
+                flush_every=args.flush_every,
+                flush_interval_s=args.flush_interval,
             )
         else:
             raise ValueError(f"Unsupported site: {args.site}")
 
         # Rezumat final + verificare DB
-        store = SqliteStore(db_path=args.db) if args.db else SqliteStore()
-        total = store.count_products()
+        with (SqliteStore(db_path=args.db) if args.db else SqliteStore()) as store:
+            total = store.count_products()
         
         logger.info("=== RUN SUMMARY ===")
         logger.info("run_id:         %s", stats.scrape_run_id)
@@ -84,6 +90,8 @@ def main():
         logger.info("upserted:       %s", stats.products_upserted)
         logger.info("inserted:       %s", stats.products_inserted)
         logger.info("updated:        %s", stats.products_updated)
+        logger.info("changed:        %s", stats.products_changed)
+        logger.info("touched:        %s", stats.products_touched)
         logger.info("errors:         %s", stats.errors)
         logger.info("duration_s:     %s", stats.duration_s)
         logger.info("db_total_rows:  %s", total)
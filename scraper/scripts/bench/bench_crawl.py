@@ -0,0 +1,154 @@
+# scripts/bench/bench_crawl.py
+"""
+Benchmark end-to-end pentru run_and_store, fără acces la site-urile reale.
+
+Pornește serverul stand-in (scripts/bench/standin_server.py), îndreaptă
+CATEGORY_URLS / BASE_URL ale scraper-ului spre el și rulează pipeline-ul complet
+într-un director temporar: baza SQLite (dacă nu e dată --db), CSV-urile
+(exports/, filtered/, debug/) și logurile nu ating data_out/ sau logs/.
+
+Paginile de listing sunt generate mereu de stand-in (linkuri sintetice spre
+detalii); --fixtures-dir înlocuiește doar paginile de detaliu cu HTML înregistrat
+(*_detail.html), nu și listing-urile.
+
+Exemplu:
+    python -m scripts.bench.bench_crawl publi24 --pages 5 --items-per-page 20 --latency-ms 30 --error-rate 0.05
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from app.config.sites import POLICIES
+from app.core.http import HttpClient
+from app.core.logging import setup_logging
+from app.pipeline import run_and_store
+from app.sites.pcgarage import PcGarageScraper
+from app.sites.publi24 import Publi24Scraper
+from scripts.bench.standin_server import (
+    PCGARAGE_LISTING,
+    PUBLI24_LISTING,
+    StandInConfig,
+    start_standin,
+)
+
+SCRAPERS = {
+    "publi24": (Publi24Scraper, PUBLI24_LISTING),
+    "pcgarage": (PcGarageScraper, PCGARAGE_LISTING),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark offline pentru run_and_store")
+    parser.add_argument("site", choices=sorted(SCRAPERS), help="Site-ul imitat")
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--items-per-page", type=int, default=20)
+    parser.add_argument("--max-products", type=int, default=None)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Proporția de răspunsuri 429/503")
+    parser.add_argument("--backoff-s", type=float, default=0.0, help="backoff_base_s pentru domeniul local")
+    parser.add_argument("--max-retries", type=int, default=3)
+    parser.add_argument("--polite", action="store_true", help="Păstrează polite_sleep (implicit dezactivat)")
+    parser.add_argument("--fixtures-dir", default=None, help="Director cu *_detail.html înregistrate (listing-urile rămân generate)")
+    parser.add_argument("--db", default=None, help="SQLite path (implicit: fișier temporar)")
+    parser.add_argument("--log-level", default="WARNING", choices=["DEBUG", "INFO", "WARNING", "ERROR"])
+    return parser
+
+
+def run_bench(args: argparse.Namespace, db_path: str, out_dir: Path) -> dict:
+    cfg = StandInConfig(
+        pages=args.pages,
+        items_per_page=args.items_per_page,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        fixtures_dir=Path(args.fixtures_dir) if args.fixtures_dir else None,
+    )
+    srv = start_standin(cfg)
+    base = srv.base_url
+    domain = base.split("://", 1)[1]
+
+    # politică dedicată pentru serverul local: doar requests, backoff configurabil
+    POLICIES[domain] = {
+        "strategy": "REQUESTS_ONLY",
+        "timeout_s": 10,
+        "min_len": 0,
+        "must_contain": None,
+        "fail_threshold": 3,
+        "max_retries": args.max_retries,
+        "backoff_base_s": args.backoff_s,
+    }
+
+    http = HttpClient()
+    if not args.polite:
+        http.polite_sleep = lambda: None
+
+    scraper_cls, listing_path = SCRAPERS[args.site]
+    scraper = scraper_cls(http)
+    scraper.BASE_URL = base
+    scraper.CATEGORY_URLS = {"laptopuri": f"{base}{listing_path}"}
+
+    try:
+        t0 = time.perf_counter()
+        stats = run_and_store(
+            site_scraper=scraper,
+            site_name=args.site,
+            category="laptopuri",
+            max_pages=args.pages,
+            max_products=args.max_products,
+            db_path=db_path,
+            out_dir=out_dir,
+        )
+        wall_s = time.perf_counter() - t0
+    finally:
+        srv.shutdown()
+        srv.server_close()
+        http.close()
+        POLICIES.pop(domain, None)
+
+    server = srv.stats.snapshot()
+    injected = sum(n for code, n in server["status_counts"].items() if code in (429, 503))
+    return {
+        "site": args.site,
+        "pages": args.pages,
+        "items_per_page": args.items_per_page,
+        "latency_ms": args.latency_ms,
+        "error_rate": args.error_rate,
+        "wall_s": round(wall_s, 3),
+        "crawl_s": stats.duration_s,
+        "db_write_s": stats.db_write_s,
+        "products_parsed_total": stats.products_parsed_total,
+        "products_kept": stats.products_parsed,
+        "products_filtered": stats.products_filtered,
+        "products_upserted": stats.products_upserted,
+        "products_per_s": round(stats.products_upserted / wall_s, 2) if wall_s else None,
+        "requests": server["requests"],
+        "max_concurrency": server["max_in_flight"],
+        "status_counts": server["status_counts"],
+        "retried_responses": injected,
+        "errors": stats.errors,
+    }
+
+
+def main():
+    args = build_parser().parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_crawl_") as tmp:
+        setup_logging(log_dir=os.path.join(tmp, "logs"), level_console=getattr(logging, args.log_level))
+        try:
+            result = run_bench(args, args.db or os.path.join(tmp, "bench.db"), Path(tmp))
+        finally:
+            # fișierele de log rămân deschise în handler-e; închise înainte de ștergerea directorului
+            logging.shutdown()
+
+    print(json.dumps(result, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# scripts/bench/bench_filters.py
+"""
+Micro-benchmark pentru explain_publi24_laptop_filter.
+
+Rulează filtrul pe anunțurile din serverul stand-in (descrieri lungite ca să
+semene cu cele reale) și, opțional, pe titlurile/descrierile din products.
+
+    python -m scripts.bench.bench_filters --repeat 2000
+    python -m scripts.bench.bench_filters --from-db --limit 5000
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+import time
+
+from app.config.base import DB_PATH
+from app.filters import explain_publi24_laptop_filter
+from scripts.bench.standin_server import PUBLI24_ADS
+
+
+def load_db_samples(limit: int) -> list[tuple[str, str]]:
+    con = sqlite3.connect(DB_PATH)
+    try:
+        rows = con.execute(
+            "SELECT title, description_text FROM products WHERE source='publi24' LIMIT ?",
+            (limit,),
+        ).fetchall()
+    finally:
+        con.close()
+    return [(t or "", d or "") for t, d in rows]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pentru filtrul Publi24")
+    parser.add_argument("--repeat", type=int, default=1000)
+    parser.add_argument("--desc-multiplier", type=int, default=8, help="Lungește descrierile sintetice")
+    parser.add_argument("--from-db", action="store_true")
+    parser.add_argument("--limit", type=int, default=5000)
+    args = parser.parse_args()
+
+    if args.from_db:
+        samples = load_db_samples(args.limit)
+    else:
+        samples = [(t, " ".join([d] * args.desc_multiplier)) for t, d in PUBLI24_ADS] * args.repeat
+
+    if not samples:
+        raise SystemExit("Nu există eșantioane pentru benchmark.")
+
+    kept = 0
+    t0 = time.perf_counter()
+    for title, desc in samples:
+        keep, _ = explain_publi24_laptop_filter(title, desc)
+        kept += keep
+    elapsed = time.perf_counter() - t0
+
+    print(f"calls:        {len(samples)}")
+    print(f"kept:         {kept}")
+    print(f"total_s:      {elapsed:.3f}")
+    print(f"us_per_call:  {elapsed / len(samples) * 1e6:.1f}")
+
+
+if __name__ == "__main__":
+    main()
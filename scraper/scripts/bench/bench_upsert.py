@@ -0,0 +1,147 @@
+# scripts/bench/bench_upsert.py
+"""
+Benchmark pentru SqliteStore.upsert_products: throughput la inserare / actualizare
+cu setul de indexuri de dinainte de migrare (legacy) și cu setul curent.
+
+Fiecare mod rulează într-o bază temporară nouă, pe aceleași produse sintetice:
+runda 1 = inserări, rundele următoare = re-scrape cu o parte din prețuri schimbate.
+Modurile alternează de --repeat ori; se raportează mediana fiecărei runde.
+
+    python -m scripts.bench.bench_upsert --products 20000 --batch-size 500
+
+Rezultate (1 CPU, batch 500, 10% prețuri schimbate, mediana din 3), secunde inserare / re-scrape:
+
+    produse   legacy          current
+    2000      0.44 / 0.29     0.37 / 0.28
+    5000      1.03 / 0.77     0.81 / 0.73
+    10000     1.68 / 1.49     1.71 / 1.43
+    20000     4.05 / 3.19     3.62 / 2.83     DB: 36.1 MB -> 27.7 MB
+
+Un mod "bulk" (indexurile secundare șterse pe durata încărcării, reconstruite + ANALYZE la
+final) a fost măsurat și scos: cu cele patru indexuri secundare rămase câștigul e în zgomot
+(20000: 3.72 / 2.91 s; 80000: 15.7 / 11.4 s față de 16.6 / 11.7 s), iar sub ~5000 de
+produse reconstruirea îl face mai lent.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+from app.models import Product
+from app.storage.sqlite import SECONDARY_INDEXES, SqliteStore
+from scripts.bench.standin_server import PUBLI24_ADS
+
+# Setul de indexuri de dinainte de migrare (SCHEMA_VERSION 1), în locul celor din DDL_INDEXES.
+# products.url era UNIQUE în tabel; UNIQUE-urile pe listing_key rămân, de ele depinde upsert-ul.
+LEGACY_INDEXES = """
+CREATE UNIQUE INDEX IF NOT EXISTS uq_products_url ON products(url);
+CREATE INDEX IF NOT EXISTS idx_products_source ON products(source);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products(category);
+CREATE INDEX IF NOT EXISTS idx_products_scraped_at ON products(scraped_at);
+CREATE INDEX IF NOT EXISTS idx_products_source_category ON products(source, category);
+CREATE INDEX IF NOT EXISTS idx_products_brand_model ON products(brand_guess, model_guess);
+CREATE INDEX IF NOT EXISTS idx_products_posted_at ON products(posted_at);
+CREATE INDEX IF NOT EXISTS idx_products_price_value ON products(price_value);
+CREATE INDEX IF NOT EXISTS idx_products_model_guess ON products(model_guess);
+CREATE UNIQUE INDEX IF NOT EXISTS uq_snapshots_url_run ON price_snapshots(url, scrape_run_id);
+CREATE INDEX IF NOT EXISTS idx_snapshots_url ON price_snapshots(url);
+CREATE INDEX IF NOT EXISTS idx_snapshots_scraped_at ON price_snapshots(scraped_at);
+CREATE INDEX IF NOT EXISTS idx_snapshots_source_category ON price_snapshots(source, category);
+CREATE INDEX IF NOT EXISTS idx_snapshots_url_scraped_at ON price_snapshots(url, scraped_at);
+"""
+
+MODES = ("legacy", "current")
+
+
+def make_rounds(n: int, rounds: int, change_rate: float, seed: int) -> list[list[Product]]:
+    rnd = random.Random(seed)
+    base = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    prices = [rnd.randint(800, 9000) for _ in range(n)]
+    out: list[list[Product]] = []
+    for r in range(rounds):
+        run_id = f"bench-run-{r}"
+        scraped_at = base + timedelta(days=r)
+        batch = []
+        for i in range(n):
+            if r > 0 and rnd.random() < change_rate:
+                prices[i] = max(100, prices[i] + rnd.randint(-300, 300))
+            title, desc = PUBLI24_ADS[i % len(PUBLI24_ADS)]
+            batch.append(Product(
+                source="publi24",
+                category="laptopuri",
+                url=f"https://bench.local/anunt/{i}.html",
+                title=f"{title} #{i}",
+                price=str(prices[i]),
+                currency="RON",
+                location="Cluj-Napoca, Cluj",
+                posted_at=scraped_at - timedelta(hours=i % 72),
+                description_text=" ".join([desc] * 20),
+                description_html="<div>" + " ".join([desc] * 40) + "</div>",
+                brand_guess=title.split()[1].lower(),
+                scraped_at=scraped_at,
+                scrape_run_id=run_id,
+            ))
+        out.append(batch)
+    return out
+
+
+def run_mode(mode: str, rounds: list[list[Product]], batch_size: int, db_path: str) -> dict:
+    store = SqliteStore(db_path)
+    if mode == "legacy":
+        conn = store._connect()
+        with conn:
+            for name in SECONDARY_INDEXES:
+                conn.execute(f"DROP INDEX IF EXISTS {name};")
+            for stmt in [s.strip() for s in LEGACY_INDEXES.split(";") if s.strip()]:
+                conn.execute(stmt)
+
+    timings = []
+    try:
+        for products in rounds:
+            t0 = time.perf_counter()
+            for i in range(0, len(products), batch_size):
+                store.upsert_products(products[i : i + batch_size])
+            timings.append(time.perf_counter() - t0)
+    finally:
+        store.close()
+
+    return {"mode": mode, "round_s": timings, "db_mb": round(os.path.getsize(db_path) / 1e6, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pentru upsert_products")
+    parser.add_argument("--products", type=int, default=20000)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--rounds", type=int, default=2)
+    parser.add_argument("--change-rate", type=float, default=0.1, help="Proporția de prețuri schimbate între runde")
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES))
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="Repetări per mod (alternate); se raportează mediana")
+    args = parser.parse_args()
+
+    rounds = make_rounds(args.products, max(1, args.rounds), args.change_rate, args.seed)
+
+    print(f"products={args.products} batch_size={args.batch_size} rounds={len(rounds)} repeat={args.repeat}")
+    results: dict[str, list[dict]] = {mode: [] for mode in args.modes}
+    for _ in range(max(1, args.repeat)):
+        # modurile alternează, ca zgomotul (cache, alte procese) să nu cadă doar pe unul
+        for mode in args.modes:
+            with tempfile.TemporaryDirectory(prefix="bench_upsert_") as tmp:
+                results[mode].append(run_mode(mode, rounds, args.batch_size, os.path.join(tmp, "bench.db")))
+
+    n = len(rounds[0])
+    for mode, runs in results.items():
+        round_s = [statistics.median(r["round_s"][i] for r in runs) for i in range(len(rounds))]
+        print(
+            f"{mode:<8} round_s={[round(t, 3) for t in round_s]}  "
+            f"rows/s={[round(n / t, 1) for t in round_s]}  db={runs[-1]['db_mb']} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
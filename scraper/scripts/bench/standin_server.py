@@ -0,0 +1,314 @@
+# scripts/bench/standin_server.py
+"""
+Server HTTP local care imită Publi24 / PCGarage pentru benchmark-uri offline.
+
+- listare Publi24:  /anunturi/electronice/laptop/[?pag=N]
+- detaliu Publi24:  /anunturi/electronice/laptop/anunt/<slug>/<id>.html
+- listare PCGarage: /notebook-laptop/[paginaN/]
+- detaliu PCGarage: /notebook-laptop/<brand>/<slug>/
+
+Paginile de detaliu sunt generate din șabloane (sau servite dintr-un director cu
+fixture-uri înregistrate: publi24_detail.html / pcgarage_detail.html), iar
+listările sunt mereu generate, ca link-urile să rămână pe serverul local.
+
+Se pot configura: latența, proporția de răspunsuri 429/503 și numărul de pagini.
+"""
+from __future__ import annotations
+
+import argparse
+import html
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlsplit
+
+PUBLI24_LISTING = "/anunturi/electronice/laptop/"
+PCGARAGE_LISTING = "/notebook-laptop/"
+
+PUBLI24_DETAIL_RE = re.compile(r"^/anunturi/electronice/laptop/anunt/[^/]+/(?P<id>[a-z0-9]+)\.html$")
+PCGARAGE_PAGE_RE = re.compile(r"^/notebook-laptop/pagina(?P<page>\d+)/$")
+PCGARAGE_DETAIL_RE = re.compile(r"^/notebook-laptop/(?P<brand>[^/]+)/(?P<slug>[^/]+)/$")
+
+# (titlu, descriere) - amestec de laptopuri reale și anunțuri care trebuie filtrate
+PUBLI24_ADS = [
+    ("Laptop Lenovo ThinkPad T480 14 inch", "Intel i5-8350U 16GB RAM 512GB SSD, baterie buna"),
+    ("Laptop Dell Latitude 5490", "i7-8650U 16 GB 256GB SSD 14\" FHD"),
+    ("HP EliteBook 840 G5 laptop", "i5-8250U 8GB 256GB SSD 14 inch"),
+    ("ASUS TUF Gaming F15 FX506LH", "i5-10300H 16GB 512GB SSD GTX 1650 15.6 inch"),
+    ("MacBook Air 13 M1", "8GB 256GB SSD, stare foarte buna"),
+    ("Baterie laptop Dell", "baterie noua pentru latitude"),
+    ("Cumpar laptop defect", "caut laptop pentru piese"),
+    ("Mouse wireless Logitech", "mouse nou"),
+]
+
+PCGARAGE_MODELS = [
+    ("lenovo", "Laptop Lenovo IdeaPad Slim 3 15IRH8", "Intel Core i5-13420H", "16 GB", "Intel UHD Graphics", "15.6 inch"),
+    ("asus", "Laptop ASUS Vivobook 15 X1504ZA", "Intel Core i3-1215U", "8 GB", "Intel UHD Graphics", "15.6 inch"),
+    ("acer", "Laptop Acer Nitro V 15 ANV15-51", "Intel Core i5-13420H", "16 GB", "NVIDIA GeForce RTX 4050", "15.6 inch"),
+    ("hp", "Laptop HP Victus 15-fb2011nq", "AMD Ryzen 5 7535HS", "16 GB", "NVIDIA GeForce RTX 2050", "15.6 inch"),
+]
+
+
+@dataclass
+class StandInConfig:
+    pages: int = 3
+    items_per_page: int = 20
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0   # proporția de răspunsuri înlocuite cu 429/503
+    seed: int = 2026
+    fixtures_dir: Optional[Path] = None
+
+
+@dataclass
+class StandInStats:
+    requests: int = 0
+    in_flight: int = 0
+    max_in_flight: int = 0
+    status_counts: dict[int, int] = field(default_factory=dict)
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def enter(self) -> None:
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def leave(self, status: int) -> None:
+        with self.lock:
+            self.in_flight -= 1
+            self.status_counts[status] = self.status_counts.get(status, 0) + 1
+
+    def snapshot(self) -> dict:
+        with self.lock:
+            return {
+                "requests": self.requests,
+                "max_in_flight": self.max_in_flight,
+                "status_counts": dict(sorted(self.status_counts.items())),
+            }
+
+
+def _page(title: str, body: str) -> str:
+    return (
+        "<!DOCTYPE html><html lang=\"ro\"><head><meta charset=\"utf-8\">"
+        f"<title>{html.escape(title)}</title></head><body>{body}</body></html>"
+    )
+
+
+def _jsonld(obj: dict) -> str:
+    return f"<script type=\"application/ld+json\">{json.dumps(obj, ensure_ascii=False)}</script>"
+
+
+def render_publi24_listing(page: int, cfg: StandInConfig) -> str:
+    links = []
+    for i in range(cfg.items_per_page):
+        ad_id = f"{page:03d}{i:04d}"
+        links.append(
+            f"<div class=\"article-item\"><a href=\"{PUBLI24_LISTING}anunt/laptop-{ad_id}/{ad_id}.html\">"
+            f"Anunt {ad_id}</a></div>"
+        )
+    return _page(f"Laptop - pagina {page}", "".join(links))
+
+
+def render_publi24_detail(ad_id: str) -> str:
+    idx = int(ad_id) % len(PUBLI24_ADS)
+    title, desc = PUBLI24_ADS[idx]
+    price = 800 + (int(ad_id) * 37) % 4000
+    body = (
+        f"<h1>{html.escape(title)}</h1>"
+        + _jsonld({"@type": "Product", "name": title, "offers": {"price": str(price), "priceCurrency": "RON"}})
+        + "<div class=\"location\"><a href=\"/judet/cluj\">Cluj</a> <a href=\"/oras/cluj-napoca\">Cluj-Napoca</a>"
+        + "<span>Valabil din 3/1/2026 7:45:39 PM</span></div>"
+        + "<ul><li>Stare</li><li>folosit</li></ul>"
+        + f"<h2>Descriere</h2><p>{html.escape(desc)}</p><h3>Alte anunturi</h3>"
+    )
+    return _page(title, body)
+
+
+def render_pcgarage_listing(page: int, cfg: StandInConfig) -> str:
+    boxes = []
+    for i in range(cfg.items_per_page):
+        brand = PCGARAGE_MODELS[i % len(PCGARAGE_MODELS)][0]
+        slug = f"laptop-{brand}-p{page}-n{i}"
+        boxes.append(
+            f"<div class=\"product_box\"><div class=\"product_box_name\">"
+            f"<a href=\"{PCGARAGE_LISTING}{brand}/{slug}/\">{slug}</a></div></div>"
+        )
+    return _page(f"Notebook / Laptop - pagina {page}", "".join(boxes))
+
+
+def render_pcgarage_detail(brand: str, slug: str) -> str:
+    n = sum(map(ord, slug))
+    _, title, cpu, ram, gpu, screen = next(
+        (m for m in PCGARAGE_MODELS if m[0] == brand), PCGARAGE_MODELS[n % len(PCGARAGE_MODELS)]
+    )
+    price = 2500 + n % 5000
+    specs = {
+        "Producator": brand.upper(),
+        "Procesor": cpu,
+        "Capacitate memorie": ram,
+        "Placa video": gpu,
+        "Diagonala": screen,
+        "Cod producator": f"{brand.upper()}-{n:06d}",
+    }
+    rows = "".join(f"<tr><td>{html.escape(k)}</td><td>{html.escape(v)}</td></tr>" for k, v in specs.items())
+    body = (
+        f"<h1>{html.escape(title)}</h1>"
+        + _jsonld({
+            "@type": "Product",
+            "name": title,
+            "description": f"{title} {cpu} {ram} {gpu} {screen}",
+            "offers": {"price": f"{price}.99", "priceCurrency": "RON", "availability": "http://schema.org/InStock"},
+        })
+        + f"<table id=\"specificatii\">{rows}</table>"
+    )
+    return _page(title, body)
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address: tuple[str, int], cfg: StandInConfig):
+        super().__init__(address, StandInHandler)
+        self.cfg = cfg
+        self.stats = StandInStats()
+        self.rng = random.Random(cfg.seed)
+        self.rng_lock = threading.Lock()
+        self.fixtures: dict[str, str] = {}
+        if cfg.fixtures_dir:
+            for name in ("publi24_detail.html", "pcgarage_detail.html"):
+                path = Path(cfg.fixtures_dir) / name
+                if path.exists():
+                    self.fixtures[name] = path.read_text(encoding="utf-8")
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start_in_thread(self) -> threading.Thread:
+        t = threading.Thread(target=self.serve_forever, name="standin-server", daemon=True)
+        t.start()
+        return t
+
+    def next_delay_and_fault(self) -> tuple[float, Optional[int]]:
+        cfg = self.cfg
+        with self.rng_lock:
+            delay = max(0.0, cfg.latency_ms + self.rng.uniform(-cfg.jitter_ms, cfg.jitter_ms)) / 1000.0
+            fault = None
+            if cfg.error_rate > 0 and self.rng.random() < cfg.error_rate:
+                fault = self.rng.choice((429, 503))
+        return delay, fault
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    server: StandInServer
+
+    def log_message(self, format, *args):  # noqa: A002 - semnătura din BaseHTTPRequestHandler
+        return
+
+    def do_GET(self):
+        srv = self.server
+        srv.stats.enter()
+        status = 500
+        try:
+            delay, fault = srv.next_delay_and_fault()
+            if delay:
+                time.sleep(delay)
+            if fault is not None:
+                status = fault
+                self._send(status, _page("Too many requests", "<p>retry later</p>"))
+                return
+            status, body = self._route()
+            self._send(status, body)
+        finally:
+            srv.stats.leave(status)
+
+    def _route(self) -> tuple[int, str]:
+        srv = self.server
+        cfg = srv.cfg
+        parts = urlsplit(self.path)
+        path = parts.path
+
+        if path == PUBLI24_LISTING:
+            page = int((parse_qs(parts.query).get("pag") or ["1"])[0])
+            if page > cfg.pages:
+                return 200, _page("Laptop", "<p>Nu mai sunt anunturi</p>")
+            return 200, render_publi24_listing(page, cfg)
+
+        m = PUBLI24_DETAIL_RE.match(path)
+        if m:
+            return 200, srv.fixtures.get("publi24_detail.html") or render_publi24_detail(m.group("id"))
+
+        if path == PCGARAGE_LISTING:
+            return 200, render_pcgarage_listing(1, cfg)
+
+        m = PCGARAGE_PAGE_RE.match(path)
+        if m:
+            page = int(m.group("page"))
+            if page > cfg.pages:
+                return 404, _page("Not found", "")
+            return 200, render_pcgarage_listing(page, cfg)
+
+        m = PCGARAGE_DETAIL_RE.match(path)
+        if m:
+            return 200, srv.fixtures.get("pcgarage_detail.html") or render_pcgarage_detail(m.group("brand"), m.group("slug"))
+
+        return 404, _page("Not found", "")
+
+    def _send(self, status: int, body: str) -> None:
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        if status in (429, 503):
+            self.send_header("Retry-After", "0")
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def start_standin(cfg: StandInConfig, host: str = "127.0.0.1", port: int = 0) -> StandInServer:
+    srv = StandInServer((host, port), cfg)
+    srv.start_in_thread()
+    return srv
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stand-in local pentru Publi24 / PCGarage")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--items-per-page", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--fixtures-dir", default=None)
+    args = parser.parse_args()
+
+    cfg = StandInConfig(
+        pages=args.pages,
+        items_per_page=args.items_per_page,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate,
+        fixtures_dir=Path(args.fixtures_dir) if args.fixtures_dir else None,
+    )
+    srv = StandInServer((args.host, args.port), cfg)
+    print(f"stand-in server: {srv.base_url}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        srv.server_close()
+        print(srv.stats.snapshot())
+
+
+if __name__ == "__main__":
+    main()
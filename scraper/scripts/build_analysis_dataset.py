@@ -1,19 +1,167 @@
-import subprocess
-import sys
+# scripts/build_analysis_dataset.py
+"""
+Reconstruiește products_clean -> products_analysis -> market_daily într-un singur proces,
+pe o singură conexiune.
+
+Fiecare pas din STEPS își declară dependențele și amprenta intrărilor: table_fingerprint pe
+tabelele citite, versiunea regulilor / SQL-ul folosit și momentul ultimei rulări a fiecărei
+dependențe. Un pas cu aceeași amprentă ca la ultima rulare reușită (tabelul build_steps) și
+cu ieșirile existente e sărit; la final se afișează timpul fiecărui pas.
+
+    python -m scripts.build_analysis_dataset
+    python -m scripts.build_analysis_dataset --full      # products_clean complet (+ pașii dependenți)
+    python -m scripts.build_analysis_dataset --force     # rulează toți pașii
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from graphlib import TopologicalSorter
+from typing import Any, Callable, NamedTuple
+
+from app.cleaning.laptop import NORM_RULES_VERSIONS
+from app.config.base import DB_PATH
+from app.storage.build_state import get_step, set_step, table_fingerprint
+from app.storage.sqlite import SqliteStore
+from scripts import build_analysis_view, build_clean_table, build_market_daily
+from scripts.checks import check_analysis_view
+
+
+class Step(NamedTuple):
+    name: str
+    deps: tuple[str, ...]
+    inputs: Callable[[sqlite3.Connection], Any]                     # amprenta intrărilor proprii (JSON)
+    run: Callable[[sqlite3.Connection, argparse.Namespace], Any]    # rezultatul apare în raport
+    outputs: tuple[str, ...] = ()                                   # tabele / view-uri care trebuie să existe
+
+
+def _run_clean(con: sqlite3.Connection, args: argparse.Namespace) -> str:
+    mode, upserts, reused = build_clean_table.build(con, full=args.full, workers=args.workers)
+    return f"{mode}, {upserts} rânduri, normalizare refolosită: {reused}"
+
+
+def _run_view(con: sqlite3.Connection, args: argparse.Namespace) -> str:
+    build_analysis_view.create_view(con)
+    return "OK"
+
+
+def _run_market_daily(con: sqlite3.Connection, args: argparse.Namespace) -> str:
+    # creează și tabelul (ieșirea pasului, verificată la skip), chiar fără nicio zi de calculat
+    days, written = build_market_daily.refresh_changed_days(con)
+    return f"{len(days)} zile, {written} segmente"
+
+
+def _run_check(con: sqlite3.Connection, args: argparse.Namespace) -> str:
+    return f"{check_analysis_view.check(con)} rânduri"
+
+
+STEPS = (
+    Step(
+        "clean_table", (),
+        lambda con: {"products": table_fingerprint(con, "products", "scraped_at_ms"), "rules": NORM_RULES_VERSIONS},
+        _run_clean,
+        outputs=("products_clean",),
+    ),
+    Step(
+        "analysis_view", ("clean_table",),
+        lambda con: {"sql": build_analysis_view.SQL},
+        _run_view,
+        outputs=("products_analysis",),
+    ),
+    # products_clean poate fi scris și la ingest (CLEAN_ON_INGEST=1), deci amprenta lui intră direct
+    Step(
+        "market_daily", ("clean_table",),
+        lambda con: {
+            "products_clean": table_fingerprint(con, "products_clean", "scraped_at_ms"),
+            "scrape_runs": table_fingerprint(con, "scrape_runs", "finished_at_ms"),
+        },
+        _run_market_daily,
+        outputs=("market_daily",),
+    ),
+    Step(
+        "check_analysis_view", ("analysis_view", "market_daily"),
+        lambda con: {"products_clean": table_fingerprint(con, "products_clean", "scraped_at_ms")},
+        _run_check,
+    ),
+)
+
+
+def _exists(con: sqlite3.Connection, name: str) -> bool:
+    return con.execute("SELECT 1 FROM sqlite_master WHERE name = ?", (name,)).fetchone() is not None
+
+
+def fingerprint(con: sqlite3.Connection, step: Step) -> str:
+    """Hash peste intrările pasului + momentul ultimei rulări reușite a fiecărei dependențe."""
+    deps = {d: (get_step(con, d) or (None, None))[1] for d in step.deps}
+    payload = {"inputs": step.inputs(con), "deps": deps}
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha1(raw).hexdigest()[:16]
+
+
+def run_steps(
+    con: sqlite3.Connection, args: argparse.Namespace, steps: tuple[Step, ...] = STEPS, forced: frozenset[str] = frozenset()
+) -> list[tuple[str, str, float, Any]]:
+    """
+    Rulează pașii în ordinea dependențelor. Returnează [(pas, "ran" / "skipped", secunde, rezultat)].
+    La o eroare pasul nu e marcat la zi, iar dependenții lui nu mai rulează (excepția se propagă).
+    """
+    by_name = {s.name: s for s in steps}
+    for s in steps:
+        missing = set(s.deps) - set(by_name)
+        if missing:
+            raise ValueError(f"Pasul {s.name} depinde de pași necunoscuți: {sorted(missing)}")
+
+    report = []
+    order = TopologicalSorter({s.name: s.deps for s in steps}).static_order()
+    for name in order:
+        step = by_name[name]
+        start = time.perf_counter()
+        fp = fingerprint(con, step)
+        prev = get_step(con, name)
+        if name not in forced and prev and prev[0] == fp and all(_exists(con, o) for o in step.outputs):
+            report.append((name, "skipped", time.perf_counter() - start, None))
+            continue
+
+        result = step.run(con, args)
+        elapsed = time.perf_counter() - start
+        set_step(con, name, fp, elapsed)
+        report.append((name, "ran", elapsed, result))
+    return report
 
-def run_module(mod: str):
-    cmd = [sys.executable, "-m", mod]
-    print(">>", " ".join(cmd))
-    r = subprocess.run(cmd)
-    if r.returncode != 0:
-        raise SystemExit(r.returncode)
 
 def main():
-    run_module("scripts.build_clean_table")
-    run_module("scripts.normalize_clean")
-    run_module("scripts.build_analysis_view")
-    run_module("scripts.checks.check_analysis_view")
+    parser = argparse.ArgumentParser(description="Reconstruiește products_clean + products_analysis")
+    parser.add_argument("--full", action="store_true", help="Rebuild complet în loc de incremental")
+    parser.add_argument("--force", action="store_true", help="Rulează toți pașii, și pe cei la zi")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procese pentru build_clean_table")
+    args = parser.parse_args()
+
+    if not DB_PATH.exists():
+        raise SystemExit(f"DB not found: {DB_PATH}")
+
+    # aduce schema products la zi (listing_key etc.) dacă DB-ul n-a mai fost deschis de scraper
+    SqliteStore(DB_PATH).close()
+
+    if args.force:
+        forced = frozenset(s.name for s in STEPS)
+    else:
+        forced = frozenset({"clean_table"} if args.full else ())
+
+    con = sqlite3.connect(DB_PATH)
+    try:
+        report = run_steps(con, args, forced=forced)
+    finally:
+        con.close()
+
+    for name, status, elapsed, result in report:
+        print(f"{name:<20} {status:<8} {elapsed:8.2f}s  {result if result is not None else ''}".rstrip())
+    print(f"total: {sum(r[2] for r in report):.2f}s")
     print("analysis dataset: OK")
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -34,6 +34,7 @@ SELECT
 
   -- dates/loc
   posted_at_utc AS posted_at,
+  posted_at_ms,
   location_clean AS location,
   county,
   city
@@ -42,11 +43,13 @@ FROM products_clean
 WHERE is_laptop = 1;
 """
 
+def create_view(conn: sqlite3.Connection) -> None:
+    conn.executescript(SQL)
+    conn.commit()
+
 def main():
     conn = sqlite3.connect(DB_PATH)
-    cur = conn.cursor()
-    cur.executescript(SQL)
-    conn.commit()
+    create_view(conn)
     conn.close()
     print("products_analysis view: OK")
 
@@ -1,157 +1,198 @@
+# scripts/build_clean_table.py
+"""
+Construiește products_clean din products, într-o singură trecere: fiecare rând din products
+e citit o dată, iar coloanele curățate și cele normalizate (app.cleaning.laptop) se scriu
+cu un singur executemany pe chunk. Schema și normalizarea unui rând sunt în
+app.storage.products_clean (folosite și de SqliteStore cu CLEAN_ON_INGEST=1).
+
+Rândurile sunt împărțite în intervale de id (rowid) de câte CHUNK_SIZE; cu --workers > 1
+intervalele sunt normalizate într-un process pool (fiecare worker citește singur intervalul
+lui și întoarce tuple-uri), iar procesul principal e singurul writer: aplică rezultatele cu
+executemany, într-o singură tranzacție, odată cu watermark-ul.
+
+Implicit incremental: procesează doar rândurile cu products.scraped_at_ms după watermark-ul
+salvat în build_state (orice scriere / touch din scraper mută scraped_at, deci și conținutul
+schimbat intră aici). --full reconstruiește din tot tabelul.
+
+Coloanele normalizate (LAPTOP_COLUMNS) sunt refolosite când hash-ul intrărilor lor
+(norm_input_hash) și versiunea regulilor (norm_rules_version, vezi NORM_RULES_VERSIONS)
+coincid cu cele salvate: pentru rândurile re-scrapuite fără modificări se actualizează doar
+coloanele curățate. --force recalculează tot.
+
+    python -m scripts.build_clean_table
+    python -m scripts.build_clean_table --full --workers 8
+    python -m scripts.build_clean_table --full --force
+"""
 from __future__ import annotations
 
-import json
+import argparse
+import os
 import sqlite3
-from typing import Any, Dict
-from datetime import timezone
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Optional
 
 from app.config.base import DB_PATH
-
-from app.models import Product
-from app.cleaning.normalize import (
-    normalize_location,
-    normalize_condition,
-    effective_posted_at,
-    normalize_title,
+from app.core.utils import epoch_ms
+from app.storage.sqlite import SqliteStore
+from app.storage.build_state import change_window, set_watermark
+from app.cleaning.laptop import NORM_RULES_VERSIONS
+from app.storage.products_clean import clean_rows, ensure_products_clean, write_clean_rows
+
+CHUNK_SIZE = 1000
+
+# Intervale [id_min, id_max] cu câte CHUNK_SIZE rânduri din fereastra de procesat ({where}),
+# ca să rămână echilibrate și când id-urile sunt rare (fereastră incrementală mică).
+RANGES_SQL = """
+SELECT MIN(id), MAX(id)
+FROM (
+    SELECT id, (ROW_NUMBER() OVER (ORDER BY id) - 1) / ? AS chunk
+    FROM products p
+    {where}
 )
+GROUP BY chunk
+ORDER BY chunk
+"""
+
+WINDOW_WHERE = "p.scraped_at_ms > ? AND p.scraped_at_ms <= ?"
+
+WATERMARK_NAME = "build_clean_table"
+# momentul (ms) ultimului build complet: pașii care depind de products_clean (build_market_daily)
+# îl compară cu valoarea văzută la rularea lor, ca să știe că tot tabelul a fost recalculat
+FULL_BUILD_NAME = "build_clean_table_full"
 
-CREATE_SQL = """
-CREATE TABLE IF NOT EXISTS products_clean (
-    url TEXT PRIMARY KEY,
-    source TEXT,
-    category TEXT,
-
-    title_clean TEXT,
-    brand_guess TEXT,
-    model_guess TEXT,
-    mpn_guess TEXT,
-
-    price_ron REAL,
-    currency TEXT,
-
-    location_clean TEXT,
-    county TEXT,
-    city TEXT,
-
-    condition_norm TEXT,
-    posted_at_utc TEXT,
-    scraped_at_utc TEXT,
-
-    scrape_run_id TEXT,
-
-    brand_norm TEXT,
-    model_norm TEXT,
-    title_norm TEXT,
-    model_family TEXT,
-    title_std TEXT,
-    cpu_guess TEXT,
-    ram_gb INTEGER,
-    storage_guess TEXT,
-    gpu_guess TEXT,
-    screen_in REAL,
-    is_laptop INTEGER
-);
+# rânduri normalizate cu alte reguli decât cele curente (versiunea depinde de is_laptop)
+STALE_RULES_SQL = """
+SELECT 1 FROM products_clean
+WHERE norm_rules_version IS NOT (CASE WHEN is_laptop = 1 THEN ? ELSE ? END)
+LIMIT 1
 """
 
-def row_to_product(row: dict):
-    # specs_raw vine din sqlite ca TEXT (JSON string) -> îl facem dict
-    sr = row.get("specs_raw")
-    if isinstance(sr, str):
-        s = sr.strip()
-        if not s or s.lower() in ("null", "none"):
-            row["specs_raw"] = None
-        else:
-            try:
-                row["specs_raw"] = json.loads(s)
-            except Exception:
-                # dacă e junk / string care nu e JSON valid
-                row["specs_raw"] = None
 
-    return Product(**row)
+def _window(lo: Optional[int], hi: Optional[int]) -> tuple[str, tuple]:
+    """Rebuild complet: tot tabelul (și rândurile fără scraped_at_ms); altfel doar fereastra (lo, hi]."""
+    if lo is None:
+        return "", ()
+    return WINDOW_WHERE, (lo, hi)
+
+
+def id_ranges(con: sqlite3.Connection, lo: Optional[int], hi: Optional[int]) -> list[tuple[int, int]]:
+    cond, params = _window(lo, hi)
+    sql = RANGES_SQL.format(where=f"WHERE {cond}" if cond else "")
+    return con.execute(sql, (CHUNK_SIZE, *params)).fetchall()
+
+
+def clean_range(
+    con: sqlite3.Connection, id_lo: int, id_hi: int, lo: Optional[int], hi: Optional[int], force: bool = False
+) -> tuple[list[tuple], list[tuple]]:
+    """Rezultatul clean_rows (de scris / refolosite) pentru un interval de id din fereastră."""
+    cond, params = _window(lo, hi)
+    where = "p.id BETWEEN ? AND ?" + (f" AND {cond}" if cond else "")
+    return clean_rows(con, where, (id_lo, id_hi, *params), force)
+
+
+def _clean_range_worker(
+    db_path: str, id_lo: int, id_hi: int, lo: Optional[int], hi: Optional[int], force: bool
+) -> tuple[list[tuple], list[tuple]]:
+    # fiecare worker are conexiunea lui, doar pentru citire (WAL: nu blochează writer-ul)
+    con = sqlite3.connect(db_path)
+    try:
+        return clean_range(con, id_lo, id_hi, lo, hi, force)
+    finally:
+        con.close()
+
+
+def _db_file(con: sqlite3.Connection) -> str:
+    """Calea fișierului bazei "main" ('' pentru :memory:)."""
+    return con.execute("PRAGMA database_list").fetchone()[2]
+
+
+def rules_changed(con: sqlite3.Connection) -> bool:
+    """Există rânduri în products_clean calculate cu altă versiune a regulilor de normalizare?"""
+    return con.execute(STALE_RULES_SQL, (NORM_RULES_VERSIONS[1], NORM_RULES_VERSIONS[0])).fetchone() is not None
+
+
+def build(con: sqlite3.Connection, full: bool = False, workers: int = 1, force: bool = False) -> tuple[str, int, int]:
+    """
+    Returnează (mod, rânduri scrise, rânduri cu normalizarea refolosită); watermark-ul se scrie
+    în aceeași tranzacție cu datele. force=True ignoră hash-ul / versiunea salvate.
+
+    Dacă regulile s-au schimbat de la ultimul build (rânduri cu altă norm_rules_version),
+    build-ul devine complet: rândurile de dinainte de watermark altfel n-ar fi recalculate.
+    Rândurile neafectate de schimbare trec prin refolosirea după hash + versiune.
+    """
+    ensure_products_clean(con)
+    full = full or rules_changed(con)
+
+    lo, hi = change_window(con, WATERMARK_NAME, full=full)
+    if hi is None:
+        return "empty", 0, 0
+    mode = "full" if lo is None else "incremental"
+
+    ranges = id_ranges(con, lo, hi)
+    db_path = _db_file(con)
+    upserts = reused = 0
+
+    def write(rows: list[tuple], reuse: list[tuple]) -> None:
+        nonlocal upserts, reused
+        write_clean_rows(con, rows, reuse)
+        upserts += len(rows) + len(reuse)
+        reused += len(reuse)
+
+    if workers <= 1 or len(ranges) <= 1 or not db_path:
+        for id_lo, id_hi in ranges:
+            write(*clean_range(con, id_lo, id_hi, lo, hi, force))
+    else:
+        # fereastră limitată de intervale în zbor, ca memoria să nu crească cu tabelul
+        max_pending = workers * 2
+        todo = iter(ranges)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending = set()
+            exhausted = False
+            while pending or not exhausted:
+                while not exhausted and len(pending) < max_pending:
+                    r = next(todo, None)
+                    if r is None:
+                        exhausted = True
+                        break
+                    pending.add(pool.submit(_clean_range_worker, db_path, r[0], r[1], lo, hi, force))
+
+                if not pending:
+                    break
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    write(*fut.result())
+
+    set_watermark(con, WATERMARK_NAME, hi)
+    if mode == "full":
+        set_watermark(con, FULL_BUILD_NAME, epoch_ms(datetime.now(timezone.utc)))
+    con.commit()
+    return mode, upserts, reused
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Construiește products_clean din products")
+    parser.add_argument("--full", action="store_true", help="Reconstruiește din tot tabelul products")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Procese pentru normalizare")
+    parser.add_argument("--force", action="store_true", help="Recalculează normalizarea și pentru rândurile neschimbate")
+    args = parser.parse_args()
+
     if not DB_PATH.exists():
         raise SystemExit(f"DB not found: {DB_PATH}")
 
-    con = sqlite3.connect(DB_PATH)
-    con.row_factory = sqlite3.Row
-    cur = con.cursor()
-
-    cur.execute(CREATE_SQL)
-
-    # Construim products_clean pornind din tabelul brut products.
-    rows = cur.execute("SELECT * FROM products").fetchall()
-
-    upserts = 0
-
-    for r in rows:
-        d = dict(r)
-        p = row_to_product(d)
-
-        loc_clean, county, city = normalize_location(p.location)
-        cond = normalize_condition(
-            p.condition,
-            source=p.source,
-            specs_raw=p.specs_raw if isinstance(p.specs_raw, dict) else None,
-        )
-        posted = effective_posted_at(p)
-
-        title_clean = normalize_title(p.title)
-        price_ron = p.price_value
-
-        cur.execute(
-            """
-            INSERT INTO products_clean (
-                url, source, category,
-                title_clean, brand_guess, model_guess, mpn_guess,
-                price_ron, currency,
-                location_clean, county, city,
-                condition_norm, posted_at_utc, scraped_at_utc,
-                scrape_run_id
-            ) VALUES (
-                ?, ?, ?,
-                ?, ?, ?, ?,
-                ?, ?,
-                ?, ?, ?,
-                ?, ?, ?,
-                ?
-            )
-            ON CONFLICT(url) DO UPDATE SET
-                source=excluded.source,
-                category=excluded.category,
-                title_clean=excluded.title_clean,
-                brand_guess=excluded.brand_guess,
-                model_guess=excluded.model_guess,
-                mpn_guess=excluded.mpn_guess,
-                price_ron=excluded.price_ron,
-                currency=excluded.currency,
-                location_clean=excluded.location_clean,
-                county=excluded.county,
-                city=excluded.city,
-                condition_norm=excluded.condition_norm,
-                posted_at_utc=excluded.posted_at_utc,
-                scraped_at_utc=excluded.scraped_at_utc,
-                scrape_run_id=excluded.scrape_run_id
-            """,
-            (
-                p.url, p.source, p.category,
-                title_clean, p.brand_guess, p.model_guess, p.mpn_guess,
-                price_ron, p.currency,
-                loc_clean, county, city,
-                cond,
-                posted.isoformat(),
-                p.scraped_at.astimezone(timezone.utc).isoformat(),
-                p.scrape_run_id,
-            ),
-        )
-        upserts += 1
+    # aduce schema products la zi (listing_key etc.) dacă DB-ul n-a mai fost deschis de scraper
+    SqliteStore(DB_PATH).close()
 
-    con.commit()
-    con.close()
+    con = sqlite3.connect(DB_PATH)
+    try:
+        mode, upserts, reused = build(con, full=args.full, workers=args.workers, force=args.force)
+    finally:
+        con.close()
 
+    print(f"products_clean mode: {mode}")
     print(f"products_clean upserted: {upserts}")
+    print(f"products_clean normalization reused: {reused}")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
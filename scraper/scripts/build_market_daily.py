@@ -0,0 +1,107 @@
+# scripts/build_market_daily.py
+"""
+Reîmprospătează rollup-ul market_daily (zi x sursă x brand x familie x RAM x stare: n, min, p25,
+mediană, p75, max) după ce products_clean a fost reconstruit.
+
+Implicit recalculează ziua ultimei rulări terminate din scrape_runs (pipeline-ul o calculează
+deja la final de rulare, dar fără anunțurile noi, care intră în products_clean abia acum).
+build_analysis_dataset folosește refresh_changed_days: toate zilele atinse de products_clean
+de la ultima lui rulare (watermark propriu în build_state), plus zilele deja calculate după
+un build complet al products_clean.
+
+    python -m scripts.build_market_daily
+    python -m scripts.build_market_daily --day 2026-03-01 --day 2026-03-02
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+from datetime import date, datetime, timezone
+
+from app.config.base import DB_PATH
+from app.core.utils import epoch_ms
+from app.storage.build_state import change_window, get_watermark, set_watermark
+from app.storage.market_daily import DDL_MARKET_DAILY, day_of, refresh_market_daily
+from scripts.build_clean_table import FULL_BUILD_NAME
+
+WATERMARK_NAME = "build_market_daily"
+# valoarea FULL_BUILD_NAME (build complet products_clean) deja aplicată în market_daily
+SEEN_FULL_BUILD_NAME = "build_market_daily_clean_full"
+
+
+def latest_run_days(conn: sqlite3.Connection) -> set[int]:
+    row = conn.execute(
+        """
+        SELECT started_at_ms, finished_at_ms
+        FROM scrape_runs
+        WHERE status = 'finished' AND finished_at_ms IS NOT NULL
+        ORDER BY finished_at_ms DESC
+        LIMIT 1
+        """
+    ).fetchone()
+    if row is None:
+        return set()
+    return {d for d in (day_of(row[0]), day_of(row[1])) if d is not None}
+
+
+def changed_days(conn: sqlite3.Connection) -> set[int]:
+    """
+    Zilele de recalculat după build_clean_table: de la fereastra de schimbări din products_clean
+    (cu marja de suprapunere; prima rulare = de la cel mai vechi rând) până azi, plus ziua ultimei
+    rulări. După un build complet al products_clean se adaugă toate zilele deja din market_daily:
+    segmentele (brand / familie etc.) lor s-au putut schimba.
+    """
+    conn.execute(DDL_MARKET_DAILY)
+    days = latest_run_days(conn)
+    lo, hi = change_window(conn, WATERMARK_NAME, table="products_clean")
+    if hi is not None:
+        if lo is None:
+            lo = conn.execute("SELECT MIN(scraped_at_ms) FROM products_clean").fetchone()[0]
+        today = day_of(epoch_ms(datetime.now(timezone.utc)))
+        days.update(range(day_of(lo), max(day_of(hi), today) + 1))
+
+    clean_full = get_watermark(conn, FULL_BUILD_NAME)
+    if clean_full is not None and clean_full != get_watermark(conn, SEEN_FULL_BUILD_NAME):
+        days.update(r[0] for r in conn.execute("SELECT DISTINCT day FROM market_daily"))
+    return days
+
+
+def refresh_changed_days(conn: sqlite3.Connection) -> tuple[set[int], int]:
+    """Recalculează changed_days și mută watermark-urile proprii. Returnează (zile, segmente scrise)."""
+    days = changed_days(conn)
+    hi = conn.execute("SELECT MAX(scraped_at_ms) FROM products_clean").fetchone()[0]
+    clean_full = get_watermark(conn, FULL_BUILD_NAME)
+    written = refresh_market_daily(conn, days)
+    with conn:
+        if hi is not None:
+            set_watermark(conn, WATERMARK_NAME, hi)
+        if clean_full is not None:
+            set_watermark(conn, SEEN_FULL_BUILD_NAME, clean_full)
+    return days, written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rollup zilnic market_daily")
+    parser.add_argument("--day", action="append", default=[], help="Zi de recalculat (YYYY-MM-DD, UTC); repetabil")
+    args = parser.parse_args()
+
+    if not DB_PATH.exists():
+        raise SystemExit(f"DB not found: {DB_PATH}")
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        if args.day:
+            days = {date.fromisoformat(d).toordinal() - date(1970, 1, 1).toordinal() for d in args.day}
+        else:
+            days = latest_run_days(conn)
+        written = refresh_market_daily(conn, days)
+    finally:
+        conn.close()
+
+    labels = ", ".join(date.fromordinal(d + date(1970, 1, 1).toordinal()).isoformat() for d in sorted(days))
+    print(f"market_daily days: {labels or '-'}")
+    print(f"market_daily segments written: {written}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,8 @@
 import sqlite3
 from app.config.base import DB_PATH
 
-def main():
-    conn = sqlite3.connect(DB_PATH)
+def check(conn: sqlite3.Connection) -> int:
+    """Verifică view-ul products_analysis pe conexiunea dată; returnează numărul de rânduri."""
     cur = conn.cursor()
 
     exists = cur.execute(
@@ -29,8 +29,14 @@ def main():
     """).fetchall()
     for r in row:
         print(r)
+    return n
 
-    conn.close()
+def main():
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        check(conn)
+    finally:
+        conn.close()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
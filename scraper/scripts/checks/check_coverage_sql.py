@@ -41,7 +41,7 @@ QUERIES = {
         SELECT posted_at, title, location, price_value, url
         FROM products
         WHERE source='publi24'
-        ORDER BY posted_at DESC
+        ORDER BY posted_at_ms DESC
         LIMIT 5;
     """,
 }
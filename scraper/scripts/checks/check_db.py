@@ -18,7 +18,8 @@ print("condition NOT NULL:", s("select count(1) from products where condition is
 
 print("\n=== SNAPSHOTS ===")
 print("snapshots:", s("select count(1) from price_snapshots"))
-print("distinct urls:", s("select count(distinct url) from price_snapshots"))
+print("snapshots compacted (daily rows):", s("select count(1) from price_snapshots_daily"))
+print("distinct listings (history):", s("select count(distinct listing_key) from price_history"))
 
 print("\n=== SAMPLE MISSING ===")
 print("publi24 missing location sample:")
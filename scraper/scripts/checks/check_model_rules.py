@@ -0,0 +1,78 @@
+# scripts/checks/check_model_rules.py
+"""
+Paritate între tabelele de reguli curente și valorile deja salvate în DB:
+
+- products_clean.model_norm / model_family vs valorile recalculate din products,
+  exact ca în build_clean_table (exit code 1 la diferențe);
+- informativ: products.model_guess vs guess_model(title), doar pentru rândurile cu
+  model_guess salvat (valoarea e scrisă la scrape, cu regulile de atunci).
+
+Rulat după o modificare a regulilor (MODEL_NORM_RULES, MODEL_FAMILY_RULES, GUESS_MODEL_RULES)
+și înainte de build_clean_table --full, arată ce rânduri s-ar schimba.
+
+    python -m scripts.checks.check_model_rules --examples 10
+"""
+from __future__ import annotations
+
+import argparse
+import sqlite3
+
+from app.cleaning.laptop import LAPTOP_COLUMNS
+from app.config.base import DB_PATH
+from app.core.utils import guess_model
+from app.models import ProductRow
+from app.storage.products_clean import clean_row
+
+CHECKED = ("model_norm", "model_family")
+
+SELECT_SQL = f"""
+SELECT {", ".join(f"p.{c}" for c in ProductRow._fields)}, {", ".join(f"pc.{c}" for c in CHECKED)}
+FROM products p
+JOIN products_clean pc ON pc.listing_key = p.listing_key
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Paritate reguli de model vs DB")
+    parser.add_argument("--examples", type=int, default=5, help="Câte exemple de diferențe să afișeze pe coloană")
+    args = parser.parse_args()
+
+    if not DB_PATH.exists():
+        raise SystemExit(f"DB not found: {DB_PATH}")
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        total = 0
+        diffs: dict[str, list[tuple]] = {c: [] for c in ("model_guess", *CHECKED)}
+        offset = len(ProductRow._fields)
+
+        for r in conn.execute(SELECT_SQL):
+            row = ProductRow._make(r[:offset])
+            total += 1
+
+            if row.model_guess:
+                new_guess = guess_model(row.title)
+                if new_guess != row.model_guess:
+                    diffs["model_guess"].append((row.url, row.model_guess, new_guess))
+
+            laptop = clean_row(row)[-len(LAPTOP_COLUMNS):]
+            for i, col in enumerate(CHECKED):
+                new = laptop[LAPTOP_COLUMNS.index(col)]
+                if new != r[offset + i]:
+                    diffs[col].append((row.url, r[offset + i], new))
+    finally:
+        conn.close()
+
+    print("rows checked:", total)
+    for col, rows in diffs.items():
+        print(f"{col}: {len(rows)} diferențe")
+        for url, old, new in rows[: args.examples]:
+            print(f"  {url}\n    db: {old!r}\n    now: {new!r}")
+
+    if any(diffs[c] for c in CHECKED):
+        raise SystemExit(1)
+    print("model rules: OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+# scripts/compact_snapshots.py
+"""
+Retenție pentru price_snapshots: istoricul mai vechi de --days zile se comasează într-un
+rând pe anunț și zi (price_snapshots_daily: ultimul preț din zi, min, max, număr de snapshot-uri).
+Tabelul price_snapshots rămâne mic; istoricul complet se citește din view-ul price_history.
+
+    python -m scripts.compact_snapshots
+    python -m scripts.compact_snapshots --days 30
+
+Spațiul eliberat se recuperează cu scripts/vacuum_db.py.
+"""
+from __future__ import annotations
+
+import argparse
+
+from app.config.base import DB_PATH
+from app.storage.sqlite import SqliteStore
+
+DEFAULT_DAYS = 90
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compactare price_snapshots (downsampling zilnic)")
+    parser.add_argument("--days", type=int, default=DEFAULT_DAYS, help="Snapshot-urile mai noi de atât rămân neatinse")
+    args = parser.parse_args()
+
+    if not DB_PATH.exists():
+        raise SystemExit(f"DB not found: {DB_PATH}")
+
+    with SqliteStore(DB_PATH) as store:
+        moved, days = store.compact_snapshots(max(0, args.days))
+        conn = store._connect()
+        hot = conn.execute("SELECT COUNT(*) FROM price_snapshots").fetchone()[0]
+        cold = conn.execute("SELECT COUNT(*) FROM price_snapshots_daily").fetchone()[0]
+
+    print(f"snapshots compacted:   {moved}")
+    print(f"daily rows written:    {days}")
+    print(f"price_snapshots:       {hot}")
+    print(f"price_snapshots_daily: {cold}")
+
+
+if __name__ == "__main__":
+    main()
@@ -106,7 +106,7 @@ def build_quality_summary(cur):
         WHERE screen_in IS NOT NULL
     """).fetchone()[0]
 
-    snapshots = cur.execute("SELECT COUNT(*) FROM price_snapshots").fetchone()[0]
+    snapshots = cur.execute("SELECT COALESCE(SUM(n_snapshots), 0) FROM price_history").fetchone()[0]
     distinct_urls = cur.execute("SELECT COUNT(DISTINCT url) FROM products").fetchone()[0]
 
     rows = [
@@ -0,0 +1,215 @@
+# scripts/refilter_products.py
+"""
+Re-rulează explain_publi24_laptop_filter peste anunțurile deja salvate în products.
+
+- citește products în chunk-uri (paginare pe id, fără a ține tot tabelul în memorie);
+- evaluează filtrul într-un process pool;
+- scrie decizia (keep, reason_code, reason) în filter_decisions, etichetată cu RULES_VERSION;
+- afișează diferențele față de versiunea anterioară de reguli.
+
+    python -m scripts.refilter_products
+    python -m scripts.refilter_products --workers 8 --chunk-size 2000
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Iterator, Optional
+
+from app.config.base import DB_PATH
+from app.filters import RULES_VERSION, explain_publi24_laptop_filter, reason_code
+
+CREATE_SQL = """
+CREATE TABLE IF NOT EXISTS filter_decisions (
+    rules_version TEXT NOT NULL,
+    url TEXT NOT NULL,
+    keep INTEGER NOT NULL,
+    reason_code TEXT NOT NULL,
+    reason TEXT,
+    decided_at TEXT NOT NULL,
+    PRIMARY KEY (rules_version, url)
+);
+
+CREATE INDEX IF NOT EXISTS idx_filter_decisions_url ON filter_decisions(url);
+"""
+
+SELECT_CHUNK_SQL = """
+SELECT id, url, title, description_text
+FROM products
+WHERE source = 'publi24' AND category = 'laptopuri' AND id > ?
+ORDER BY id
+LIMIT ?
+"""
+
+Row = tuple[int, str, Optional[str], Optional[str]]
+Decision = tuple[str, int, str, str]  # (url, keep, reason_code, reason)
+
+
+def iter_chunks(conn: sqlite3.Connection, chunk_size: int) -> Iterator[list[Row]]:
+    last_id = 0
+    while True:
+        rows = conn.execute(SELECT_CHUNK_SQL, (last_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        last_id = rows[-1][0]
+        yield rows
+
+
+def evaluate_chunk(rows: list[Row]) -> list[Decision]:
+    out: list[Decision] = []
+    for _id, url, title, desc in rows:
+        keep, reason = explain_publi24_laptop_filter(title or "", desc or "", url)
+        out.append((url, int(keep), reason_code(keep, reason), reason))
+    return out
+
+
+def write_decisions(conn: sqlite3.Connection, decisions: list[Decision], decided_at: str) -> None:
+    conn.executemany(
+        """
+        INSERT OR REPLACE INTO filter_decisions(rules_version, url, keep, reason_code, reason, decided_at)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        [(RULES_VERSION, url, keep, code, reason, decided_at) for url, keep, code, reason in decisions],
+    )
+    conn.commit()
+
+
+def run(conn: sqlite3.Connection, chunk_size: int, workers: int) -> int:
+    decided_at = datetime.now(timezone.utc).isoformat()
+    total = 0
+
+    if workers <= 1:
+        for rows in iter_chunks(conn, chunk_size):
+            decisions = evaluate_chunk(rows)
+            write_decisions(conn, decisions, decided_at)
+            total += len(decisions)
+        return total
+
+    # fereastră limitată de chunk-uri în zbor, ca memoria să nu crească cu tabelul
+    max_pending = workers * 2
+    chunks = iter_chunks(conn, chunk_size)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = set()
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                rows = next(chunks, None)
+                if rows is None:
+                    exhausted = True
+                    break
+                pending.add(pool.submit(evaluate_chunk, rows))
+
+            if not pending:
+                break
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for fut in done:
+                decisions = fut.result()
+                write_decisions(conn, decisions, decided_at)
+                total += len(decisions)
+    return total
+
+
+def previous_version(conn: sqlite3.Connection) -> Optional[str]:
+    row = conn.execute(
+        """
+        SELECT rules_version
+        FROM filter_decisions
+        WHERE rules_version <> ?
+        GROUP BY rules_version
+        ORDER BY MAX(decided_at) DESC
+        LIMIT 1
+        """,
+        (RULES_VERSION,),
+    ).fetchone()
+    return row[0] if row else None
+
+
+def report_diff(conn: sqlite3.Connection, prev: str, examples: int) -> None:
+    print(f"\n=== DIFF {prev} -> {RULES_VERSION} ===")
+
+    rows = conn.execute(
+        """
+        SELECT p.keep, c.keep, COUNT(*)
+        FROM filter_decisions c
+        JOIN filter_decisions p ON p.url = c.url AND p.rules_version = ?
+        WHERE c.rules_version = ?
+        GROUP BY p.keep, c.keep
+        """,
+        (prev, RULES_VERSION),
+    ).fetchall()
+    matrix = {(int(a), int(b)): n for a, b, n in rows}
+    print("unchanged keep:  ", matrix.get((1, 1), 0))
+    print("unchanged reject:", matrix.get((0, 0), 0))
+    print("keep -> reject:  ", matrix.get((1, 0), 0))
+    print("reject -> keep:  ", matrix.get((0, 1), 0))
+
+    only_new = conn.execute(
+        """
+        SELECT COUNT(*) FROM filter_decisions c
+        WHERE c.rules_version = ?
+          AND NOT EXISTS (SELECT 1 FROM filter_decisions p WHERE p.url = c.url AND p.rules_version = ?)
+        """,
+        (RULES_VERSION, prev),
+    ).fetchone()[0]
+    print("new urls (not in previous):", only_new)
+
+    print("\nreason_code changes:")
+    for old_code, new_code, n in conn.execute(
+        """
+        SELECT p.reason_code, c.reason_code, COUNT(*) AS n
+        FROM filter_decisions c
+        JOIN filter_decisions p ON p.url = c.url AND p.rules_version = ?
+        WHERE c.rules_version = ? AND p.reason_code <> c.reason_code
+        GROUP BY p.reason_code, c.reason_code
+        ORDER BY n DESC
+        """,
+        (prev, RULES_VERSION),
+    ):
+        print(f"  {old_code} -> {new_code}: {n}")
+
+    if examples > 0:
+        print("\nexamples (keep flipped):")
+        for url, old_reason, new_reason in conn.execute(
+            """
+            SELECT c.url, p.reason, c.reason
+            FROM filter_decisions c
+            JOIN filter_decisions p ON p.url = c.url AND p.rules_version = ?
+            WHERE c.rules_version = ? AND p.keep <> c.keep
+            LIMIT ?
+            """,
+            (prev, RULES_VERSION, examples),
+        ):
+            print(f"  {url}\n    old: {old_reason}\n    new: {new_reason}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-filtrare products cu regulile curente")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--examples", type=int, default=10, help="Câte exemple de decizii schimbate să afișeze")
+    args = parser.parse_args()
+
+    if not DB_PATH.exists():
+        raise SystemExit(f"DB not found: {DB_PATH}")
+
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        conn.executescript(CREATE_SQL)
+        total = run(conn, chunk_size=max(1, args.chunk_size), workers=args.workers)
+        print(f"rules_version: {RULES_VERSION}")
+        print(f"filter_decisions written: {total}")
+
+        prev = previous_version(conn)
+        if prev:
+            report_diff(conn, prev, args.examples)
+        else:
+            print("Nu există o versiune anterioară de reguli pentru comparație.")
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,25 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.models import Product
+
+
+@pytest.fixture
+def make_product():
+    """
+    Factory pentru anunțuri publi24 / laptopuri sintetice: key e URL-ul sau un indice
+    (-> https://x/<key>), scrapuite pe 2026-01-<day> la hour:minute UTC, în rularea r<day>.
+    """
+    def make(key, price, day=1, hour=12, minute=0, run_id=None, title="Laptop Lenovo ThinkPad T480"):
+        return Product(
+            source="publi24",
+            category="laptopuri",
+            url=key if isinstance(key, str) else f"https://x/{key}",
+            title=title,
+            price=price,
+            scraped_at=datetime(2026, 1, day, hour, minute, tzinfo=timezone.utc),
+            scrape_run_id=run_id or f"r{day}",
+        )
+
+    return make
@@ -0,0 +1,93 @@
+import sqlite3
+from argparse import Namespace
+
+from app.cleaning.laptop import NORM_RULES_VERSIONS
+from app.storage.sqlite import SqliteStore
+from scripts.build_analysis_dataset import STEPS, run_steps
+
+ARGS = Namespace(full=False, workers=1)
+
+
+def _status(report):
+    return {name: status for name, status, _, _ in report}
+
+
+def test_steps_skip_when_inputs_unchanged(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(i, "2000", minute=i) for i in range(3)])
+
+    con = sqlite3.connect(db)
+    assert set(_status(run_steps(con, ARGS)).values()) == {"ran"}
+    assert set(_status(run_steps(con, ARGS)).values()) == {"skipped"}
+
+    # produs nou: products_clean se reconstruiește, view-ul și restul pașilor după el
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(5, "2100", minute=5)])
+    assert set(_status(run_steps(con, ARGS)).values()) == {"ran"}
+
+    # ieșire lipsă -> pasul rulează din nou, chiar cu aceeași amprentă
+    con.execute("DROP TABLE market_daily")
+    status = _status(run_steps(con, ARGS))
+    assert status["clean_table"] == "skipped" and status["market_daily"] == "ran"
+    assert con.execute("SELECT COUNT(*) FROM products_analysis").fetchone() == (4,)
+    con.close()
+
+
+def test_forced_steps_and_dependency_order(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(0, "2000")])
+
+    con = sqlite3.connect(db)
+    report = run_steps(con, ARGS)
+    assert [r[0] for r in report] == [s.name for s in STEPS]
+    assert _status(run_steps(con, ARGS, forced=frozenset({"clean_table"}))) == {
+        "clean_table": "ran", "analysis_view": "ran", "market_daily": "ran", "check_analysis_view": "ran",
+    }
+    con.close()
+
+
+def test_rules_change_rebuilds_rows_before_watermark(tmp_path, monkeypatch, make_product):
+    db = str(tmp_path / "products.db")
+    # 3 rânduri pe 01-01, unul pe 01-02
+    products = [make_product(i, "2000", day=1 + i // 3, minute=i) for i in range(4)]
+    with SqliteStore(db) as store:
+        store.upsert_products(products)
+
+    con = sqlite3.connect(db)
+    run_steps(con, ARGS)
+
+    monkeypatch.setitem(NORM_RULES_VERSIONS, 0, "rules-v2-other")
+    monkeypatch.setitem(NORM_RULES_VERSIONS, 1, "rules-v2-laptop")
+    report = run_steps(con, ARGS)
+    assert report[0][1] == "ran" and report[0][3].startswith("full, 4 rânduri")
+    assert con.execute("SELECT DISTINCT norm_rules_version FROM products_clean").fetchall() == [("rules-v2-laptop",)]
+    con.close()
+
+
+def _market_days(con):
+    return [r[0] for r in con.execute("SELECT DISTINCT date(day * 86400, 'unixepoch') FROM market_daily ORDER BY 1")]
+
+
+def test_market_daily_covers_days_changed_by_clean_table(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    products = [make_product(0, "2000"), make_product(1, "2000", day=2)]
+    with SqliteStore(db) as store:
+        # două rulări, products_clean construit o singură dată după ele
+        store.upsert_products(products[:1])
+        store.upsert_products(products[1:])
+
+    con = sqlite3.connect(db)
+    run_steps(con, ARGS)
+    assert _market_days(con) == ["2026-01-01", "2026-01-02"]
+
+    # după un build complet se recalculează și zilele vechi, din afara ferestrei de schimbări
+    con.execute("UPDATE market_daily SET n = 99")
+    con.commit()
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(7, "2500", day=5)])
+    run_steps(con, Namespace(full=True, workers=1))
+    assert _market_days(con) == ["2026-01-01", "2026-01-02", "2026-01-05"]
+    assert con.execute("SELECT MAX(n) FROM market_daily").fetchone() == (1,)
+    con.close()
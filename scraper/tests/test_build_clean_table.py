@@ -0,0 +1,107 @@
+import sqlite3
+from datetime import datetime, timezone
+
+from app.cleaning.laptop import NORM_RULES_VERSIONS
+from app.storage.build_state import get_watermark
+from app.storage.sqlite import SqliteStore
+import scripts.build_clean_table as bct
+from scripts.build_clean_table import WATERMARK_NAME, build
+
+
+def test_incremental_build_only_processes_rows_after_watermark(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(i, "1000", hour=12 - i) for i in range(5)])
+
+    con = sqlite3.connect(db)
+    assert build(con) == ("full", 5, 0)
+    wm = get_watermark(con, WATERMARK_NAME)
+    # fără modificări: se reia doar marja de suprapunere (rândul de la 12:00)
+    assert build(con) == ("incremental", 1, 1)
+
+    # a doua zi: doar două anunțuri re-scrapuite (unul cu preț nou)
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(1, "900", day=2), make_product(3, "1000", day=2)])
+
+    # cele două rânduri noi + rândul din marja de suprapunere a watermark-ului anterior;
+    # doar anunțul cu preț nou trece din nou prin normalizare
+    assert build(con) == ("incremental", 3, 2)
+    assert get_watermark(con, WATERMARK_NAME) > wm
+    assert con.execute("SELECT price_ron FROM products_clean WHERE url = 'https://x/1'").fetchone() == (900.0,)
+    assert build(con, full=True) == ("full", 5, 5)
+    assert build(con, full=True, force=True) == ("full", 5, 0)
+    con.close()
+
+
+def test_build_fills_laptop_columns_in_same_pass(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    p = make_product(0, "2500")
+    p.title = "Laptop Lenovo ThinkPad T480 i5 16GB 256GB SSD"
+    p.specs_raw = {"stare": "Utilizat"}
+    with SqliteStore(db) as store:
+        store.upsert_products([p])
+
+    con = sqlite3.connect(db)
+    build(con)
+    row = con.execute(
+        "SELECT brand_norm, condition_norm, model_family, ram_gb, is_laptop FROM products_clean"
+    ).fetchone()
+    assert row == ("Lenovo", "used", "ThinkPad", 16, 1)
+    con.close()
+
+
+def test_naive_scraped_at_is_utc_in_both_columns(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(0, "1000")])
+        conn = store._connect()
+        conn.execute("UPDATE products SET scraped_at = '2026-01-01T12:00:00', posted_at = NULL")
+        conn.commit()
+
+    con = sqlite3.connect(db)
+    build(con)
+    row = con.execute("SELECT scraped_at_utc, scraped_at_ms, posted_at_utc, posted_at_ms FROM products_clean").fetchone()
+    ms = int(datetime(2026, 1, 1, 12, tzinfo=timezone.utc).timestamp() * 1000)
+    assert row == ("2026-01-01T12:00:00+00:00", ms, "2026-01-01T12:00:00+00:00", ms)
+    con.close()
+
+
+def test_parallel_build_matches_single_process(tmp_path, monkeypatch, make_product):
+    monkeypatch.setattr(bct, "CHUNK_SIZE", 3)
+    dbs = []
+    for name in ("single.db", "pool.db"):
+        db = str(tmp_path / name)
+        with SqliteStore(db) as store:
+            store.upsert_products([make_product(i, str(1000 + i), hour=i % 24) for i in range(10)])
+        dbs.append(db)
+
+    single, pool = sqlite3.connect(dbs[0]), sqlite3.connect(dbs[1])
+    assert build(single, workers=1) == ("full", 10, 0)
+    assert build(pool, workers=2) == ("full", 10, 0)
+
+    q = "SELECT * FROM products_clean ORDER BY listing_key"
+    assert single.execute(q).fetchall() == pool.execute(q).fetchall()
+    single.close()
+    pool.close()
+
+
+def test_rules_version_invalidates_only_dependent_rows(tmp_path, monkeypatch, make_product):
+    db = str(tmp_path / "products.db")
+    laptop = make_product(0, "2500")
+    laptop.title = "Laptop Lenovo ThinkPad T480"
+    part = make_product(1, "100")
+    part.title = "Baterie laptop Lenovo"
+    with SqliteStore(db) as store:
+        store.upsert_products([laptop, part])
+
+    con = sqlite3.connect(db)
+    assert build(con) == ("full", 2, 0)
+
+    # schimbare în tabelele de model: doar laptopul e recalculat
+    versions = dict(NORM_RULES_VERSIONS)
+    monkeypatch.setitem(NORM_RULES_VERSIONS, 1, "model-rules-changed")
+    assert build(con, full=True) == ("full", 2, 1)
+    assert con.execute("SELECT norm_rules_version FROM products_clean ORDER BY is_laptop").fetchall() == [
+        (versions[0],), ("model-rules-changed",),
+    ]
+    con.close()
@@ -0,0 +1,38 @@
+from app.storage.filter_cache import FilterDecisionCache
+from app.storage.sqlite import SqliteStore
+
+
+def test_cache_skips_evaluation_for_same_content(tmp_path):
+    db = tmp_path / "cache.db"
+    cache = FilterDecisionCache(db_path=str(db))
+    first = cache.explain("Laptop Lenovo ThinkPad T480", "i5 16GB 512GB SSD")
+    cache.close()
+
+    cache = FilterDecisionCache(db_path=str(db))
+    second = cache.explain("  LAPTOP Lenovo ThinkPad T480 ", "i5 16GB 512GB SSD")
+    cache.close()
+
+    assert first == second
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_cache_is_invalidated_by_new_rules_version(tmp_path):
+    db = tmp_path / "cache.db"
+    cache = FilterDecisionCache(db_path=str(db), rules_version="v1")
+    cache.explain("Mouse wireless", "mouse nou")
+    cache.close()
+
+    cache = FilterDecisionCache(db_path=str(db), rules_version="v2")
+    assert cache.purged == 1
+    assert cache.get("Mouse wireless", "mouse nou") is None
+    cache.close()
+
+
+def test_cache_on_shared_connection_leaves_it_open(tmp_path):
+    with SqliteStore(str(tmp_path / "products.db")) as store:
+        conn = store._connect()
+        cache = FilterDecisionCache(conn=conn)
+        cache.explain("Laptop Dell Latitude 7490", "i7 16GB")
+        cache.close()
+
+        assert conn.execute("SELECT COUNT(*) FROM filter_cache").fetchone()[0] == 1
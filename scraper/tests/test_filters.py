@@ -102,4 +102,50 @@ def test_filter_rejects_dezmembrez():
         "Dezmembrez Laptop DELL Inspiron 5558",
         "pentru piese",
         "https://x"
-    ) is False
\ No newline at end of file
+    ) is False
+
+def test_keyword_matcher_finds_overlapping_words_like_re_search():
+    import re
+    from app.filters import KeywordMatcher
+
+    words = ["stick", "stick usb", "placa", "placa de baza", "de baza", "baza"]
+    m = KeywordMatcher({"w": words})
+    text = "vand stick usb si placa de baza, sticky"
+    expected = {w for w in words if re.search(rf"\b{re.escape(w)}\b", text)}
+    assert m.hits(text) == expected
+
+
+def test_keyword_matcher_keeps_list_order_for_first_hit():
+    from app.filters import KeywordMatcher
+
+    m = KeywordMatcher({"w": ["mouse", "monitor", "tv"]})
+    hits = m.hits("tv si monitor")
+    assert m.first(hits, "w") == "monitor"
+
+
+def test_filter_reason_lists_desc_hard_bans_in_list_order():
+    from app.filters import explain_publi24_laptop_filter
+
+    keep, reason = explain_publi24_laptop_filter(
+        "Laptop Lenovo ThinkPad T480",
+        "i5 16GB 512GB SSD, dau cadou mouse si geanta",
+    )
+    assert keep is True
+    assert "desc_hard_ban(-1):mouse,geanta" in reason
+
+
+def test_rules_version_changes_with_keyword_lists(monkeypatch):
+    from app import filters
+
+    before = filters.compute_rules_version()
+    assert before == filters.RULES_VERSION
+    monkeypatch.setattr(filters, "DEFECT_WORDS", filters.DEFECT_WORDS + ["zgariat"])
+    assert filters.compute_rules_version() != before
+
+
+def test_reason_code():
+    from app.filters import reason_code
+
+    assert reason_code(True, "ok: score=7; laptop_kw(+3)") == "ok"
+    assert reason_code(False, "reject: score=2") == "low_score"
+    assert reason_code(False, "title_hard_ban_strict:mouse") == "title_hard_ban_strict"
@@ -0,0 +1,65 @@
+from datetime import datetime, timezone
+
+from app.storage.market_daily import day_of, refresh_market_daily
+from app.storage.products_clean import ensure_products_clean
+from app.storage.sqlite import SqliteStore
+
+# segmentul fiecărui anunț e scris direct: testele verifică rollup-ul, nu normalizarea
+INSERT_CLEAN_SQL = """
+INSERT INTO products_clean (listing_key, url, brand_norm, model_family, ram_gb, condition_norm, is_laptop)
+SELECT listing_key, url, ?, ?, {ram_gb}, 'used', {is_laptop} FROM products
+"""
+
+
+def test_refresh_market_daily_per_segment(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    with SqliteStore(db) as store:
+        prices = ("1000", "2000", "1600", "900", "500")
+        store.upsert_products([make_product(i, p, day=1 + i // 5, minute=i) for i, p in enumerate(prices, start=1)])
+        conn = store._connect()
+        ensure_products_clean(conn)
+        conn.execute(
+            INSERT_CLEAN_SQL.format(
+                ram_gb="CASE WHEN url = 'https://x/4' THEN NULL ELSE 16 END", is_laptop="url <> 'https://x/3'"
+            ),
+            ("Lenovo", "ThinkPad"),
+        )
+        conn.commit()
+
+        day1 = day_of(int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp() * 1000))
+        assert refresh_market_daily(conn, [day1]) == 2
+        # recalcularea aceleiași zile înlocuiește rândurile, nu le dublează
+        assert refresh_market_daily(conn, [day1]) == 2
+        rows = conn.execute(
+            "SELECT brand_norm, model_family, ram_gb, condition_norm, n, price_min, price_p25, "
+            "price_median, price_p75, price_max FROM market_daily ORDER BY ram_gb"
+        ).fetchall()
+
+    assert [tuple(r) for r in rows] == [
+        ("Lenovo", "ThinkPad", 0, "used", 1, 900.0, 900.0, 900.0, 900.0, 900.0),
+        ("Lenovo", "ThinkPad", 16, "used", 2, 1000.0, 1250.0, 1500.0, 1750.0, 2000.0),
+    ]
+
+
+def test_refresh_market_daily_without_clean_table(tmp_path):
+    with SqliteStore(str(tmp_path / "products.db")) as store:
+        assert refresh_market_daily(store._connect(), [20454]) == 0
+
+
+def test_past_day_uses_price_in_effect_that_day(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(1, "1000", minute=1), make_product(2, "2000", minute=2)])
+        # a doua zi: anunțul 1 e re-scrapuit cu alt preț, anunțul 3 apare abia acum
+        store.upsert_products([make_product(1, "1200", day=2, minute=1), make_product(3, "700", day=2, minute=3)])
+        conn = store._connect()
+        ensure_products_clean(conn)
+        conn.execute(INSERT_CLEAN_SQL.format(ram_gb=8, is_laptop=1), ("Dell", "Latitude"))
+        conn.commit()
+
+        day1 = day_of(int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp() * 1000))
+        refresh_market_daily(conn, [day1, day1 + 1])
+        rows = conn.execute("SELECT day - ?, n, price_min, price_max FROM market_daily ORDER BY day", (day1,)).fetchall()
+
+    # anunțul 2, nevăzut în ziua 2, nu mai e numărat acolo; ziua 1 păstrează prețul de atunci
+    assert [tuple(r) for r in rows] == [(0, 2, 1000.0, 2000.0), (1, 2, 700.0, 1200.0)]
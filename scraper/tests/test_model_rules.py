@@ -0,0 +1,56 @@
+import app.cleaning.laptop as laptop
+from app.cleaning.laptop import guess_model_family, guess_model_norm
+from app.core.utils import ModelRuleTable
+from app.cleaning.normalize import normalize_title
+from app.core.utils import guess_model
+
+# ieșirile implementării dinaintea tabelelor de reguli (if-uri / re.search inline)
+CASES = [
+    # titlu, guess_model, guess_model_norm, guess_model_family(brand="HP")
+    ("MacBook Pro 16 M1 Pro", "MacBook Pro 16", "MacBook Pro 16", "MacBook Pro"),
+    ("macbook retina 12", None, "MacBook 12", "MacBook"),
+    ("Lenovo IdeaPad Slim 3 15IRH8", "IdeaPad Slim 3 15IRH8", "15IRH8", "IdeaPad"),
+    ("Lenovo ThinkPad T480 i5", "ThinkPad T480", "Thinkpad T480", "ThinkPad"),
+    ("Lenovo Legion Pro 5 16IRX8", "Legion Pro 5", "16IRX8", "Legion Pro"),
+    ("HP ProBook x360 435 G8", "ProBook x360", "Probook X360 435 G8", "ProBook"),
+    ("HP 15s-fq5000nq", "15s", "HP15S-FQ5000NQ", None),
+    ("HP 17-cn3004nq", "17-cn3004nq", "HP 17", None),
+    ("Dell XPS 15 9560", None, "Xps 15 9560", "XPS"),
+    ("ASUS TUF Gaming FX505DT", "FX505DT", "FX505DT", "TUF"),
+    ("Medion P6620 Nvidia Quadro", "P6620", "P6620", None),
+    ("LOQ Essential 15IRX11", "LOQ Essential 15IRX11", "15IRX11", "LOQ"),
+    ("Lenovo V15 G4 IRU", "V15 G4 IRU", "V15", None),
+    ("Laptop gaming RTX 4060 16GB", None, None, None),
+    # "ı" se potrivește cu "i" sub re.IGNORECASE; prefiltrul nu are voie să sară regula
+    ("Lenovo Thınkpad T480", "Thınkpad T480", "Thınkpad T480", None),
+]
+
+
+def test_rule_tables_match_previous_outputs():
+    for title, model, model_norm, family in CASES:
+        assert guess_model(title) == model, title
+        assert guess_model_norm(title) == model_norm, title
+        assert guess_model_family("HP", normalize_title(title)) == family, title
+
+
+def test_family_brand_specific_rules():
+    assert guess_model_family("HP", "laptop business 14") == "Business"
+    assert guess_model_family("Dell", "laptop business 14") is None
+    assert guess_model_family("MSI", "msi katana 15") == "Katana"
+    assert guess_model_family("Lenovo", "katana 15") is None
+
+
+def test_rules_version_covers_formatters_and_lists(monkeypatch):
+    before = laptop.compute_norm_rules_versions()
+
+    # alt formator (lambda) pe aceeași regulă -> doar versiunea laptopurilor se schimbă
+    rules = list(laptop.MODEL_NORM_RULES.rules)
+    rules[0] = rules[0]._replace(fmt=lambda m: f"MacBook Pro {m.group(1)}")
+    monkeypatch.setattr(laptop, "MODEL_NORM_RULES", ModelRuleTable(rules))
+    after_fmt = laptop.compute_norm_rules_versions()
+    assert after_fmt[1] != before[1] and after_fmt[0] == before[0]
+
+    # listă din _is_laptop -> se schimbă ambele versiuni
+    monkeypatch.setattr(laptop, "COOLING_WORDS", (*laptop.COOLING_WORDS, "fan"))
+    after_list = laptop.compute_norm_rules_versions()
+    assert after_list[0] != before[0] and after_list[1] != after_fmt[1]
@@ -1,5 +1,5 @@
 from decimal import Decimal
-from app.models import Product
+from app.models import Product, ProductRow
 
 def test_normalize_price_decimal():
     p = Product(
@@ -9,4 +9,14 @@ def test_normalize_price_decimal():
         title="t",
         price="6.398,99 lei",
     )
-    assert p.price == Decimal("6398.99")
\ No newline at end of file
+    assert p.price == Decimal("6398.99")
+
+def test_product_row_specs_lazy_decode():
+    row = ProductRow(
+        "x", "publi24", "laptopuri", "t", 100.0, "RON", None, None,
+        None, "2026-01-01T00:00:00+00:00", None, None, None, None,
+        '{"stare": "Utilizat"}',
+    )
+    assert row.specs() == {"stare": "Utilizat"}
+    assert row._replace(specs_raw="null").specs() is None
+    assert row._replace(specs_raw="{bad").specs() is None
@@ -0,0 +1,147 @@
+import sqlite3
+from types import SimpleNamespace
+
+import pytest
+
+from app import pipeline
+from app.models import Product
+
+
+class FakeHttp:
+    def __init__(self, fail_after=None):
+        self.calls = 0
+        self.fail_after = fail_after
+
+    def polite_sleep(self):
+        pass
+
+    def get(self, url):
+        self.calls += 1
+        if self.fail_after is not None and "item" in url and self.calls > self.fail_after:
+            raise KeyboardInterrupt
+        return SimpleNamespace(status_code=200, text=url, elapsed_ms=1)
+
+
+class FakeSite:
+    def __init__(self, n, fail_after=None):
+        self.n = n
+        self.http = FakeHttp(fail_after)
+
+    def iter_listing_urls(self, category, max_pages):
+        return ["https://fake.local/list"]
+
+    def parse_listing_page(self, html):
+        return [f"https://fake.local/item/{i}" for i in range(self.n)]
+
+    def parse_detail_page(self, html, url, category):
+        return Product(source="pcgarage", category=category, url=url, title=f"Laptop {url}", price="1000")
+
+    def filter_product(self, product):
+        return True
+
+
+def _runs(db):
+    con = sqlite3.connect(db)
+    try:
+        return con.execute("SELECT status, products_upserted FROM scrape_runs").fetchall()
+    finally:
+        con.close()
+
+
+def test_run_and_store_flushes_in_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "OUT_DIR", tmp_path)
+    db = str(tmp_path / "products.db")
+    batches = []
+    upsert = pipeline.SqliteStore.upsert_products
+
+    def spy(self, products):
+        batches.append(len(products))
+        return upsert(self, products)
+
+    monkeypatch.setattr(pipeline.SqliteStore, "upsert_products", spy)
+    stats = pipeline.run_and_store(FakeSite(7), "pcgarage", "laptopuri", max_pages=1, db_path=db, flush_every=3)
+
+    assert batches == [3, 3, 1]
+    assert stats.products_upserted == 7
+    assert _runs(db) == [("finished", 7)]
+
+
+def test_interrupted_run_keeps_flushed_batches(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "OUT_DIR", tmp_path)
+    db = str(tmp_path / "products.db")
+
+    with pytest.raises(KeyboardInterrupt):
+        pipeline.run_and_store(FakeSite(10, fail_after=6), "pcgarage", "laptopuri", max_pages=1, db_path=db, flush_every=2)
+
+    # listare + 5 detalii reușite -> 2 batch-uri scrise, al 5-lea produs pierdut
+    assert _runs(db) == [("failed", 4)]
+
+
+def test_time_flush_checked_on_filtered_items(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "OUT_DIR", tmp_path)
+    db = str(tmp_path / "products.db")
+    site = FakeSite(5)
+    site.filter_product = lambda p: p.url.endswith("/0")
+    clock = [0.0]
+    get = site.http.get
+
+    def slow_get(url):
+        clock[0] += 10
+        return get(url)
+
+    site.http.get = slow_get
+    monkeypatch.setattr(pipeline.time, "monotonic", lambda: clock[0])
+    batches = []
+    upsert = pipeline.SqliteStore.upsert_products
+
+    def spy(self, products):
+        batches.append((len(products), site.http.calls))
+        return upsert(self, products)
+
+    monkeypatch.setattr(pipeline.SqliteStore, "upsert_products", spy)
+    pipeline.run_and_store(site, "pcgarage", "laptopuri", max_pages=1, db_path=db, flush_every=100, flush_interval_s=25)
+
+    # produsul păstrat e comis după primul detaliu respins care depășește intervalul,
+    # nu abia la sfârșitul rulării (listare + item/0 + item/1)
+    assert batches == [(1, 3)]
+
+
+def test_batch_write_error_fails_the_run(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "OUT_DIR", tmp_path)
+    db = str(tmp_path / "products.db")
+    site = FakeSite(30)
+    upsert = pipeline.SqliteStore.upsert_products
+    calls = []
+
+    def locked_on_third(self, products):
+        calls.append(len(products))
+        if len(calls) == 3:
+            raise sqlite3.OperationalError("database is locked")
+        return upsert(self, products)
+
+    monkeypatch.setattr(pipeline.SqliteStore, "upsert_products", locked_on_third)
+    with pytest.raises(sqlite3.OperationalError):
+        pipeline.run_and_store(site, "pcgarage", "laptopuri", max_pages=1, db_path=db, flush_interval_s=0)
+
+    # eroarea nu e înghițită ca "Critical Listing Error": rularea se oprește și e marcată failed
+    assert _runs(db) == [("failed", 2)]
+    assert site.http.calls == 4
+
+
+def test_filtered_rows_are_written_as_they_accumulate(tmp_path, monkeypatch):
+    monkeypatch.setattr(pipeline, "OUT_DIR", tmp_path)
+    site = FakeSite(7)
+    site.filter_product = lambda p: False
+    written = []
+    append = pipeline._append_filtered_csv
+
+    def spy(path, rows):
+        written.append(len(rows))
+        append(path, rows)
+
+    monkeypatch.setattr(pipeline, "_append_filtered_csv", spy)
+    pipeline.run_and_store(site, "pcgarage", "laptopuri", max_pages=1, db_path=str(tmp_path / "products.db"), flush_every=3)
+
+    assert written == [3, 3, 1]
+    (csv,) = (tmp_path / "filtered").iterdir()
+    assert len(csv.read_text(encoding="utf-8").splitlines()) == 1 + 7
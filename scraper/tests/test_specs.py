@@ -0,0 +1,56 @@
+import re
+
+from app.cleaning.laptop import LAPTOP_SPECS, specs_from_raw
+from app.cleaning.specs import SpecGuess
+from app.filters import SPECS as FILTER_SPECS
+
+
+def _separate(extractor, text):
+    """Referința: câte un re.search pe câmp, ca înainte de SpecExtractor."""
+    out = {}
+    for name, field in extractor.fields.items():
+        m = re.search(field.pattern, text, extractor.flags)
+        out[name] = m.group(0) if m else None
+    return out
+
+
+def test_laptop_specs_single_pass():
+    spec = LAPTOP_SPECS.extract('Laptop ASUS TUF 15.6" i5-10300H 16GB RAM 512GB SSD GTX 1650')
+    assert spec == SpecGuess(cpu="i5-10300H", ram_gb=16, storage="512GB SSD", gpu="GTX 1650", screen_in=15.6)
+    assert LAPTOP_SPECS.extract("") == SpecGuess()
+
+
+def test_extractors_match_separate_searches():
+    texts = [
+        '15,6" Celeron 4gb 128 gb ssd radeon 680m',  # CPU-ul "înghite" 4gb; RAM-ul trebuie găsit oricum
+        "intel core i7 8gb ddr4 1 tb nvme p520 17 inch",
+        "x14\" ryzen 5 5600h 2tb ssd 24 gb rtx 3050 ti",
+        "laptop 13.3 inch r5 4500u 32gb 1024gb",
+    ]
+    for text in texts:
+        for extractor in (LAPTOP_SPECS, FILTER_SPECS):
+            spec = extractor.extract(text)
+            expected = _separate(extractor, text)
+            for name, value in expected.items():
+                assert (getattr(spec, name) is None) == (value is None), (text, name)
+            assert spec.cpu == (expected["cpu"].strip() if expected["cpu"] else None)
+
+
+def test_structured_specs_before_regex():
+    specs = {
+        "Procesor": "Intel Core i5-13420H",
+        "Capacitate memorie": "16 GB",
+        "Placa video": "NVIDIA GeForce RTX 4050",
+        "Diagonală": "15.6 inch",
+        "Cod producator": "X-1",
+    }
+    assert specs_from_raw(specs) == {"cpu": "Intel Core i5-13420H", "ram_gb": 16, "gpu": "RTX 4050", "screen_in": 15.6}
+
+    # descrierea menționează alte configurații; specificațiile structurate au prioritate,
+    # stocarea (lipsă din specs_raw) vine în continuare din regex
+    desc = "Disponibil si cu i7-13620H, 32GB, RTX 4060, 17.3 inch. 512GB SSD"
+    spec = LAPTOP_SPECS.extract(f"Laptop Acer Nitro V 15 {desc}", known=specs_from_raw(specs))
+    assert spec == SpecGuess("Intel Core i5-13420H", 16, "512GB SSD", "RTX 4050", 15.6)
+
+    # valoare nerecunoscută -> regex pe text
+    assert specs_from_raw({"Placa video": "Intel UHD Graphics"}) == {}
@@ -0,0 +1,255 @@
+import sqlite3
+from datetime import datetime, timezone
+
+from app.storage.sqlite import SECONDARY_INDEXES, SqliteStore
+
+
+def _snapshots(db):
+    con = sqlite3.connect(db)
+    try:
+        return con.execute("SELECT url, price_value, scrape_run_id FROM price_snapshots ORDER BY id").fetchall()
+    finally:
+        con.close()
+
+
+def test_upsert_counts_and_snapshot_only_on_price_change(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    store = SqliteStore(db)
+
+    first = [make_product(1, "100", run_id="r1"), make_product(2, "200", run_id="r1")]
+    assert store.upsert_products(first) == (2, 2, 0)
+    # același preț pentru /1 -> fără snapshot; /2 schimbat, /3 nou
+    assert store.upsert_products(
+        [make_product(i, price, run_id="r2", minute=5) for i, price in ((1, "100"), (2, "250"), (3, "300"))]
+    ) == (3, 1, 2)
+
+    assert _snapshots(db) == [
+        ("https://x/1", 100.0, "r1"),
+        ("https://x/2", 200.0, "r1"),
+        ("https://x/2", 250.0, "r2"),
+        ("https://x/3", 300.0, "r2"),
+    ]
+    assert store.count_products() == 3
+
+    con = sqlite3.connect(db)
+    last = con.execute(
+        "SELECT url, last_snapshot_price_value, price_change_count FROM products ORDER BY url"
+    ).fetchall()
+    con.close()
+    assert last == [("https://x/1", 100.0, 0), ("https://x/2", 250.0, 1), ("https://x/3", 300.0, 0)]
+
+
+def test_upsert_duplicate_urls_in_batch(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    store = SqliteStore(db)
+
+    batch = [
+        make_product(1, "100", run_id="r1"),
+        make_product(1, "120", run_id="r2", minute=1),
+        make_product(1, "120", run_id="r3", minute=2),
+    ]
+    assert store.upsert_products(batch) == (3, 3, 0)
+    assert _snapshots(db) == [("https://x/1", 100.0, "r1"), ("https://x/1", 120.0, "r2")]
+
+
+def test_last_snapshot_columns_backfilled_for_old_db(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    store = SqliteStore(db)
+    store.upsert_products([make_product(1, "100", run_id="r1"), make_product(1, "90", run_id="r2", minute=1)])
+    store.close()
+
+    # simulăm un DB vechi, fără coloanele denormalizate
+    con = sqlite3.connect(db)
+    for col in ("last_snapshot_price_value", "last_snapshot_at", "price_change_count"):
+        con.execute(f"ALTER TABLE products DROP COLUMN {col}")
+    con.execute("PRAGMA user_version=0")
+    con.commit()
+    con.close()
+
+    SqliteStore(db).close()
+    con = sqlite3.connect(db)
+    row = con.execute("SELECT last_snapshot_price_value, price_change_count FROM products").fetchone()
+    con.close()
+    assert row == (90.0, 1)
+
+
+def test_epoch_ms_columns_order_mixed_offsets(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(1, "100", run_id="r1")])
+
+    # textul ISO cu offset +02:00 e "mai mare" ca string, dar e cu o oră înainte de /1 (12:00Z)
+    con = sqlite3.connect(db)
+    con.execute(
+        "UPDATE products SET scraped_at = '2026-01-01T13:30:00+02:00', scraped_at_ms = NULL"
+    )
+    con.execute("INSERT INTO products(source, category, listing_key, url, scraped_at, title) "
+                "VALUES ('publi24', 'laptopuri', 2, 'https://x/2', '2026-01-01T12:00:00+00:00', 'Laptop')")
+    con.execute("PRAGMA user_version=5")
+    con.commit()
+    con.close()
+
+    SqliteStore(db).close()
+    con = sqlite3.connect(db)
+    rows = con.execute("SELECT url, scraped_at_ms FROM products ORDER BY scraped_at_ms").fetchall()
+    con.close()
+    assert rows == [("https://x/1", 1767267000000), ("https://x/2", 1767268800000)]
+
+
+def test_unchanged_content_only_touches_row(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    store = SqliteStore(db)
+    store.upsert_products([make_product(1, "100", run_id="r1"), make_product(2, "200", run_id="r1")])
+    assert (store.last_changed, store.last_touched) == (2, 0)
+
+    changed = make_product(2, "200", run_id="r2", minute=5)
+    changed.title = "Laptop nou"
+    assert store.upsert_products([make_product(1, "100", run_id="r2", minute=5), changed]) == (2, 0, 2)
+    assert (store.last_changed, store.last_touched) == (1, 1)
+
+    con = sqlite3.connect(db)
+    rows = con.execute("SELECT url, title, scrape_run_id FROM products ORDER BY url").fetchall()
+    con.close()
+    assert rows == [("https://x/1", "Laptop Lenovo ThinkPad T480", "r2"), ("https://x/2", "Laptop nou", "r2")]
+
+
+def test_schema_migrated_once_per_version(tmp_path, monkeypatch):
+    db = str(tmp_path / "products.db")
+    with SqliteStore(db) as store:
+        assert store.schema_version() == SqliteStore.SCHEMA_VERSION
+
+    def fail(self, conn):
+        raise AssertionError("migrarea nu trebuie să ruleze din nou")
+
+    monkeypatch.setattr(SqliteStore, "_migrate", fail)
+    with SqliteStore(db) as store:
+        assert store.count_products() == 0
+
+
+def _index_names(db):
+    con = sqlite3.connect(db)
+    try:
+        return {r[0] for r in con.execute("SELECT name FROM sqlite_master WHERE type='index' AND sql IS NOT NULL")}
+    finally:
+        con.close()
+
+
+def test_legacy_indexes_dropped(tmp_path):
+    db = str(tmp_path / "products.db")
+    SqliteStore(db).close()
+
+    con = sqlite3.connect(db)
+    con.execute("CREATE INDEX idx_products_model_guess ON products(model_guess)")
+    con.execute("PRAGMA user_version=1")
+    con.commit()
+    con.close()
+
+    with SqliteStore(db) as store:
+        names = _index_names(db)
+        assert "idx_products_model_guess" not in names
+        assert set(SECONDARY_INDEXES) <= names
+
+
+def test_description_html_in_compressed_side_table(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    p = make_product(1, "100", run_id="r1")
+    p.description_html = "<div>" + "laptop " * 200 + "</div>"
+
+    with SqliteStore(db) as store:
+        store.upsert_products([p])
+        assert store.get_description_html("https://x/1") == p.description_html
+
+    with SqliteStore(db, store_html=False) as store:
+        store.upsert_products([make_product(2, "100", run_id="r1")])
+        assert store.get_description_html("https://x/2") is None
+
+
+def test_inline_html_moved_to_side_table_on_migration(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(1, "100", run_id="r1")])
+
+    # simulăm un DB vechi, cu HTML-ul direct în products
+    con = sqlite3.connect(db)
+    con.execute("ALTER TABLE products ADD COLUMN description_html TEXT")
+    con.execute("UPDATE products SET description_html = '<p>vechi</p>'")
+    con.execute("PRAGMA user_version=3")
+    con.commit()
+    con.close()
+
+    with SqliteStore(db) as store:
+        assert store.get_description_html("https://x/1") == "<p>vechi</p>"
+    con = sqlite3.connect(db)
+    assert con.execute("SELECT description_html FROM products").fetchone() == (None,)
+    con.close()
+
+
+def test_same_publi24_ad_under_new_slug_is_one_listing(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    old = "https://www.publi24.ro/anunturi/electronice/laptop/anunt/lenovo-t480/ab12cd.html"
+    new = "https://www.publi24.ro/anunturi/electronice/laptop/anunt/lenovo-t480-pret-redus/ab12cd.html"
+
+    with SqliteStore(db) as store:
+        store.upsert_products([make_product(old, "1500", run_id="r1")])
+        assert store.upsert_products([make_product(new, "1400", run_id="r2", minute=5)]) == (1, 0, 1)
+        assert store.count_products() == 1
+
+    con = sqlite3.connect(db)
+    assert con.execute("SELECT url, price_change_count FROM products").fetchall() == [(new, 1)]
+    assert con.execute("SELECT COUNT(DISTINCT listing_key) FROM price_snapshots").fetchone() == (1,)
+    con.close()
+
+
+def test_compact_snapshots_downsamples_old_days(tmp_path, make_product):
+    db = str(tmp_path / "products.db")
+    with SqliteStore(db) as store:
+        # 2026-01-01: trei prețuri pentru /1 în aceeași zi; 2026-01-03: un preț nou (rămâne "cald")
+        store.upsert_products([make_product(1, "100", run_id="r1"), make_product(2, "50", run_id="r1")])
+        store.upsert_products([make_product(1, "80", run_id="r2", minute=10)])
+        store.upsert_products([make_product(1, "90", run_id="r3", minute=20)])
+        recent = make_product(1, "70", run_id="r4")
+        recent.scraped_at = datetime(2026, 1, 3, 9, 0, tzinfo=timezone.utc)
+        store.upsert_products([recent])
+
+        now_ms = int(datetime(2026, 1, 4, 15, 0, tzinfo=timezone.utc).timestamp() * 1000)
+        assert store.compact_snapshots(2, now_ms=now_ms) == (4, 2)
+        assert store.compact_snapshots(2, now_ms=now_ms) == (0, 0)
+
+    con = sqlite3.connect(db)
+    daily = con.execute(
+        "SELECT listing_key = (SELECT listing_key FROM products WHERE url = 'https://x/1'), "
+        "price_value, price_min, price_max, n_snapshots FROM price_snapshots_daily ORDER BY 1 DESC"
+    ).fetchall()
+    history = con.execute(
+        "SELECT url, price_value, n_snapshots FROM price_history ORDER BY scraped_at_ms, url"
+    ).fetchall()
+    con.close()
+
+    assert daily == [(1, 90.0, 80.0, 100.0, 3), (0, 50.0, 50.0, 50.0, 1)]
+    assert _snapshots(db) == [("https://x/1", 70.0, "r4")]
+    assert history == [("https://x/2", 50.0, 1), ("https://x/1", 90.0, 3), ("https://x/1", 70.0, 1)]
+
+
+def test_clean_on_ingest_matches_batch_build(tmp_path, make_product):
+    from scripts.build_clean_table import build
+
+    products = [make_product(1, "2500", run_id="r1"), make_product(2, "100", run_id="r1")]
+    products[0].title = "Laptop Lenovo ThinkPad T480 16GB"
+    dbs = [str(tmp_path / "ingest.db"), str(tmp_path / "batch.db")]
+    with SqliteStore(dbs[0], clean_on_ingest=True) as store:
+        store.upsert_products(products)
+        # re-scrape cu preț nou: rândul din products_clean e actualizat în aceeași tranzacție
+        products[0].price = "2400"
+        store.upsert_products(products[:1])
+    with SqliteStore(dbs[1]) as store:
+        store.upsert_products(products)
+
+    ingest, batch = sqlite3.connect(dbs[0]), sqlite3.connect(dbs[1])
+    build(batch)
+    q = "SELECT * FROM products_clean ORDER BY listing_key"
+    assert ingest.execute(q).fetchall() == batch.execute(q).fetchall()
+    assert ingest.execute("SELECT price_ron, model_family FROM products_clean WHERE url = 'https://x/1'").fetchone() == (
+        2400.0, "ThinkPad",
+    )
+    ingest.close()
+    batch.close()
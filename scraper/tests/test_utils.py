@@ -1,5 +1,16 @@
-from app.core.utils import guess_brand
+from app.core.utils import guess_brand, listing_id, listing_key
 
 def test_guess_brand():
     assert guess_brand("Laptop ASUS ROG Strix") == "ASUS"
-    assert guess_brand("lenovo thinkpad t14") == "LENOVO"
\ No newline at end of file
+    assert guess_brand("lenovo thinkpad t14") == "LENOVO"
+
+def test_listing_key_uses_site_ad_id():
+    a = "https://www.publi24.ro/anunturi/electronice/laptop/anunt/laptop-lenovo-t480/9d3f1a2b.html"
+    b = "https://publi24.ro/anunturi/electronice/laptop/anunt/lenovo-t480-redus/9d3f1a2b.html?utm=x"
+    assert listing_id(a) == "publi24:9d3f1a2b"
+    assert listing_key(a) == listing_key(b)
+
+    pc = "https://www.pcgarage.ro/notebook-laptop/lenovo/ideapad-slim-3/"
+    assert listing_id(pc) == "pcgarage.ro/notebook-laptop/lenovo/ideapad-slim-3"
+    assert 0 < listing_key(pc) < 2**63
+    assert listing_key(pc) != listing_key(a)
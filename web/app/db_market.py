@@ -659,6 +659,50 @@ def get_market_condition_distribution() -> Dict[str, Any]:
     }
 
 
+
+def get_market_price_trend(days: int = 30) -> Dict[str, Any]:
+    """
+    Trendul prețului median pe sursă, din rollup-ul market_daily (scris de scraper).
+    Mediana zilei pe sursă = media medianelor pe segmente, ponderată cu numărul de anunțuri.
+    """
+    days = max(1, min(int(days), 365))
+
+    with _get_conn() as conn:
+        has_rollup = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'market_daily'"
+        ).fetchone()
+        if not has_rollup:
+            return {"labels": [], "series": []}
+
+        rows = conn.execute(
+            """
+            SELECT
+                date(day * 86400, 'unixepoch') AS day_label,
+                source,
+                SUM(n) AS n,
+                ROUND(SUM(n * price_median) / SUM(n), 2) AS median_index
+            FROM market_daily
+            WHERE day > (SELECT MAX(day) FROM market_daily) - ?
+            GROUP BY day, source
+            ORDER BY day, source
+            """,
+            [days],
+        ).fetchall()
+
+    labels = sorted({r["day_label"] for r in rows})
+    by_source: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        by_source.setdefault(r["source"], {})[r["day_label"]] = r["median_index"]
+
+    return {
+        "labels": labels,
+        "series": [
+            {"source": source, "values": [values.get(label) for label in labels]}
+            for source, values in sorted(by_source.items())
+        ],
+    }
+
+
 if __name__ == "__main__":
     print("=== MARKET SUMMARY ===")
     print(get_market_summary())
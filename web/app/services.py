@@ -9,7 +9,12 @@ from app import db
 from app.models import EvaluationResult, Listing, User, Favorite, Notification, utc_now
 from sqlalchemy import and_, func
 from app.scoring.price_engine import _compute_price_warning as _build_price_warning
-from app.db_market import get_explore_filters, get_price_stats, get_market_condition_distribution
+from app.db_market import (
+    get_explore_filters,
+    get_price_stats,
+    get_market_condition_distribution,
+    get_market_price_trend,
+)
 
 
 def _normalize_text(value):
@@ -1242,5 +1247,6 @@ def get_admin_analytics_data():
         "price_comparison_per_brand": _get_price_comparison_per_brand(limit=8),
         "condition_distribution_platform": _get_condition_distribution_platform(),
         "condition_distribution_market": get_market_condition_distribution(),
+        "market_price_trend": get_market_price_trend(days=30),
         "users_by_role": _get_users_by_role(),
     }
\ No newline at end of file